@@ -1,16 +1,72 @@
+import logging
+from threading import Lock
+from typing import Optional
 from app.services.frame_analyzer import FrameAnalyzer
 from app.services.session_manager import SessionManager
+from app.storage.interface import StorageInterface
 from app.storage.memory import InMemoryStorage
+from app.config import settings
 
-# Singleton instances
-_storage = InMemoryStorage()
-_session_manager = SessionManager(_storage)
-_frame_analyzer = FrameAnalyzer(_session_manager)
+logger = logging.getLogger(__name__)
 
-def get_frame_analyzer() -> FrameAnalyzer:
-    """Dependency for frame analyzer"""
-    return _frame_analyzer
+# Singleton instances, created on first use so importing the API does not
+# load the pose model. The lifespan hook creates them once the model is ready
+_storage: Optional[StorageInterface] = None
+_session_manager: Optional[SessionManager] = None
+_frame_analyzer: Optional[FrameAnalyzer] = None
+_lock = Lock()
+
+def create_storage() -> StorageInterface:
+    """Redis when USE_REDIS is set, so sessions outlive the process and are shared between replicas"""
+    if settings.USE_REDIS:
+        from app.storage.redis_store import RedisStorage
+        return RedisStorage.from_url(
+            settings.REDIS_URL,
+            ttl=settings.SESSION_TTL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            scan_count=settings.REDIS_SCAN_COUNT
+        )
+    return InMemoryStorage(
+        max_entries=settings.MEMORY_STORE_MAX_ENTRIES,
+        max_bytes=settings.MEMORY_STORE_MAX_MB * 1024 * 1024,
+        sweep_interval_s=settings.MEMORY_STORE_SWEEP_S
+    )
 
 def get_session_manager() -> SessionManager:
     """Dependency for session manager"""
-    return _session_manager
\ No newline at end of file
+    global _storage, _session_manager
+    with _lock:
+        if _session_manager is None:
+            _storage = create_storage()
+            _session_manager = SessionManager(
+                _storage,
+                persist_interval_s=settings.PERSIST_INTERVAL_S,
+                persist_max_frames=settings.PERSIST_MAX_FRAMES,
+                max_cached_trackers=settings.MAX_CACHED_TRACKERS,
+                idle_s=settings.SESSION_TTL
+            )
+        return _session_manager
+
+async def close_storage():
+    """Write every dirty tracker and close the storage's connections on shutdown"""
+    global _storage, _session_manager, _frame_analyzer
+    with _lock:
+        storage, _storage = _storage, None
+        session_manager, _session_manager = _session_manager, None
+        _frame_analyzer = None
+    if session_manager is not None:
+        try:
+            await session_manager.close()
+        except Exception as e:
+            logger.error(f"Failed to persist trackers on shutdown: {e}")
+    if storage is not None and hasattr(storage, "close"):
+        await storage.close()
+
+def get_frame_analyzer() -> FrameAnalyzer:
+    """Dependency for frame analyzer"""
+    global _frame_analyzer
+    session_manager = get_session_manager()
+    with _lock:
+        if _frame_analyzer is None:
+            _frame_analyzer = FrameAnalyzer(session_manager)
+        return _frame_analyzer
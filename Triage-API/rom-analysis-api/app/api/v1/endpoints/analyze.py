@@ -5,6 +5,7 @@ import logging
 from app.models.requests import FrameAnalysisRequest
 from app.services.frame_analyzer import FrameAnalyzer
 from app.api.dependencies import get_frame_analyzer
+from app.utils.exceptions import InferenceBusyError, PoseDetectionError
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +57,12 @@ async def analyze_frame(
         
     except HTTPException:
         raise
+    except InferenceBusyError as e:
+        logger.warning(f"Rejecting frame for session {request.session_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except PoseDetectionError as e:
+        logger.error(f"Pose detection unavailable for session {request.session_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -21,5 +21,7 @@ async def readiness_check():
     return {
         "status": "ready" if model_ready else "not_ready",
         "model_loaded": model_ready,
+        "inference_backend": ModelManager.backend_info() if model_ready else None,
+        "startup": ModelManager.startup_timings,
         "timestamp": datetime.utcnow().isoformat()
     }
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from app.services.session_manager import SessionManager
 from app.api.dependencies import get_session_manager
+from app.core.pose.processor import PoseProcessor
 
 router = APIRouter()
 
@@ -15,6 +16,17 @@ async def get_session(
         raise HTTPException(status_code=404, detail="Session not found")
     return session_data
 
+@router.post("/session/{session_id}/finalize")
+async def finalize_session(
+    session_id: str,
+    session_manager: SessionManager = Depends(get_session_manager)
+):
+    """Refine the session's ROM with a zero-phase filter over its recorded angles"""
+    result = await session_manager.finalize_session(session_id)
+    if not result["trackers"]:
+        raise HTTPException(status_code=404, detail="No active trackers for session")
+    return result
+
 @router.delete("/session/{session_id}")
 async def clear_session(
     session_id: str,
@@ -22,4 +34,5 @@ async def clear_session(
 ):
     """Clear session data"""
     await session_manager.clear_session(session_id)
+    PoseProcessor().release_session(session_id)
     return {"message": "Session cleared", "session_id": session_id}
\ No newline at end of file
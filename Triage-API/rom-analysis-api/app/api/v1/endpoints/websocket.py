@@ -1,9 +1,11 @@
 # app/api/v1/endpoints/websocket.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from app.models.requests import FrameAnalysisRequest
-from app.services.frame_analyzer import FrameAnalyzer
-from app.services.session_manager import SessionManager
-from app.storage.memory import InMemoryStorage
+from app.api.dependencies import get_frame_analyzer
+from app.utils.exceptions import InferenceBusyError
+from app.services.stream_ingest import LatestItemSlot, StreamSender
+from app.utils.converters import BINARY_FRAME_HEADER, parse_binary_frame
+from app.config import settings
 import json
 import logging
 from typing import Dict, Optional
@@ -35,10 +37,16 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-# Create analyzer instance (singleton pattern already handled in FrameAnalyzer)
-_storage = InMemoryStorage()
-_session_manager = SessionManager(_storage)
-_frame_analyzer = FrameAnalyzer(_session_manager)
+async def _finalize_on_disconnect(frame_analyzer, session_id: str):
+    """Refine the session's ROM once its stream has ended, or at least persist its trackers"""
+    session_manager = frame_analyzer.session_manager
+    try:
+        if settings.FINALIZE_ON_DISCONNECT:
+            await session_manager.finalize_session(session_id)
+        else:
+            await session_manager.flush(session_id, series=True)
+    except Exception as e:
+        logger.error(f"Failed to finalize session {session_id}: {e}")
 
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(
@@ -56,6 +64,8 @@ async def websocket_endpoint(
         logger.error(f"Failed to accept WebSocket: {e}")
         return
     
+    frame_analyzer = get_frame_analyzer()
+    
     # Add to connection manager (don't accept again)
     await manager.connect(websocket, session_id)
     
@@ -82,7 +92,7 @@ async def websocket_endpoint(
                 
                 try:
                     # Analyze frame
-                    result = await _frame_analyzer.analyze(
+                    result = await frame_analyzer.analyze(
                         frame_base64=data["frame_base64"],
                         session_id=session_id,
                         body_part=data["body_part"],
@@ -102,6 +112,11 @@ async def websocket_endpoint(
                             "status": "error"
                         })
                     
+                except InferenceBusyError as e:
+                    await websocket.send_json({
+                        "error": str(e),
+                        "status": "busy"
+                    })
                 except Exception as e:
                     logger.error(f"Error analyzing frame for session {session_id}: {e}")
                     import traceback
@@ -125,6 +140,8 @@ async def websocket_endpoint(
         logger.error(f"WebSocket error for session {session_id}: {e}")
     finally:
         manager.disconnect(session_id)
+        frame_analyzer.pose_processor.release_session(session_id)
+        await _finalize_on_disconnect(frame_analyzer, session_id)
 
 @router.websocket("/ws/stream/{session_id}")
 async def websocket_stream_endpoint(
@@ -134,6 +151,14 @@ async def websocket_stream_endpoint(
     """
     WebSocket endpoint for continuous streaming analysis
     Expects a stream of frames and continuously analyzes them
+    
+    Frames are base64 text (optionally wrapped in JSON) or, when the client
+    sends "frame_format": "binary" in its config, raw JPEG/WebP bytes. With
+    "binary_header": true each binary frame starts with a 12-byte header:
+    uint32 frame number + float64 capture timestamp (ms), little-endian.
+    
+    Only the newest frame waiting for inference is kept; each result reports
+    how many frames were dropped in frames_dropped / total_frames_dropped.
     """
     logger.info(f"WebSocket stream connection attempt for session {session_id}")
     
@@ -145,6 +170,8 @@ async def websocket_stream_endpoint(
         logger.error(f"Failed to accept WebSocket stream: {e}")
         return
     
+    frame_analyzer = get_frame_analyzer()
+    
     # Add to connection manager
     await manager.connect(websocket, session_id)
     
@@ -152,6 +179,9 @@ async def websocket_stream_endpoint(
     body_part = None
     movement_type = None
     include_keypoints = False
+    frame_format = "base64"
+    binary_header = False
+    frame_count = 0
     
     try:
         # First message should be configuration (with timeout)
@@ -160,6 +190,8 @@ async def websocket_stream_endpoint(
             body_part = config_data.get("body_part")
             movement_type = config_data.get("movement_type")
             include_keypoints = config_data.get("include_keypoints", False)
+            frame_format = config_data.get("frame_format", "base64")
+            binary_header = bool(config_data.get("binary_header", False))
             
             if not body_part or not movement_type:
                 await websocket.send_json({
@@ -168,13 +200,26 @@ async def websocket_stream_endpoint(
                 })
                 return
             
+            if frame_format not in ("base64", "binary"):
+                await websocket.send_json({
+                    "error": "frame_format must be 'base64' or 'binary'",
+                    "status": "error"
+                })
+                return
+            
+            ready_config = {
+                "body_part": body_part,
+                "movement_type": movement_type,
+                "include_keypoints": include_keypoints,
+                "frame_format": frame_format
+            }
+            if frame_format == "binary":
+                ready_config["binary_header"] = binary_header
+                ready_config["binary_header_size"] = BINARY_FRAME_HEADER.size if binary_header else 0
+            
             await websocket.send_json({
                 "status": "ready",
-                "config": {
-                    "body_part": body_part,
-                    "movement_type": movement_type,
-                    "include_keypoints": include_keypoints
-                }
+                "config": ready_config
             })
             
         except asyncio.TimeoutError:
@@ -184,83 +229,160 @@ async def websocket_stream_endpoint(
             })
             return
         
-        # Process incoming frames
-        frame_count = 0
-        while True:
-            try:
-                # Receive frame with timeout
-                frame_data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
+        # Receiving, inference and sending run as separate tasks. Only the
+        # newest pending frame and result are kept, so a slow model or a slow
+        # client drops stale frames instead of building up latency
+        inbox = LatestItemSlot()
+        outbox = LatestItemSlot()
+        sender = StreamSender(websocket, settings.STREAM_SEND_TIMEOUT)
+        
+        async def receive_frames():
+            while True:
+                try:
+                    # Receive frame with timeout (text or binary message)
+                    message = await asyncio.wait_for(websocket.receive(), timeout=30.0)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Stream timeout for session {session_id}")
+                    # Send ping to check if connection is alive
+                    await sender.send_json({"type": "ping"})
+                    continue
+                
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                
+                frame_data = message.get("text")
+                frame_bytes = message.get("bytes")
                 
                 # Handle control messages
                 if frame_data == "ping":
-                    await websocket.send_text("pong")
+                    await sender.send_text("pong")
                     continue
                 
+                frame_base64 = None
+                client_frame_number = None
+                capture_timestamp = None
+                
                 try:
-                    # Parse frame data if it's JSON
-                    if frame_data.startswith("{"):
+                    if frame_bytes is not None:
+                        # Raw image bytes, no base64 or JSON parsing needed
+                        client_frame_number, capture_timestamp, frame_bytes = parse_binary_frame(
+                            frame_bytes, binary_header
+                        )
+                    elif frame_data and frame_data.startswith("{"):
+                        # Parse frame data if it's JSON
                         data = json.loads(frame_data)
                         frame_base64 = data.get("frame", data.get("frame_base64"))
                     else:
                         # Assume it's just the base64 frame
                         frame_base64 = frame_data
-                    
-                    if not frame_base64:
-                        await websocket.send_json({
-                            "error": "No frame data provided",
-                            "status": "error"
-                        })
-                        continue
-                    
+                except json.JSONDecodeError:
+                    await sender.send_json({
+                        "error": "Invalid JSON format",
+                        "status": "error"
+                    })
+                    continue
+                except ValueError as e:
+                    await sender.send_json({
+                        "error": str(e),
+                        "status": "error"
+                    })
+                    continue
+                
+                if not frame_base64 and not frame_bytes:
+                    await sender.send_json({
+                        "error": "No frame data provided",
+                        "status": "error"
+                    })
+                    continue
+                
+                # Replace any frame still waiting for the model
+                inbox.put((frame_base64, frame_bytes, client_frame_number, capture_timestamp))
+        
+        async def process_frames():
+            nonlocal frame_count
+            while True:
+                frame, frames_dropped = await inbox.get()
+                if frame is None:
+                    return
+                frame_base64, frame_bytes, client_frame_number, capture_timestamp = frame
+                
+                try:
                     # Analyze frame
-                    result = await _frame_analyzer.analyze(
+                    result = await frame_analyzer.analyze(
                         frame_base64=frame_base64,
                         session_id=session_id,
                         body_part=body_part,
                         movement_type=movement_type,
                         include_keypoints=include_keypoints,
-                        include_visualization=False
+                        include_visualization=False,
+                        frame_bytes=frame_bytes
                     )
-                    
+                except InferenceBusyError as e:
+                    result = {
+                        "error": str(e),
+                        "status": "busy"
+                    }
+                except Exception as e:
+                    logger.error(f"Error in stream analysis: {e}")
+                    result = {
+                        "error": f"Analysis failed: {str(e)}",
+                        "status": "error"
+                    }
+                else:
                     # Add frame number and status
                     if isinstance(result, dict):
                         result["frame_number"] = frame_count
+                        if client_frame_number is not None:
+                            result["client_frame_number"] = client_frame_number
+                            result["capture_timestamp"] = capture_timestamp
                         result["status"] = "success"
                         frame_count += 1
-                        
-                        # Send result
-                        await websocket.send_json(result)
                     else:
-                        await websocket.send_json({
+                        result = {
                             "error": "Invalid result format",
                             "status": "error"
-                        })
-                    
-                except json.JSONDecodeError:
-                    await websocket.send_json({
-                        "error": "Invalid JSON format",
-                        "status": "error"
-                    })
-                except Exception as e:
-                    logger.error(f"Error in stream analysis: {e}")
-                    await websocket.send_json({
-                        "error": f"Analysis failed: {str(e)}",
-                        "status": "error"
-                    })
-                    
-            except asyncio.TimeoutError:
-                logger.warning(f"Stream timeout for session {session_id}")
-                # Send ping to check if connection is alive
-                try:
-                    await websocket.send_json({"type": "ping"})
-                except:
-                    break
+                        }
+                
+                result["frames_dropped"] = frames_dropped
+                result["total_frames_dropped"] = inbox.total_dropped
+                
+                # Replace any result the client has not picked up yet
+                outbox.put(result)
+        
+        async def send_results():
+            while True:
+                result, _ = await outbox.get()
+                if result is None:
+                    return
+                result["results_dropped"] = outbox.total_dropped
+                await sender.send_json(result)
+        
+        tasks = [
+            asyncio.create_task(receive_frames()),
+            asyncio.create_task(process_frames()),
+            asyncio.create_task(send_results())
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                # Re-raise the disconnect or error that ended the stream
+                task.result()
+        finally:
+            inbox.close()
+            outbox.close()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
                     
     except WebSocketDisconnect:
         logger.info(f"Stream ended for session {session_id} after {frame_count} frames")
+    except asyncio.TimeoutError:
+        logger.warning(f"Closing stream for session {session_id}: client is not keeping up with results")
     except Exception as e:
         logger.error(f"WebSocket stream error for session {session_id}: {e}")
         import traceback
         logger.error(traceback.format_exc())
     finally:
-        manager.disconnect(session_id)
\ No newline at end of file
+        manager.disconnect(session_id)
+        frame_analyzer.pose_processor.release_session(session_id)
+        await _finalize_on_disconnect(frame_analyzer, session_id)
\ No newline at end of file
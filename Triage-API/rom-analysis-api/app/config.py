@@ -1,6 +1,5 @@
 from typing import List
 from pydantic_settings import BaseSettings
-import torch
 
 class Settings(BaseSettings):
     # API Settings
@@ -12,18 +11,97 @@ class Settings(BaseSettings):
     # Model Settings - Using best/performance model
     POSE_MODEL: str = "body_with_feet"
     POSE_MODE: str = "performance"  # Changed from lightweight to performance
-    DEVICE: str = "cuda" if torch.cuda.is_available() else "cpu"  # Auto-detect GPU
+    DEVICE: str = "auto"  # auto picks cuda when ONNX Runtime can use it, see resolve_device()
     BACKEND: str = "onnxruntime"  # Best backend for performance
+    POSE_MODEL_POOL: List[str] = []  # Lighter "<mode>:<model>" models, cheapest first, used when they have every keypoint a movement needs
+    POSE_REGION_CROP: bool = False  # Crop each session's frames to the body region its movement needs
+    POSE_REGION_MARGIN: float = 0.5  # Crop padding on every side, as a fraction of the region's longest side
     
     # Processing Settings
     CONFIDENCE_THRESHOLD: float = 0.3
     MIN_KEYPOINTS_RATIO: float = 0.5
     ANGLE_SMOOTHING_WINDOW: int = 5
     
+    # Startup Settings
+    STARTUP_WARMUP_FRAMES: int = 2  # Synthetic frames run after the model loads, 0 skips warm-up
+    
+    # Decode Settings
+    DECODE_MAX_SIDE: int = 0  # Longest side frames are decoded to, 0 matches the person detector's input size
+    
+    # Inference Executor Settings
+    INFERENCE_WORKERS: int = 2  # Threads running decode/inference/angle maths
+    INFERENCE_QUEUE_SIZE: int = 4  # Frames allowed to wait for a free worker
+    INFERENCE_BATCH_WINDOW_MS: float = 0.0  # Cross-session batching window, 0 disables batching
+    INFERENCE_BATCH_MAX_SIZE: int = 8  # Batches are also capped by INFERENCE_WORKERS
+    
+    # Streaming Settings
+    STREAM_SEND_TIMEOUT: float = 5.0  # Seconds a slow client may block a send before the stream is closed
+    
+    # Inference Backend Settings
+    INFERENCE_BACKEND: str = "default"  # default, ort_cpu, openvino_cpu, ort_int8, or auto to benchmark at startup
+    INFERENCE_BACKEND_CANDIDATES: List[str] = ["default", "ort_cpu", "openvino_cpu", "ort_int8"]
+    INFERENCE_BACKEND_BENCHMARK_ITERATIONS: int = 10
+    ORT_INTRA_OP_THREADS: int = 0  # 0 splits the cores between concurrent frames
+    ORT_INTER_OP_THREADS: int = 0  # 0 lets ONNX Runtime decide
+    QUANTIZED_MODEL_DIR: str = ""  # Where <model>.int8.onnx files live, empty looks next to the FP32 models
+    
+    # Inference Process Pool Settings
+    INFERENCE_PROCESSES: int = 0  # Worker processes running pose detection, 0 runs it in the API process
+    INFERENCE_PROCESS_SLOTS: int = 4  # Frames each worker process can hold in shared memory
+    INFERENCE_PROCESS_MAX_FRAME_BYTES: int = 1920 * 1080 * 3  # Largest decoded frame a slot can hold
+    
+    # Person Detection Settings
+    DET_FREQUENCY: int = 5  # Run the person detector every N frames per session, 1 detects every frame
+    DET_REFRESH_CONFIDENCE: float = 0.4  # Detect again early when mean keypoint confidence drops below this
+    MAX_TRACKED_SESSIONS: int = 256  # Sessions whose person boxes are kept between frames
+    
+    # Keypoint Filter Settings
+    KEYPOINT_FILTER: str = "one_euro"  # one_euro, kalman or none, movements can override it
+    KEYPOINT_MAX_GAP_FRAMES: int = 5  # Frames a missing keypoint is filled from the filter's estimate
+    ONE_EURO_MIN_CUTOFF: float = 1.0  # Hz, lower smooths slow movement more
+    ONE_EURO_BETA: float = 0.05  # Cutoff increase per px/s of speed, higher lags less on fast movement
+    KALMAN_PROCESS_NOISE: float = 500.0  # Acceleration standard deviation, px/s^2
+    KALMAN_MEASUREMENT_NOISE: float = 4.0  # Keypoint position standard deviation, px
+    
+    # ROM Tracking Settings
+    ROM_HOLD_FRAMES: int = 3  # Valid frames an angle must be held before it counts as min/max
+    REP_MIN_PROMINENCE: float = 15.0  # Degrees a repetition must move away from rest and back
+    REP_HOLD_SPEED: float = 10.0  # Degrees per second below which a repetition is holding
+    REP_HISTORY: int = 20  # Repetitions kept per tracker
+    ROM_SERIES_MAX_FRAMES: int = 18000  # Newest primary angles kept per tracker for session-end refinement
+    FINALIZE_FILTER: str = "butterworth"  # Zero-phase filter at session end: butterworth, savgol or none
+    FINALIZE_CUTOFF_HZ: float = 6.0  # Butterworth low-pass cutoff
+    FINALIZE_ON_DISCONNECT: bool = True  # Refine the session's ROM when its WebSocket closes
+    
     # Storage Settings
     USE_REDIS: bool = False
     REDIS_URL: str = "redis://localhost:6379"
     SESSION_TTL: int = 3600  # 1 hour
+    PERSIST_INTERVAL_S: float = 2.0  # Longest a tracker update waits to be written to storage, 0 writes every frame
+    PERSIST_MAX_FRAMES: int = 30  # Unsaved updates after which a tracker is written right away
+    MAX_CACHED_TRACKERS: int = 1024  # Trackers kept in memory per process, least recently used are written and dropped
+    MEMORY_STORE_MAX_ENTRIES: int = 100000  # Keys kept by the in-memory store, 0 for no limit
+    MEMORY_STORE_MAX_MB: int = 512  # Approximate value memory of the in-memory store, 0 for no limit
+    MEMORY_STORE_SWEEP_S: float = 30.0  # Seconds between expired-key sweeps of the in-memory store
+    REDIS_MAX_CONNECTIONS: int = 20  # Connection pool size per API process
+    REDIS_SCAN_COUNT: int = 500  # Keys per SCAN call when listing or deleting a session's keys
+    
+    # Multi-Worker Settings (python -m app.dispatch)
+    WORKERS: int = 2  # API worker processes behind the dispatcher, each loads its own pose model
+    DISPATCHER_SOCKET_DIR: str = ""  # Where worker Unix sockets are created, empty uses a temporary directory
+    WORKER_HEALTH_INTERVAL_S: float = 5.0  # Seconds between worker health checks
+    WORKER_START_TIMEOUT_S: float = 300.0  # Longest the dispatcher waits for workers to answer at startup
+    HASH_RING_REPLICAS: int = 64  # Points per worker on the session hash ring
+    
+    def resolve_device(self) -> str:
+        """Resolve DEVICE=auto from ONNX Runtime's providers, without importing torch"""
+        if self.DEVICE != "auto":
+            return self.DEVICE
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return "cpu"
+        return "cuda" if "CUDAExecutionProvider" in ort.get_available_providers() else "cpu"
     
     class Config:
         env_file = ".env"
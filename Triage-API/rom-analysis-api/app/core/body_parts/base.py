@@ -47,4 +47,48 @@ class Movement(ABC):
         elif angle > max_range:
             return "above_normal"
         else:
-            return "normal"
\ No newline at end of file
+            return "normal"
+    
+    @property
+    def keypoint_filter(self) -> Optional[str]:
+        """Temporal keypoint filter for this movement, None uses the configured default"""
+        return None
+    
+    @property
+    def max_range(self) -> Tuple[float, float]:
+        """Safe ROM range (min, max) in degrees"""
+        return self.normal_range
+    
+    def validate_rom(self, angle_value: float) -> Dict[str, any]:
+        """Validate if ROM is within normal/safe ranges"""
+        normal_min, normal_max = self.normal_range
+        max_min, max_max = self.max_range
+
+        result = {
+            'valid': True,
+            'in_normal_range': normal_min <= angle_value <= normal_max,
+            'in_max_range': max_min <= angle_value <= max_max,
+            'normal_range': self.normal_range,
+            'max_range': self.max_range
+        }
+
+        if angle_value < max_min:
+            result['message'] = f"Angle {angle_value:.1f}° is below minimum safe range"
+            result['valid'] = False
+        elif angle_value > max_max:
+            result['message'] = f"Angle {angle_value:.1f}° exceeds maximum safe range"
+            result['valid'] = False
+        elif not result['in_normal_range']:
+            result['message'] = f"Angle {angle_value:.1f}° is outside normal range"
+        else:
+            result['message'] = "Angle is within normal range"
+
+        return result
+
+    def guidance(self, current_angle: float, validation: Dict) -> Dict[str, str]:
+        """Movement guidance for the current primary angle"""
+        return {
+            "instruction": "",
+            "feedback": validation['message'],
+            "improvement": ""
+        }
\ No newline at end of file
@@ -0,0 +1,236 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+from app.core.body_parts.base import Movement
+from physiotrack_core.keypoint_filters import KEYPOINT_FILTERS
+from physiotrack_core.angle_computation import ANGLE_DEFINITIONS, calculate_all_angles, calculate_angle_between_points
+from physiotrack_core.rom_calculations import ROMCalculator
+
+# Formula step: (keypoints, joint angles by flip setting, angles so far) -> None
+AngleStep = Callable[[Dict[str, np.ndarray], Dict[bool, Dict[str, float]], Dict[str, float]], None]
+
+# Position rule: (keypoints, movement) -> (valid, message) when the rule decides, else None
+PositionRule = Callable[[Dict[str, np.ndarray], "CompiledMovement"], Optional[Tuple[bool, str]]]
+
+def _compile_transform(steps: List[Tuple]) -> Callable[[float], float]:
+    """Transform steps to one function"""
+    def transform(value: float) -> float:
+        for step in steps:
+            if step[0] == "add":
+                value = value + step[1]
+            elif step[0] == "multiply":
+                value = value * step[1]
+            else:
+                value = max(step[1], min(step[2], value))
+        return value
+
+    for step in steps:
+        if step[0] not in ("add", "multiply", "clamp"):
+            raise ValueError(f"Unknown transform step: {step[0]}")
+    return transform if steps else (lambda value: value)
+
+def _compile_angle(formula: Dict) -> AngleStep:
+    """One angle formula to a step that adds its angles"""
+    if "function" in formula:
+        function = formula["function"]
+        def step(keypoints, joint_angles, angles):
+            # Plain floats, NumPy scalars don't serialize
+            angles.update((name, float(value)) for name, value in function(keypoints).items())
+        return step
+
+    name = formula["name"]
+    transform = _compile_transform(formula.get("transform", []))
+
+    if "angle" in formula:
+        if formula["angle"] not in ANGLE_DEFINITIONS:
+            raise ValueError(f"Unknown angle: {formula['angle']}")
+        source, flip = formula["angle"], formula.get("flip", True)
+        def step(keypoints, joint_angles, angles):
+            value = joint_angles[flip].get(source)
+            if value is not None:
+                angles[name] = transform(value)
+        return step
+
+    if "segment" in formula:
+        start, end = formula["segment"]
+        reference = formula.get("reference", "horizontal")
+        def step(keypoints, joint_angles, angles):
+            if start in keypoints and end in keypoints:
+                angles[name] = transform(calculate_angle_between_points(keypoints[start], keypoints[end], reference))
+        return step
+
+    raise ValueError(f"Angle formula needs 'angle', 'segment' or 'function': {formula}")
+
+def _formula_points(formulas: List[Dict]) -> List[str]:
+    """Keypoints the angle formulas read, in order"""
+    points = []
+    for formula in formulas:
+        if "angle" in formula:
+            names = ANGLE_DEFINITIONS[formula["angle"]]["points"]
+        else:
+            names = formula.get("segment", ())
+        points.extend(name for name in names if name not in points)
+    return points
+
+def _exceeds(value: float, rule: Dict) -> bool:
+    """Whether a value is past the rule's below/above threshold"""
+    if "below" in rule and value < rule["below"]:
+        return True
+    return "above" in rule and value > rule["above"]
+
+def _compile_rule(rule: Dict) -> PositionRule:
+    """One validation rule to a check"""
+    result = (rule.get("valid", False), rule["message"])
+    check = rule["check"]
+
+    if check == "distance":
+        a, b = rule["points"]
+        fraction, reference = rule.get("below_fraction", (None, None))
+        def check_distance(keypoints, movement):
+            if a not in keypoints or b not in keypoints:
+                return None
+            distance = np.linalg.norm(keypoints[a] - keypoints[b])
+            if fraction is not None:
+                c, d = reference
+                if c not in keypoints or d not in keypoints:
+                    return None
+                return result if distance < fraction * np.linalg.norm(keypoints[c] - keypoints[d]) else None
+            return result if _exceeds(distance, rule) else None
+        return check_distance
+
+    if check == "tilt":
+        start, end = rule["points"]
+        def check_tilt(keypoints, movement):
+            if start not in keypoints or end not in keypoints:
+                return None
+            vector = keypoints[end] - keypoints[start]
+            tilt = np.degrees(np.arctan2(abs(vector[0]), -vector[1]))
+            return result if _exceeds(tilt, rule) else None
+        return check_tilt
+
+    if check == "angle":
+        angle_name = rule["angle"]
+        def check_angle(keypoints, movement):
+            value = movement.calculate_angles(keypoints).get(angle_name)
+            return result if value is not None and _exceeds(value, rule) else None
+        return check_angle
+
+    raise ValueError(f"Unknown validation check: {check}")
+
+class CompiledMovement(Movement):
+    """Movement evaluator compiled once from a declarative spec, shared by all sessions"""
+
+    def __init__(self, body_part: str, movement_type: str, spec: Dict):
+        self.body_part = body_part
+        self.movement_type = movement_type
+        self._name = f"{body_part}_{movement_type}"
+
+        # ROMCalculator supplies anything the spec leaves out
+        rom_config = ROMCalculator.MOVEMENT_ANGLES.get(body_part, {}).get(movement_type, {})
+        self._primary_angle = spec.get("primary_angle", rom_config.get("primary"))
+        self._normal_range = tuple(spec.get("normal_range", rom_config.get("normal_range", (0, 0))))
+        self._max_range = tuple(spec.get("max_range", rom_config.get("max_range", self._normal_range)))
+        if not self._primary_angle:
+            raise ValueError(f"No primary angle for {self._name}")
+
+        self._required_keypoints = list(spec.get("required_keypoints") or _formula_points(spec["angles"]))
+        self._angle_steps = [_compile_angle(formula) for formula in spec["angles"]]
+        self._rules = [_compile_rule(rule) for rule in spec.get("validation", [])]
+
+        # Joint angles needed per flip setting, computed in one engine pass each
+        self._joint_angles: Dict[bool, List[str]] = {}
+        for formula in spec["angles"]:
+            if "angle" in formula:
+                self._joint_angles.setdefault(formula.get("flip", True), []).append(formula["angle"])
+
+        self._keypoint_filter = spec.get("keypoint_filter")
+        if self._keypoint_filter not in (None, "none") and self._keypoint_filter not in KEYPOINT_FILTERS:
+            raise ValueError(f"Unknown keypoint filter for {self._name}: {self._keypoint_filter}")
+
+        self._guidance = spec.get("guidance")
+        self._phases = [(phase[0], phase[1], phase[2] if len(phase) > 2 else "<") for phase in spec.get("phases", [])]
+        self._default_phase = spec.get("default_phase")
+        self._cache_key = f"movement:{self._name}"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def required_keypoints(self) -> List[str]:
+        return self._required_keypoints
+
+    @property
+    def primary_angle(self) -> str:
+        return self._primary_angle
+
+    @property
+    def normal_range(self) -> Tuple[float, float]:
+        return self._normal_range
+
+    @property
+    def max_range(self) -> Tuple[float, float]:
+        return self._max_range
+
+    @property
+    def keypoint_filter(self) -> Optional[str]:
+        return self._keypoint_filter
+
+    def calculate_angles(self, keypoints: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """Calculate all angles for this movement"""
+        # Keypoint sets keep the result, so validation and the response share it
+        cache = getattr(keypoints, "cache", None)
+        if cache is not None and self._cache_key in cache:
+            return dict(cache[self._cache_key])
+
+        joint_angles = {
+            flip: calculate_all_angles(keypoints, names, flip_left_right=flip)
+            for flip, names in self._joint_angles.items()
+        }
+        angles: Dict[str, float] = {}
+        for step in self._angle_steps:
+            step(keypoints, joint_angles, angles)
+
+        if cache is not None:
+            cache[self._cache_key] = angles
+            return dict(angles)
+        return angles
+
+    def validate_position(self, keypoints: Dict[str, np.ndarray]) -> Tuple[bool, str]:
+        """Validate if the position is correct for this movement"""
+        missing = [k for k in self._required_keypoints if k not in keypoints]
+        if missing:
+            return False, f"Cannot detect: {', '.join(missing)}"
+
+        for rule in self._rules:
+            result = rule(keypoints, self)
+            if result is not None:
+                return result
+
+        return True, "Position is correct"
+
+    def guidance(self, current_angle: float, validation: Dict) -> Dict[str, str]:
+        """Movement guidance for the current primary angle"""
+        guidance = {
+            "instruction": "",
+            "feedback": validation['message'],
+            "improvement": ""
+        }
+        if not self._guidance:
+            return guidance
+
+        value = abs(current_angle) if self._guidance.get("measure") == "abs" else current_angle
+        matched = next((rule for rule in self._guidance["rules"] if _exceeds(value, rule)), self._guidance["default"])
+        guidance["instruction"] = matched["instruction"]
+        guidance["improvement"] = matched["improvement"]
+        return guidance
+
+    def get_movement_phase(self, angle: float) -> str:
+        """Determine movement phase based on angle"""
+        if not self._phases:
+            return super().get_movement_phase(angle)
+
+        for bound, label, op in self._phases:
+            if angle < bound or (op == "<=" and angle == bound):
+                return label
+        return self._default_phase
\ No newline at end of file
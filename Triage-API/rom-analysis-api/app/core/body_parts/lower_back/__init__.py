@@ -1,12 +0,0 @@
-# app/core/body_parts/lower_back/__init__.py
-from .flexion import LowerBackFlexion
-from .extension import LowerBackExtension
-from .lateral_flexion import LowerBackLateralFlexion
-from .rotation import LowerBackRotation
-
-__all__ = [
-    'LowerBackFlexion',
-    'LowerBackExtension', 
-    'LowerBackLateralFlexion',
-    'LowerBackRotation'
-]
\ No newline at end of file
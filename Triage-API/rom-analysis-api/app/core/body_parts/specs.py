@@ -0,0 +1,154 @@
+"""
+Declarative movement specs, compiled into MovementRegistry at startup
+
+Each spec describes one movement:
+    required_keypoints: keypoints that must be detected (default: the points of its angles)
+    primary_angle: angle used for ROM (default: ROMCalculator primary)
+    normal_range / max_range: ROM ranges (default: ROMCalculator ranges)
+    angles: angle formulas, evaluated in order
+        {"name", "angle": ANGLE_DEFINITIONS name, "flip": bool, "transform": [...]}
+        {"name", "segment": (start, end), "reference": "vertical" | "horizontal", "transform": [...]}
+        {"function": callable(keypoints) -> Dict[str, float]}
+        transform steps: ("add", v), ("multiply", v), ("clamp", low, high)
+    validation: position rules checked in order after the keypoints check, the
+        first that matches decides (valid defaults to False)
+        {"check": "distance", "points": (a, b), "below" | "above": px, "message"}
+        {"check": "distance", "points": (a, b), "below_fraction": (f, (c, d)), "message"}
+        {"check": "tilt", "points": (start, end), "above": deg, "message"}
+        {"check": "angle", "angle": name, "above" | "below": deg, "message"}
+    guidance: instruction/improvement thresholds on the primary angle
+        {"measure": "value" | "abs", "rules": [{"below" | "above", "instruction", "improvement"}],
+         "default": {"instruction", "improvement"}}
+    phases: [(bound, label), ...] checked in order with angle < bound
+        (or (bound, label, "<=")), then "default_phase"
+    keypoint_filter: "one_euro" | "kalman" | "none" (default: KEYPOINT_FILTER setting)
+"""
+from physiotrack_core.rom_calculations import calculate_lower_back_rotation
+
+LOWER_BACK_KEYPOINTS = ["Neck", "Hip", "LHip", "RHip", "LShoulder", "RShoulder"]
+
+FACING_CAMERA = {
+    "check": "distance",
+    "points": ("LShoulder", "RShoulder"),
+    "below": 50,
+    "message": "Please face the camera directly"
+}
+
+TRUNK = {"name": "trunk", "segment": ("Neck", "Hip"), "reference": "vertical"}
+PELVIS = {"name": "pelvis", "segment": ("LHip", "RHip"), "reference": "horizontal"}
+
+def _joint(name: str, *transform) -> dict:
+    """A ROMCalculator joint angle, flipped for consistent left/right measurement"""
+    return {"name": name, "angle": name, "transform": list(transform)}
+
+MOVEMENT_SPECS = {
+    "lower_back": {
+        "flexion": {
+            "required_keypoints": LOWER_BACK_KEYPOINTS,
+            "angles": [
+                {**TRUNK, "transform": [("multiply", -1), ("add", 180)]},
+                PELVIS,
+                _joint("right hip"),
+                _joint("left hip")
+            ],
+            "validation": [FACING_CAMERA],
+            "guidance": {
+                "measure": "value",
+                "rules": [
+                    {"below": 10, "instruction": "Bend forward slowly from your hips",
+                     "improvement": "Try to increase your forward bend"},
+                    {"above": 60, "instruction": "You've reached good flexion",
+                     "improvement": "Hold this position or slowly return"}
+                ],
+                "default": {"instruction": "Good position, continue the movement",
+                            "improvement": "Maintain smooth, controlled motion"}
+            }
+        },
+        "extension": {
+            "required_keypoints": LOWER_BACK_KEYPOINTS,
+            "angles": [
+                {**TRUNK, "transform": [("add", -180)]},
+                PELVIS
+            ],
+            "validation": [
+                FACING_CAMERA,
+                {"check": "angle", "angle": "trunk", "above": 30,
+                 "message": "Please stand upright before extending"}
+            ],
+            "guidance": {
+                "measure": "value",
+                "rules": [
+                    {"above": -5, "instruction": "Lean backward slowly",
+                     "improvement": "Engage your core for support"},
+                    {"below": -30, "instruction": "Maximum extension reached",
+                     "improvement": "Don't push beyond comfort"}
+                ],
+                "default": {"instruction": "Good extension position",
+                            "improvement": "Keep the movement controlled"}
+            }
+        },
+        "lateral_flexion": {
+            "required_keypoints": ["Neck", "Hip", "LShoulder", "RShoulder", "LHip", "RHip"],
+            "angles": [
+                {"name": "trunk", "segment": ("Hip", "Neck"), "reference": "vertical"},
+                {"name": "shoulders", "segment": ("LShoulder", "RShoulder"), "reference": "horizontal"},
+                PELVIS
+            ],
+            "validation": [FACING_CAMERA],
+            "guidance": {
+                "measure": "abs",
+                "rules": [
+                    {"below": 5, "instruction": "Bend sideways from your waist",
+                     "improvement": "Keep your body in one plane"},
+                    {"above": 30, "instruction": "Good lateral flexion achieved",
+                     "improvement": "Try the other side for balance"}
+                ],
+                "default": {"instruction": "Continue the side bend",
+                            "improvement": "Keep shoulders and hips aligned"}
+            }
+        },
+        "rotation": {
+            "required_keypoints": ["LShoulder", "RShoulder", "LHip", "RHip", "Neck", "Hip"],
+            "primary_angle": "trunk_rotation",
+            "angles": [{"function": calculate_lower_back_rotation}],
+            "validation": [
+                {"check": "tilt", "points": ("Hip", "Neck"), "above": 30,
+                 "message": "Please stand more upright for rotation measurement"}
+            ],
+            "guidance": {
+                "measure": "abs",
+                "rules": [
+                    {"below": 10, "instruction": "Rotate your upper body",
+                     "improvement": "Keep hips facing forward"},
+                    {"above": 45, "instruction": "Maximum rotation reached",
+                     "improvement": "Hold briefly, then return"}
+                ],
+                "default": {"instruction": "Good rotation angle",
+                            "improvement": "Maintain controlled movement"}
+            }
+        }
+    },
+    "shoulder": {
+        "flexion": {"angles": [_joint("right shoulder")]},
+        "extension": {"angles": [_joint("right shoulder", ("multiply", -1))]},
+        "abduction": {"angles": [_joint("right shoulder")]},
+        "adduction": {"angles": [_joint("right shoulder")]}
+    },
+    "elbow": {
+        "flexion": {"angles": [_joint("right elbow", ("multiply", -1), ("add", 180))]},
+        "extension": {"angles": [_joint("right elbow")]}
+    },
+    "hip": {
+        "flexion": {"angles": [_joint("right hip")]},
+        "extension": {"angles": [_joint("right hip", ("multiply", -1))]},
+        "abduction": {"angles": [_joint("right hip")]}
+    },
+    "knee": {
+        "flexion": {"angles": [_joint("right knee", ("multiply", -1))]},
+        "extension": {"angles": [_joint("right knee")]}
+    },
+    "ankle": {
+        "dorsiflexion": {"angles": [_joint("right ankle", ("add", -90))]},
+        "plantarflexion": {"angles": [_joint("right ankle", ("multiply", -1), ("add", 90))]}
+    }
+}
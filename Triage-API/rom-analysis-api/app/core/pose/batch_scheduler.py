@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class InferenceBatcher:
+    """Collect frames from all sessions for a short window and run them as one batch"""
+
+    def __init__(self, detector, window_ms: float, max_batch_size: int):
+        self.detector = detector
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+
+        # Batch statistics
+        self.batches_run = 0
+        self.frames_run = 0
+
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Optional[str], Future]]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="inference-batcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Inference batcher started (window={window_ms}ms, max_batch_size={self.max_batch_size})"
+        )
+
+    def submit(self, frame: np.ndarray, session_id: Optional[str] = None) -> Future:
+        """Queue a frame for the next batch"""
+        future: Future = Future()
+        self._queue.put((frame, session_id, future))
+        return future
+
+    def detect(self, frame: np.ndarray, session_id: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Detect poses in a frame, blocking until its batch has run"""
+        return self.submit(frame, session_id).result()
+
+    @property
+    def average_batch_size(self) -> float:
+        """Average number of frames per model call so far"""
+        return self.frames_run / self.batches_run if self.batches_run else 0.0
+
+    def close(self):
+        """Stop the batching thread after the queued frames have run"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        deferred: List[Tuple[np.ndarray, Optional[str], Future]] = []
+        while True:
+            if deferred:
+                batch, deferred = deferred, []
+            else:
+                item = self._queue.get()
+                if item is None:
+                    return
+                batch = [item]
+
+            stop = False
+            deadline = time.monotonic() + self.window_s
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Drain frames that are already waiting even when the window is over
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            batch, deferred = self._one_frame_per_session(batch)
+            self._run_batch(batch)
+            if stop:
+                while deferred:
+                    batch, deferred = self._one_frame_per_session(deferred)
+                    self._run_batch(batch)
+                return
+
+    @staticmethod
+    def _one_frame_per_session(batch: List[Tuple[np.ndarray, Optional[str], Future]]):
+        """
+        Split off later frames of sessions already in the batch
+
+        A session's frame reuses the person boxes of its previous one, so two
+        of its frames can't run in the same batch. The deferred frames start
+        the next batch, in arrival order.
+        """
+        kept, deferred, sessions = [], [], set()
+        for item in batch:
+            session_id = item[1]
+            if session_id is not None and session_id in sessions:
+                deferred.append(item)
+                continue
+            sessions.add(session_id)
+            kept.append(item)
+        return kept, deferred
+
+    def _run_batch(self, batch: List[Tuple[np.ndarray, Optional[str], Future]]):
+        frames = [frame for frame, _, _ in batch]
+        session_ids = [session_id for _, session_id, _ in batch]
+        try:
+            results = self.detector.detect_batch(frames, session_ids)
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(frames)} frames: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches_run += 1
+        self.frames_run += len(frames)
+        logger.debug(f"Ran inference batch of {len(frames)} frames")
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
\ No newline at end of file
@@ -1,7 +1,10 @@
 import logging
-from typing import Optional
+import time
+from typing import Dict, Optional
 from threading import Lock
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 class ModelManager:
@@ -10,6 +13,9 @@ class ModelManager:
     _initialized: bool = False
     _lock = Lock()
     
+    # Startup phase durations in seconds, reported by the readiness check
+    startup_timings: Dict[str, float] = {}
+    
     @classmethod
     def initialize(cls):
         """Initialize the pose detection model"""
@@ -20,7 +26,9 @@ class ModelManager:
                     from app.core.pose.processor import PoseProcessor
                     
                     # Create instance to load model
+                    start = time.perf_counter()
                     processor = PoseProcessor()
+                    cls.startup_timings["model_load_s"] = round(time.perf_counter() - start, 3)
                     
                     # Verify it's initialized
                     if processor.is_initialized:
@@ -33,7 +41,41 @@ class ModelManager:
                     logger.error(f"Failed to initialize pose model: {e}")
                     raise
     
+    @classmethod
+    def warm_up(cls, frames: int):
+        """Run synthetic frames through the model so the first request doesn't pay for lazy allocations"""
+        from app.core.pose.processor import PoseProcessor
+        from app.config import settings
+        
+        if frames <= 0 or not cls._initialized:
+            return
+        
+        processor = PoseProcessor()
+        side = processor.decode_max_side or 640
+        frame = np.random.default_rng(0).integers(0, 255, size=(side * 3 // 4, side, 3), dtype=np.uint8)
+        
+        # Every worker process, and every model of the pool, has its own model to warm up
+        runs = max(frames, settings.INFERENCE_PROCESSES)
+        start = time.perf_counter()
+        for model in processor.models:
+            for _ in range(runs):
+                model.detect(frame)
+        cls.startup_timings["warmup_s"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Pose model warmed up with {runs} frames in {cls.startup_timings['warmup_s']}s")
+    
     @classmethod
     def is_initialized(cls) -> bool:
         """Check if model is initialized"""
-        return cls._initialized
\ No newline at end of file
+        return cls._initialized
+    
+    @classmethod
+    def backend_info(cls) -> Dict:
+        """Inference backend in use and the startup benchmark results"""
+        from app.core.pose.processor import PoseProcessor
+        
+        latency = PoseProcessor.backend_latency_ms
+        return {
+            "name": PoseProcessor.backend_name,
+            "latency_ms": round(latency, 2) if latency is not None else None,
+            "benchmark": PoseProcessor.backend_benchmark
+        }
\ No newline at end of file
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from physiotrack_core.keypoint_definitions import VIRTUAL_KEYPOINTS, get_layout
+
+# Keypoints closer than this fraction of the crop to its border trigger a re-crop
+REGION_EDGE_FRACTION = 0.1
+
+# Smallest crop side in pixels, the pose model needs some context around the joints
+MIN_REGION_SIDE = 96
+
+def parse_model_pool(entries: Iterable[str]) -> List[Tuple[str, str]]:
+    """(mode, model) of each "<mode>:<model>" pool entry"""
+    pool = []
+    for entry in entries:
+        mode, sep, model = entry.partition(":")
+        if not sep or not mode or not model:
+            raise ValueError(f"Model pool entries look like <mode>:<model>, got {entry!r}")
+        pool.append((mode.strip(), model.strip()))
+    return pool
+
+class PoolModel:
+    """One pose model of the pool, with its batcher when cross-session batching is on"""
+
+    def __init__(self, mode: str, model: str, detector, batcher=None):
+        self.mode = mode
+        self.model = model
+        self.detector = detector
+        self.batcher = batcher
+        # Model keypoints plus the virtual ones they can derive
+        self.keypoints = frozenset(get_layout(detector.keypoint_names).names)
+        self._index = {name: i for i, name in enumerate(detector.keypoint_names)}
+        self._indices_cache = {}
+
+    @property
+    def name(self) -> str:
+        return f"{self.mode}:{self.model}"
+
+    def covers(self, required_keypoints: Iterable[str]) -> bool:
+        """Check whether the model provides every required keypoint"""
+        return self.keypoints.issuperset(required_keypoints)
+
+    def indices(self, names: Iterable[str]) -> np.ndarray:
+        """Model output indices of the named keypoints, virtual ones replaced by their sources"""
+        key = frozenset(names)
+        cached = self._indices_cache.get(key)
+        if cached is None:
+            model_names = set()
+            for name in key:
+                model_names.update([name] if name in self._index else VIRTUAL_KEYPOINTS.get(name, ()))
+            cached = np.array(sorted(self._index[n] for n in model_names if n in self._index), dtype=np.intp)
+            self._indices_cache[key] = cached
+        return cached
+
+    def detect(self, frame: np.ndarray, session_id: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if self.batcher is not None:
+            return self.batcher.detect(frame, session_id)
+        return self.detector.detect(frame, session_id)
+
+    def release_session(self, session_id: str):
+        self.detector.release_session(session_id)
+
+    def close(self):
+        """Stop the batching thread and worker processes if the model has them"""
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+        if hasattr(self.detector, "close"):
+            self.detector.close()
+
+class RegionCropper:
+    """
+    Per-session crop of the frame around the keypoints a movement needs
+
+    A session's region is the box around its required keypoints, expanded by
+    margin times its longest side on every side. It stays fixed while those
+    keypoints are detected well inside it, so the detector's person boxes
+    stay valid, and is dropped otherwise so the next frame runs uncropped.
+    """
+
+    def __init__(self, max_sessions: int = 256, margin: float = 0.5):
+        self.max_sessions = max(1, max_sessions)
+        self.margin = margin
+        self._regions: "OrderedDict[str, Tuple[int, int, int, int]]" = OrderedDict()
+        self._lock = Lock()
+
+    def region(self, session_id: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+        """The session's (x1, y1, x2, y2) crop, or None to run on the whole frame"""
+        if session_id is None:
+            return None
+        with self._lock:
+            region = self._regions.get(session_id)
+            if region is not None:
+                self._regions.move_to_end(session_id)
+            return region
+
+    def update(
+        self,
+        session_id: Optional[str],
+        points: Optional[np.ndarray],
+        frame_shape: Sequence[int]
+    ) -> bool:
+        """
+        Keep, move or drop the session's region after a frame
+
+        Args:
+            session_id: Session the frame belongs to
+            points: (N, 2) required keypoints in frame coordinates, None when
+                any of them wasn't detected
+            frame_shape: Shape of the whole frame
+
+        Returns:
+            True when the region changed, the detector's tracking state of the
+            session is then in the wrong coordinates
+        """
+        if session_id is None:
+            return False
+
+        current = self.region(session_id)
+        if points is None or len(points) == 0:
+            region = None
+        elif current is not None and self._well_inside(points, current):
+            return False
+        else:
+            region = self._region_around(points, frame_shape)
+
+        if region == current:
+            return False
+        self._set(session_id, region)
+        return True
+
+    def release(self, session_id: str):
+        with self._lock:
+            self._regions.pop(session_id, None)
+
+    def _set(self, session_id: str, region: Optional[Tuple[int, int, int, int]]):
+        with self._lock:
+            if region is None:
+                self._regions.pop(session_id, None)
+                return
+            self._regions[session_id] = region
+            self._regions.move_to_end(session_id)
+            if len(self._regions) > self.max_sessions:
+                self._regions.popitem(last=False)
+
+    def _well_inside(self, points: np.ndarray, region: Tuple[int, int, int, int]) -> bool:
+        x1, y1, x2, y2 = region
+        edge_x = (x2 - x1) * REGION_EDGE_FRACTION
+        edge_y = (y2 - y1) * REGION_EDGE_FRACTION
+        return bool(
+            np.all(points[:, 0] >= x1 + edge_x) and np.all(points[:, 0] <= x2 - edge_x)
+            and np.all(points[:, 1] >= y1 + edge_y) and np.all(points[:, 1] <= y2 - edge_y)
+        )
+
+    def _region_around(self, points: np.ndarray, frame_shape: Sequence[int]) -> Optional[Tuple[int, int, int, int]]:
+        """Expanded box around the points, None when it would cover most of the frame anyway"""
+        height, width = frame_shape[:2]
+        (x1, y1), (x2, y2) = points.min(axis=0), points.max(axis=0)
+        pad = max(x2 - x1, y2 - y1) * self.margin
+        half_side = MIN_REGION_SIDE / 2
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        half_w = max((x2 - x1) / 2 + pad, half_side)
+        half_h = max((y2 - y1) / 2 + pad, half_side)
+
+        region = (
+            int(max(0, cx - half_w)), int(max(0, cy - half_h)),
+            int(min(width, cx + half_w)), int(min(height, cy + half_h))
+        )
+        if (region[2] - region[0]) * (region[3] - region[1]) > 0.8 * width * height:
+            return None
+        return region
@@ -0,0 +1,371 @@
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from itertools import count
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.exceptions import PoseDetectionError
+from physiotrack_core.keypoint_set import KeypointSet
+from physiotrack_core.pose_detection import keypoints_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Output slots hold (x, y, score) for up to MAX_PERSONS people
+MAX_PERSONS = 4
+MAX_KEYPOINTS = 133
+OUTPUT_SLOT_FLOATS = MAX_PERSONS * MAX_KEYPOINTS * 3
+
+# Wait between attempts to restart a worker whose replacement failed to start
+RESTART_RETRY_S = 5.0
+
+def _detect_into_slot(detector, frame_buf, output_buf, slot: int, frame_slot_bytes: int, shape, session_id):
+    """Run detection on a frame in shared memory and write the results back to shared memory"""
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=frame_buf, offset=slot * frame_slot_bytes)
+    keypoints, scores = detector.detect(frame, session_id)
+
+    n_persons = min(len(keypoints), MAX_PERSONS)
+    if n_persons == 0:
+        return 0, 0
+
+    n_keypoints = min(keypoints.shape[1], MAX_KEYPOINTS)
+    size = n_persons * n_keypoints
+    out = np.ndarray(
+        (OUTPUT_SLOT_FLOATS,), dtype=np.float32, buffer=output_buf,
+        offset=slot * OUTPUT_SLOT_FLOATS * 4
+    )
+    out[:size * 2] = keypoints[:n_persons, :n_keypoints].reshape(-1)
+    out[size * 2:size * 3] = scores[:n_persons, :n_keypoints].reshape(-1)
+    return n_persons, n_keypoints
+
+def _worker_main(
+    detector_kwargs: Dict,
+    frame_shm_name: str,
+    output_shm_name: str,
+    frame_slot_bytes: int,
+    requests,
+    responses
+):
+    """Worker process loop: one PoseDetector serving frames from shared memory"""
+    frame_shm = shared_memory.SharedMemory(name=frame_shm_name)
+    output_shm = shared_memory.SharedMemory(name=output_shm_name)
+    try:
+        try:
+            from physiotrack_core.pose_detection import PoseDetector
+            detector = PoseDetector(**detector_kwargs)
+        except Exception as e:
+            responses.put(("failed", str(e)))
+            return
+        responses.put(("ready", (detector.keypoint_names, detector.input_size)))
+
+        while True:
+            message = requests.get()
+            if message is None:
+                return
+
+            if message[0] == "release":
+                detector.release_session(message[1])
+                continue
+
+            _, slot, shape, session_id = message
+            try:
+                n_persons, n_keypoints = _detect_into_slot(
+                    detector, frame_shm.buf, output_shm.buf, slot, frame_slot_bytes, shape, session_id
+                )
+                responses.put(("done", slot, n_persons, n_keypoints, None))
+            except Exception as e:
+                responses.put(("done", slot, 0, 0, str(e)))
+    finally:
+        frame_shm.close()
+        output_shm.close()
+
+class PoseWorker:
+    """Parent-side handle on one worker process and its shared-memory slot rings"""
+
+    def __init__(self, ctx, index: int, detector_kwargs: Dict, num_slots: int, frame_slot_bytes: int):
+        self.index = index
+        self.num_slots = max(1, num_slots)
+        self.frame_slot_bytes = frame_slot_bytes
+        self.keypoint_names: Optional[List[str]] = None
+        self.input_size = 640
+        self.alive = False
+
+        self.frame_shm = shared_memory.SharedMemory(create=True, size=self.num_slots * frame_slot_bytes)
+        self.output_shm = shared_memory.SharedMemory(
+            create=True, size=self.num_slots * OUTPUT_SLOT_FLOATS * 4
+        )
+        self.frames = np.ndarray(
+            (self.num_slots, frame_slot_bytes), dtype=np.uint8, buffer=self.frame_shm.buf
+        )
+        self.outputs = np.ndarray(
+            (self.num_slots, OUTPUT_SLOT_FLOATS), dtype=np.float32, buffer=self.output_shm.buf
+        )
+
+        # Free slots double as backpressure: submit blocks while every slot is in flight
+        self.free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(self.num_slots):
+            self.free_slots.put(slot)
+        self.pending: Dict[int, Future] = {}
+        self._pending_lock = threading.Lock()
+
+        self._ctx = ctx
+        self._detector_kwargs = detector_kwargs
+        self.restarts = 0
+        self._closing = False
+        self._start_timeout = 300.0
+        self._spawn()
+        self._listener: Optional[threading.Thread] = None
+
+    def _spawn(self):
+        """Start a worker process on fresh queues, attached to this worker's shared memory"""
+        self.requests = self._ctx.Queue()
+        self.responses = self._ctx.Queue()
+        self.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                self._detector_kwargs, self.frame_shm.name, self.output_shm.name,
+                self.frame_slot_bytes, self.requests, self.responses
+            ),
+            name=f"pose-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+
+    def _await_ready(self, timeout: float):
+        """Block until the worker process has loaded its models"""
+        try:
+            message = self.responses.get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Pose worker {self.index} did not start within {timeout}s")
+        if message is None:
+            raise RuntimeError(f"Pose worker {self.index} closed while starting")
+        status, payload = message
+        if status != "ready":
+            raise RuntimeError(f"Pose worker {self.index} failed to start: {payload}")
+
+        self.keypoint_names, self.input_size = payload
+        with self._pending_lock:
+            self.alive = True
+
+    def wait_ready(self, timeout: float):
+        """Block until the worker has loaded its models"""
+        self._start_timeout = timeout
+        self._await_ready(timeout)
+        self._listener = threading.Thread(
+            target=self._listen, name=f"pose-worker-{self.index}-results", daemon=True
+        )
+        self._listener.start()
+
+    def submit(self, frame: np.ndarray, session_id: Optional[str]) -> Future:
+        """Copy a frame into a free slot and queue it for the worker"""
+        if not self.alive:
+            raise PoseDetectionError(f"Pose worker {self.index} is not running")
+
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.frame_slot_bytes:
+            raise ValueError(
+                f"Frame of {frame.nbytes} bytes exceeds the {self.frame_slot_bytes} byte shared-memory slot"
+            )
+
+        slot = self.free_slots.get()
+        future: Future = Future()
+        # Checked again under the lock, so a frame is either queued to a live
+        # worker or refused, never left pending on a dead one
+        with self._pending_lock:
+            if not self.alive:
+                self.free_slots.put(slot)
+                raise PoseDetectionError(f"Pose worker {self.index} is not running")
+            self.frames[slot, :frame.nbytes] = frame.reshape(-1)
+            self.pending[slot] = future
+            self.requests.put(("detect", slot, frame.shape, session_id))
+        return future
+
+    def release(self, session_id: str):
+        """Ask the worker to drop a session's tracking state"""
+        with self._pending_lock:
+            if self.alive:
+                self.requests.put(("release", session_id))
+
+    def _restart(self) -> bool:
+        """
+        Replace an exited worker process, retrying until one starts
+
+        Returns:
+            False when the worker was closed meanwhile
+        """
+        while not self._closing:
+            self.restarts += 1
+            self._spawn()
+            try:
+                self._await_ready(self._start_timeout)
+            except Exception as e:
+                if self._closing:
+                    return False
+                logger.error(f"Failed to restart pose worker {self.index}: {e}")
+                if self.process.is_alive():
+                    self.process.terminate()
+                self.process.join()
+                time.sleep(RESTART_RETRY_S)
+                continue
+            logger.info(f"Pose worker {self.index} restarted (pid {self.process.pid})")
+            return True
+        return False
+
+    def _listen(self):
+        while True:
+            try:
+                message = self.responses.get(timeout=1.0)
+            except queue.Empty:
+                if not self.process.is_alive() and not self._closing:
+                    # Its sessions stay pinned here, they restart tracking on the new process
+                    self._fail_pending(f"Pose worker {self.index} exited with code {self.process.exitcode}")
+                    for q in (self.requests, self.responses):
+                        q.cancel_join_thread()
+                        q.close()
+                    if not self._restart():
+                        return
+                continue
+            if message is None:
+                return
+
+            _, slot, n_persons, n_keypoints, error = message
+            with self._pending_lock:
+                future = self.pending.pop(slot)
+
+            if error:
+                result = None
+            elif n_persons == 0:
+                result = (np.array([]), np.array([]))
+            else:
+                # Copy out before the slot is handed to the next frame
+                size = n_persons * n_keypoints
+                out = self.outputs[slot]
+                result = (
+                    out[:size * 2].reshape(n_persons, n_keypoints, 2).copy(),
+                    out[size * 2:size * 3].reshape(n_persons, n_keypoints).copy()
+                )
+            self.free_slots.put(slot)
+
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def _fail_pending(self, reason: str):
+        logger.error(reason)
+        with self._pending_lock:
+            self.alive = False
+            pending, self.pending = self.pending, {}
+        for slot, future in pending.items():
+            future.set_exception(PoseDetectionError(reason))
+            self.free_slots.put(slot)
+
+    def close(self):
+        """Stop the worker process and free its shared memory"""
+        self._closing = True
+        with self._pending_lock:
+            self.alive = False
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=5.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+
+        if self._listener is not None and self._listener.is_alive():
+            self.responses.put(None)
+            self._listener.join()
+            # A restart racing the close may have spawned a new process
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        if self.pending:
+            self._fail_pending(f"Pose worker {self.index} closed")
+
+        # Don't let exit wait on queue feeder threads of a dead worker
+        for q in (self.requests, self.responses):
+            q.cancel_join_thread()
+            q.close()
+
+        # Drop the array views before the buffers can be released
+        del self.frames
+        del self.outputs
+        for shm in (self.frame_shm, self.output_shm):
+            shm.close()
+            shm.unlink()
+
+class InferenceProcessPool:
+    """Pose detection spread over worker processes, with frames and results passed through shared memory"""
+
+    def __init__(
+        self,
+        num_processes: int,
+        detector_kwargs: Dict,
+        slots_per_process: int = 4,
+        max_frame_bytes: int = 1920 * 1080 * 3,
+        start_timeout: float = 300.0
+    ):
+        # Spawn rather than fork so workers don't inherit the parent's runtime threads
+        ctx = mp.get_context("spawn")
+        self.workers: List[PoseWorker] = []
+        try:
+            for index in range(max(1, num_processes)):
+                self.workers.append(
+                    PoseWorker(ctx, index, detector_kwargs, slots_per_process, max_frame_bytes)
+                )
+            for worker in self.workers:
+                worker.wait_ready(start_timeout)
+        except Exception:
+            self.close()
+            raise
+
+        self.keypoint_names = self.workers[0].keypoint_names
+        self.input_size = self.workers[0].input_size
+        self._round_robin = count()
+        logger.info(
+            f"Inference process pool started with {len(self.workers)} workers, "
+            f"{slots_per_process} slots of {max_frame_bytes} bytes each"
+        )
+
+    def _worker_for(self, session_id: Optional[str]) -> PoseWorker:
+        """Pin a session to one worker so its tracking state stays in one process"""
+        if session_id is None:
+            return self.workers[next(self._round_robin) % len(self.workers)]
+        return self.workers[zlib.crc32(session_id.encode()) % len(self.workers)]
+
+    def detect(self, frame: np.ndarray, session_id: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Detect poses in a frame on a worker process, blocking until done"""
+        return self._worker_for(session_id).submit(frame, session_id).result()
+
+    def release_session(self, session_id: str):
+        """Drop the tracking state of a session in its worker"""
+        self._worker_for(session_id).release(session_id)
+
+    def keypoints_to_dict(
+        self,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        confidence_threshold: float = 0.3
+    ) -> KeypointSet:
+        """Convert keypoint array to a keypoint set with confidence filtering"""
+        return keypoints_to_dict(self.keypoint_names, keypoints, scores, confidence_threshold)
+
+    @property
+    def is_initialized(self) -> bool:
+        """Check if every worker process is up"""
+        return bool(self.workers) and all(worker.alive for worker in self.workers)
+
+    def close(self):
+        """Stop all worker processes"""
+        for worker in self.workers:
+            try:
+                worker.close()
+            except Exception as e:
+                logger.error(f"Failed to close pose worker {worker.index}: {e}")
+        self.workers = []
\ No newline at end of file
@@ -1,7 +1,14 @@
+import os
+import time
 import numpy as np
-from typing import Dict, Tuple, Optional, List
-from physiotrack_core.pose_detection import PoseDetector
+from typing import Dict, Tuple, Optional, List, Mapping, Sequence
+from physiotrack_core.pose_detection import PoseDetector, benchmark_backends, INT8_MODE_SUFFIX
+from physiotrack_core.keypoint_filters import KeypointFilterBank
+from app.core.pose.batch_scheduler import InferenceBatcher
+from app.core.pose.process_pool import InferenceProcessPool
+from app.core.pose.model_pool import PoolModel, RegionCropper, parse_model_pool
 from app.config import settings
+from app.utils.exceptions import PoseDetectionError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,61 +18,217 @@ class PoseProcessor:
     
     _instance = None
     _detector = None
+    _batcher = None
+    _filters = None
+    _regions = None
+    
+    # Pose models cheapest first, the configured POSE_MODEL/POSE_MODE last
+    _models: List[PoolModel] = []
+    _model_choice: Dict[frozenset, PoolModel] = {}
+    
+    # Inference backend in use and the startup benchmark that picked it
+    backend_name: Optional[str] = None
+    backend_latency_ms: Optional[float] = None
+    backend_benchmark: List[Dict] = []
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             try:
-                cls._detector = PoseDetector(
+                detector_kwargs = dict(
                     model=settings.POSE_MODEL,
                     mode=settings.POSE_MODE,
-                    device=settings.DEVICE,
-                    backend=settings.BACKEND
+                    device=settings.resolve_device(),
+                    backend=settings.BACKEND,
+                    det_frequency=settings.DET_FREQUENCY,
+                    det_refresh_confidence=settings.DET_REFRESH_CONFIDENCE,
+                    max_tracked_sessions=settings.MAX_TRACKED_SESSIONS
                 )
+                detector_kwargs["backend_kwargs"] = cls._backend_kwargs()
+                detector_kwargs["inference_backend"] = cls._select_inference_backend(detector_kwargs)
+                
+                primary = cls._build_model(settings.POSE_MODE, settings.POSE_MODEL, detector_kwargs)
+                cls._detector, cls._batcher = primary.detector, primary.batcher
                 logger.info(f"PoseProcessor initialized with {settings.POSE_MODEL} model")
+                
+                # Lighter models for movements that don't need every keypoint,
+                # the configured model stays the fallback
+                cls._models = []
+                for mode, model in parse_model_pool(settings.POSE_MODEL_POOL):
+                    try:
+                        cls._models.append(cls._build_model(mode, model, detector_kwargs))
+                    except Exception as e:
+                        logger.warning(f"Skipping pose model {mode}:{model} of the pool: {e}")
+                cls._models.append(primary)
+                if len(cls._models) > 1:
+                    logger.info(f"Pose model pool: {', '.join(m.name for m in cls._models)}")
+                
+                if settings.POSE_REGION_CROP:
+                    cls._regions = RegionCropper(
+                        max_sessions=settings.MAX_TRACKED_SESSIONS,
+                        margin=settings.POSE_REGION_MARGIN
+                    )
+                
+                cls._filters = KeypointFilterBank(
+                    max_sessions=settings.MAX_TRACKED_SESSIONS,
+                    max_gap_frames=settings.KEYPOINT_MAX_GAP_FRAMES,
+                    filter_params={
+                        "one_euro": {
+                            "min_cutoff": settings.ONE_EURO_MIN_CUTOFF,
+                            "beta": settings.ONE_EURO_BETA
+                        },
+                        "kalman": {
+                            "process_noise": settings.KALMAN_PROCESS_NOISE,
+                            "measurement_noise": settings.KALMAN_MEASUREMENT_NOISE
+                        }
+                    }
+                )
             except Exception as e:
                 logger.error(f"Failed to initialize PoseDetector: {e}")
                 raise
         return cls._instance
     
-    def process_frame(self, frame: np.ndarray) -> Tuple[Dict[str, np.ndarray], float]:
+    @staticmethod
+    def _build_model(mode: str, model: str, detector_kwargs: Dict) -> PoolModel:
+        """Load a pose model in process or in worker processes, batched when configured"""
+        detector_kwargs = dict(detector_kwargs, mode=mode, model=model)
+        
+        # Run detection in worker processes when a process pool is configured
+        if settings.INFERENCE_PROCESSES > 0:
+            detector = InferenceProcessPool(
+                num_processes=settings.INFERENCE_PROCESSES,
+                detector_kwargs=detector_kwargs,
+                slots_per_process=settings.INFERENCE_PROCESS_SLOTS,
+                max_frame_bytes=settings.INFERENCE_PROCESS_MAX_FRAME_BYTES
+            )
+        else:
+            detector = PoseDetector(**detector_kwargs)
+        
+        # Batch frames across sessions when a batching window is configured
+        batcher = None
+        if settings.INFERENCE_BATCH_WINDOW_MS > 0 and settings.INFERENCE_PROCESSES > 0:
+            logger.warning("Cross-session batching is not used with INFERENCE_PROCESSES > 0")
+        elif settings.INFERENCE_BATCH_WINDOW_MS > 0:
+            batcher = InferenceBatcher(
+                detector,
+                window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+                max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE
+            )
+        return PoolModel(mode, model, detector, batcher)
+    
+    @staticmethod
+    def _backend_kwargs() -> Dict:
+        """Thread and model settings for the inference backends"""
+        # By default split the cores between the frames that run at once
+        concurrency = settings.INFERENCE_PROCESSES or settings.INFERENCE_WORKERS
+        intra_op_threads = settings.ORT_INTRA_OP_THREADS or max(1, (os.cpu_count() or 1) // max(1, concurrency))
+        return {
+            "intra_op_threads": intra_op_threads,
+            "inter_op_threads": settings.ORT_INTER_OP_THREADS,
+            "model_dir": settings.QUANTIZED_MODEL_DIR or None
+        }
+    
+    @classmethod
+    def _select_inference_backend(cls, detector_kwargs: Dict) -> str:
+        """Use the configured backend, or benchmark the candidates when set to auto"""
+        if settings.POSE_MODE.endswith(INT8_MODE_SUFFIX):
+            # The quantized mode fixes the backend
+            cls.backend_name = "ort_int8"
+            return cls.backend_name
+        
+        if settings.INFERENCE_BACKEND != "auto":
+            cls.backend_name = settings.INFERENCE_BACKEND
+            return cls.backend_name
+        
+        benchmark_kwargs = {k: v for k, v in detector_kwargs.items() if k != "backend_kwargs"}
+        cls.backend_benchmark = benchmark_backends(
+            settings.INFERENCE_BACKEND_CANDIDATES,
+            benchmark_kwargs,
+            iterations=settings.INFERENCE_BACKEND_BENCHMARK_ITERATIONS,
+            backend_kwargs=detector_kwargs["backend_kwargs"]
+        )
+        fastest = cls.backend_benchmark[0] if cls.backend_benchmark else None
+        if fastest is None or not fastest["available"]:
+            logger.warning("No inference backend candidate could run, using the default backend")
+            cls.backend_name = "default"
+            return cls.backend_name
+        
+        cls.backend_name = fastest["name"]
+        cls.backend_latency_ms = fastest["latency_ms"]
+        logger.info(f"Selected inference backend {cls.backend_name} ({cls.backend_latency_ms:.1f} ms/frame)")
+        return cls.backend_name
+    
+    def process_frame(
+        self,
+        frame: np.ndarray,
+        session_id: Optional[str] = None,
+        required_keypoints: Optional[Sequence[str]] = None
+    ) -> Tuple[Mapping[str, np.ndarray], float]:
         """
         Process a single frame and return keypoints
         
         Args:
             frame: Input image as numpy array (BGR format)
+            session_id: Session the frame belongs to, lets the detector reuse
+                person boxes from the session's previous frames
+            required_keypoints: Keypoints the frame's movements need. Picks the
+                cheapest model of the pool providing them and, with
+                POSE_REGION_CROP, the body region the frame is cropped to
             
         Returns:
-            Tuple of (keypoints_dict, confidence_score)
+            Tuple of (keypoints, confidence_score), keypoints being a KeypointSet
+            or an empty dict when no usable pose was found
         """
         if self._detector is None:
             logger.error("PoseDetector not initialized")
             return {}, 0.0
         
+        model = self.select_model(required_keypoints)
+        region = None
+        if self._regions is not None and required_keypoints:
+            region = self._regions.region(session_id)
+        
         # Detect pose
         try:
-            keypoints, scores = self._detector.detect(frame)
+            if region is not None:
+                x1, y1, x2, y2 = region
+                keypoints, scores = model.detect(frame[y1:y2, x1:x2], session_id)
+            else:
+                keypoints, scores = model.detect(frame, session_id)
+        except PoseDetectionError:
+            # The detector itself is unavailable, not just this frame
+            raise
         except Exception as e:
             logger.error(f"Pose detection failed: {e}")
             return {}, 0.0
         
         if len(keypoints) == 0:
+            self._update_region(session_id, model, None, frame.shape)
             return {}, 0.0
         
-        # Take first person detected
+        # Take first person detected, in whole-frame coordinates
         person_keypoints = keypoints[0]
         person_scores = scores[0]
+        if region is not None:
+            person_keypoints = person_keypoints + np.array(region[:2], dtype=person_keypoints.dtype)
         
         # Filter by confidence threshold
         valid_mask = person_scores >= settings.CONFIDENCE_THRESHOLD
         
-        # Check if enough keypoints are detected
-        valid_ratio = np.sum(valid_mask) / len(person_scores)
+        # Update the session's crop from the keypoints its movements need
+        if self._regions is not None and required_keypoints:
+            needed = model.indices(required_keypoints)
+            found = len(needed) > 0 and bool(np.all(valid_mask[needed]))
+            self._update_region(session_id, model, person_keypoints[needed] if found else None, frame.shape)
+        
+        # Check if enough keypoints are detected, only the region's ones when cropped
+        counted = valid_mask if region is None else valid_mask[model.indices(required_keypoints)]
+        valid_ratio = np.sum(counted) / len(counted) if len(counted) else 0.0
         if valid_ratio < settings.MIN_KEYPOINTS_RATIO:
             return {}, valid_ratio
         
         # Convert to dictionary
-        keypoint_dict = self._detector.keypoints_to_dict(
+        keypoint_dict = model.detector.keypoints_to_dict(
             person_keypoints, 
             person_scores,
             confidence_threshold=settings.CONFIDENCE_THRESHOLD
@@ -76,6 +239,58 @@ class PoseProcessor:
         
         return keypoint_dict, float(avg_confidence)
     
+    def select_model(self, required_keypoints: Optional[Sequence[str]] = None) -> PoolModel:
+        """Cheapest model of the pool with every required keypoint, the configured model otherwise"""
+        if not required_keypoints or len(self._models) == 1:
+            return self._models[-1]
+        
+        key = frozenset(required_keypoints)
+        model = self._model_choice.get(key)
+        if model is None:
+            model = next((m for m in self._models if m.covers(key)), self._models[-1])
+            self._model_choice[key] = model
+            logger.info(f"Using pose model {model.name} for keypoints {sorted(key)}")
+        return model
+    
+    def _update_region(
+        self,
+        session_id: Optional[str],
+        model: PoolModel,
+        points: Optional[np.ndarray],
+        frame_shape: Tuple[int, ...]
+    ):
+        """Move the session's crop, restarting person tracking when it changed"""
+        if self._regions is None or session_id is None:
+            return
+        if self._regions.update(session_id, points, frame_shape):
+            # Tracked person boxes are in the old crop's coordinates
+            model.release_session(session_id)
+    
+    def filter_keypoints(
+        self,
+        keypoints: Mapping[str, np.ndarray],
+        session_id: Optional[str],
+        filter_name: Optional[str] = None
+    ) -> Mapping[str, np.ndarray]:
+        """
+        Smooth a frame's keypoints over the session's previous frames
+        
+        Args:
+            keypoints: Keypoints from process_frame, in the frame's pixel space
+            session_id: Session the frame belongs to
+            filter_name: one_euro, kalman or none, defaults to KEYPOINT_FILTER
+            
+        Returns:
+            The filtered keypoints, with briefly missing ones filled in. A frame
+            without a usable pose may get keypoints filled from the session's
+            estimates.
+        """
+        if self._filters is None:
+            return keypoints
+        return self._filters.filter(
+            session_id, keypoints, filter_name or settings.KEYPOINT_FILTER, time.monotonic()
+        )
+    
     def validate_keypoints_for_movement(
         self, 
         keypoints: Dict[str, np.ndarray], 
@@ -98,6 +313,39 @@ class PoseProcessor:
         
         return True, "All required keypoints detected"
     
+    def release_session(self, session_id: str):
+        """Drop a session's tracking state in every model, its keypoint filter and crop"""
+        for model in self._models:
+            model.release_session(session_id)
+        if self._filters is not None:
+            self._filters.release(session_id)
+        if self._regions is not None:
+            self._regions.release(session_id)
+    
+    @classmethod
+    def shutdown(cls):
+        """Stop the batching threads and worker processes if they were started"""
+        for model in cls._models:
+            model.close()
+        cls._batcher = None
+        if isinstance(cls._detector, InferenceProcessPool):
+            cls._models = []
+            cls._model_choice = {}
+            cls._detector = None
+            cls._instance = None
+    
+    @property
+    def decode_max_side(self) -> int:
+        """Longest side frames should be decoded to before inference"""
+        if settings.DECODE_MAX_SIDE > 0:
+            return settings.DECODE_MAX_SIDE
+        return self._detector.input_size if self._detector is not None else 0
+    
+    @property
+    def models(self) -> List[PoolModel]:
+        """Loaded pose models, cheapest first"""
+        return list(self._models)
+    
     @property
     def is_initialized(self) -> bool:
         """Check if pose processor is properly initialized"""
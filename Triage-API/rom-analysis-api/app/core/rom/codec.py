@@ -0,0 +1,240 @@
+"""
+Versioned binary encoding of ROM tracker state
+
+Layout (little-endian): a fixed header with the scalars, section sizes and
+repetition detector state, then the names, the repetitions, smoothing
+window and hold candidates, the recorded angle series as raw array bytes,
+and the session-end refinement as compact JSON. Arrays start on 8-byte
+boundaries so they decode as np.frombuffer views without copying.
+
+The series can also be left out of the tracker record (it then holds zero
+samples) and encoded on its own by encode_series: a small header, the
+float64 times and the float32 angles.
+"""
+import json
+import math
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"ROMT"
+SERIES_MAGIC = b"ROMS"
+VERSION = 1
+
+# magic, version, name lengths, then the integer and float scalars, then the
+# lengths of the array sections and of the refinement JSON
+_HEADER = struct.Struct("<4sBxHH" + "5q" + "9d" + "5I" + "I")
+
+# Repetition detector scalars: prominence, hold speed, max reps, count,
+# direction, in_rep, phase, valley, peak, low, high, range sum
+_REPETITIONS = struct.Struct("<ddIIbBB" + "x" + "5d")
+PHASES = ("rest", "ascending", "holding", "returning")
+
+# magic, version, sample count
+_SERIES_HEADER = struct.Struct("<4sB3xI")
+
+# Columns of the repetition array
+_REP_FIELDS = ("rep", "min", "max", "range", "duration_s")
+
+_ALIGN = 8
+
+def _optional(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+def _from_optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+def _pad(length: int) -> int:
+    return -length % _ALIGN
+
+def is_encoded(data: Any) -> bool:
+    """Check whether stored tracker data is in this encoding rather than JSON"""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == MAGIC
+
+def encode_tracker(tracker, include_series: bool = True) -> bytes:
+    """Encode a ROMTracker's full state, the recorded angle series only with include_series"""
+    body_part = tracker.body_part.encode("utf-8")
+    movement_type = tracker.movement_type.encode("utf-8")
+    normal_low, normal_high = tracker.normal_range or (None, None)
+
+    history = np.asarray(tracker.angle_history, dtype=np.float32)
+    low_frames, low_angles = _hold_arrays(tracker._hold_low)
+    high_frames, high_angles = _hold_arrays(tracker._hold_high)
+    if include_series:
+        series_times, series_values = tracker.series.arrays()
+    else:
+        series_times, series_values = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+    detector = tracker.repetitions
+    reps = np.array(
+        [[_optional(rep.get(field)) for field in _REP_FIELDS] for rep in detector.reps],
+        dtype=np.float64
+    ).reshape(-1, len(_REP_FIELDS))
+    refined = json.dumps(tracker.refined, separators=(",", ":")).encode("utf-8") if tracker.refined else b""
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, len(body_part), len(movement_type),
+        tracker.window_size, tracker.hold_frames, tracker.frame_count,
+        tracker.valid_frame_count, tracker.normal_frame_count,
+        _optional(tracker.min_angle), _optional(tracker.max_angle),
+        _optional(tracker.peak_min_angle), _optional(tracker.peak_max_angle),
+        _optional(normal_low), _optional(normal_high),
+        tracker.time_in_normal_range, tracker._total_sum, tracker._total_sq_sum,
+        len(history), len(low_frames), len(high_frames), len(series_times), len(reps),
+        len(refined)
+    )
+    repetitions = _REPETITIONS.pack(
+        detector.min_prominence, detector.hold_speed, detector.max_reps, detector.count,
+        detector.direction, detector.in_rep, PHASES.index(detector.phase),
+        _optional(detector.valley), _optional(detector.peak),
+        _optional(detector.low), _optional(detector.high), detector.range_sum
+    )
+
+    parts = [header, repetitions, body_part, movement_type]
+    names_length = len(header) + len(repetitions) + len(body_part) + len(movement_type)
+    parts.append(b"\0" * _pad(names_length))
+    for array in (
+        low_frames, high_frames, np.ascontiguousarray(series_times, dtype=np.float64), reps,
+        history, low_angles, high_angles, np.ascontiguousarray(series_values, dtype=np.float32)
+    ):
+        data = array.tobytes()
+        parts.append(data)
+        parts.append(b"\0" * _pad(len(data)))
+    parts.append(refined)
+    return b"".join(parts)
+
+def decode_tracker(data: bytes, load_series: bool = True) -> Dict[str, Any]:
+    """
+    Decode state written by encode_tracker
+
+    Returns:
+        The fields of ROMTracker.to_dict, plus "series" as (times, values)
+        arrays viewing data when load_series is set
+    """
+    buffer = memoryview(data)
+    if len(buffer) < _HEADER.size + _REPETITIONS.size:
+        raise ValueError("Tracker state is truncated")
+    fields = _HEADER.unpack_from(buffer)
+    magic, version = fields[0], fields[1]
+    if magic != MAGIC:
+        raise ValueError("Not an encoded tracker state")
+    if version != VERSION:
+        raise ValueError(f"Unsupported tracker state version {version}")
+
+    name_lengths = fields[2:4]
+    window_size, hold_frames, frame_count, valid_frame_count, normal_frame_count = fields[4:9]
+    (min_angle, max_angle, peak_min, peak_max, normal_low, normal_high,
+     time_in_normal_range, total_sum, total_sq_sum) = fields[9:18]
+    n_history, n_low, n_high, n_series, n_reps, n_refined = fields[18:24]
+    (min_prominence, hold_speed, max_reps, count, direction, in_rep, phase,
+     valley, peak, low, high, range_sum) = _REPETITIONS.unpack_from(buffer, _HEADER.size)
+
+    offset = _HEADER.size + _REPETITIONS.size
+    body_part = bytes(buffer[offset:offset + name_lengths[0]]).decode("utf-8")
+    offset += name_lengths[0]
+    movement_type = bytes(buffer[offset:offset + name_lengths[1]]).decode("utf-8")
+    offset += name_lengths[1]
+    offset += _pad(offset)
+
+    def array(dtype, count: int) -> np.ndarray:
+        nonlocal offset
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        values = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += values.nbytes + _pad(values.nbytes)
+        return values
+
+    low_frames = array(np.int64, n_low)
+    high_frames = array(np.int64, n_high)
+    series_times = array(np.float64, n_series)
+    reps = array(np.float64, n_reps * len(_REP_FIELDS)).reshape(-1, len(_REP_FIELDS))
+    history = array(np.float32, n_history)
+    low_angles = array(np.float32, n_low)
+    high_angles = array(np.float32, n_high)
+    series_values = array(np.float32, n_series)
+
+    refined = json.loads(bytes(buffer[offset:offset + n_refined])) if n_refined else None
+    repetitions = {
+        "min_prominence": min_prominence,
+        "hold_speed": hold_speed,
+        "max_reps": max_reps,
+        "direction": direction,
+        "in_rep": bool(in_rep),
+        "valley": _from_optional(valley),
+        "peak": _from_optional(peak),
+        "low": _from_optional(low),
+        "high": _from_optional(high),
+        "count": count,
+        "range_sum": range_sum,
+        "reps": [
+            {
+                "rep": int(rep),
+                "min": rep_min,
+                "max": rep_max,
+                "range": rep_range,
+                "duration_s": _from_optional(duration)
+            }
+            for rep, rep_min, rep_max, rep_range, duration in reps.tolist()
+        ],
+        "phase": PHASES[phase]
+    }
+
+    state = {
+        "body_part": body_part,
+        "movement_type": movement_type,
+        "window_size": window_size,
+        "hold_frames": hold_frames,
+        "normal_range": None if math.isnan(normal_low) else [normal_low, normal_high],
+        "min_angle": _from_optional(min_angle),
+        "max_angle": _from_optional(max_angle),
+        "peak_min_angle": _from_optional(peak_min),
+        "peak_max_angle": _from_optional(peak_max),
+        "frame_count": frame_count,
+        "valid_frame_count": valid_frame_count,
+        "normal_frame_count": normal_frame_count,
+        "time_in_normal_range": time_in_normal_range,
+        "total_sum": total_sum,
+        "total_sq_sum": total_sq_sum,
+        "angle_history": history.tolist(),
+        "hold_low": list(zip(low_frames.tolist(), low_angles.tolist())),
+        "hold_high": list(zip(high_frames.tolist(), high_angles.tolist())),
+        "repetitions": repetitions,
+        "refined": refined
+    }
+    if load_series:
+        state["series"] = (series_times, series_values)
+    return state
+
+def encode_series(series) -> bytes:
+    """Encode an AngleSeries' samples in recording order"""
+    times, values = series.arrays()
+    header = _SERIES_HEADER.pack(SERIES_MAGIC, VERSION, len(times))
+    return b"".join((
+        header, b"\0" * _pad(len(header)),
+        np.ascontiguousarray(times, dtype=np.float64).tobytes(),
+        np.ascontiguousarray(values, dtype=np.float32).tobytes()
+    ))
+
+def decode_series(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """(times, values) arrays viewing data written by encode_series"""
+    buffer = memoryview(data)
+    if len(buffer) < _SERIES_HEADER.size:
+        raise ValueError("Series state is truncated")
+    magic, version, count = _SERIES_HEADER.unpack_from(buffer)
+    if magic != SERIES_MAGIC:
+        raise ValueError("Not an encoded angle series")
+    if version != VERSION:
+        raise ValueError(f"Unsupported angle series version {version}")
+    offset = _SERIES_HEADER.size + _pad(_SERIES_HEADER.size)
+    if len(buffer) < offset + count * 12:
+        raise ValueError("Series state is truncated")
+    times = np.frombuffer(buffer, dtype=np.float64, count=count, offset=offset)
+    values = np.frombuffer(buffer, dtype=np.float32, count=count, offset=offset + count * 8)
+    return times, values
+
+def _hold_arrays(candidates) -> Tuple[np.ndarray, np.ndarray]:
+    """(valid frame numbers, angles) of a hold deque"""
+    if not candidates:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    frames, angles = zip(*candidates)
+    return np.array(frames, dtype=np.int64), np.array(angles, dtype=np.float32)
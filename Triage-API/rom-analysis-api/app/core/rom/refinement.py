@@ -0,0 +1,208 @@
+"""
+Offline refinement of a session's angle series
+
+Live ROM is smoothed causally, so peaks lag and get clipped. At session end
+the recorded series is filtered zero-phase (forwards and backwards) and the
+ROM recomputed from it.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Samples needed before zero-phase filtering is worthwhile
+MIN_REFINE_FRAMES = 7
+
+# Faster sampling means frames were analyzed in a burst rather than as they
+# were captured, so their spacing says nothing about the movement's timing
+MAX_SAMPLE_RATE_HZ = 60.0
+
+# Share of frame steps within a factor of two of the median step for the
+# timing to be trusted; bursty arrival fails this
+MIN_REGULAR_STEPS = 0.7
+
+# Savitzky-Golay window, in samples, used when the timing can't be trusted
+FALLBACK_SAVGOL_FRAMES = 5
+
+# Running median window, in samples, that removes single-frame pose glitches
+# before filtering
+DESPIKE_FRAMES = 3
+
+# Timestamps below this can't be wall-clock time (it is 2001-09-09); older
+# stored series were stamped with another process's monotonic clock
+MIN_WALL_CLOCK = 1e9
+
+class AngleSeries:
+    """
+    Per-frame (time, angle) samples of one tracker
+
+    Times are wall-clock seconds, so a series stored by one process still
+    lines up with the samples another adds after loading it. Storage grows by
+    doubling up to max_frames, then keeps the newest max_frames samples as a
+    ring.
+    """
+
+    __slots__ = ("max_frames", "times", "values", "size", "start")
+
+    def __init__(self, max_frames: int = 18000, initial_frames: int = 256):
+        self.max_frames = max_frames
+        capacity = max(1, min(initial_frames, max_frames))
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.size = 0
+        self.start = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp: float, value: float):
+        """Add one sample, overwriting the oldest once max_frames are stored"""
+        capacity = len(self.values)
+        if self.size == capacity and capacity < self.max_frames:
+            capacity = min(capacity * 2, self.max_frames)
+            self.times = np.resize(self.times, capacity)
+            self.values = np.resize(self.values, capacity)
+
+        if self.size < capacity:
+            self.times[self.size] = timestamp
+            self.values[self.size] = value
+            self.size += 1
+        else:
+            self.times[self.start] = timestamp
+            self.values[self.start] = value
+            self.start = (self.start + 1) % capacity
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, values) in recording order"""
+        if self.start == 0:
+            return self.times[:self.size], self.values[:self.size]
+        order = np.r_[self.start:self.size, 0:self.start]
+        return self.times[order], self.values[order]
+
+    def load(self, times: np.ndarray, values: np.ndarray):
+        """
+        Replace the samples with recorded ones, keeping the newest max_frames
+
+        Series stamped with a monotonic clock, which means nothing in this
+        process, are shifted to end now.
+        """
+        times, values = times[-self.max_frames:], values[-self.max_frames:]
+        if len(times) and times[-1] < MIN_WALL_CLOCK:
+            times = times + (time.time() - times[-1])
+        capacity = max(len(values), min(len(self.values), self.max_frames))
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.times[:len(times)] = times
+        self.values[:len(values)] = values
+        self.size = len(values)
+        self.start = 0
+
+    def clear(self):
+        self.size = 0
+        self.start = 0
+
+def _sample_rate(times: np.ndarray) -> Optional[float]:
+    """Median frame rate, None when the frame times don't reflect when the frames were captured"""
+    steps = np.diff(times)
+    if len(steps) == 0 or np.any(steps <= 0):
+        return None
+    step = float(np.median(steps))
+    if step < 1.0 / MAX_SAMPLE_RATE_HZ:
+        return None
+    regular = np.mean((steps >= step / 2) & (steps <= step * 2))
+    return 1.0 / step if regular >= MIN_REGULAR_STEPS else None
+
+def _despike(values: np.ndarray) -> np.ndarray:
+    """Running median, a single bad frame can't pull the filtered peak with it"""
+    padded = np.pad(values, DESPIKE_FRAMES // 2, mode="reflect")
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, DESPIKE_FRAMES), axis=1)
+
+def _uniform(times: np.ndarray, values: np.ndarray, sample_rate: float) -> np.ndarray:
+    """Resample to the median frame rate, filters assume uniform sampling"""
+    grid = np.arange(times[0], times[-1] + 0.5 / sample_rate, 1.0 / sample_rate)
+    return np.interp(grid, times, values)
+
+def refine_series(
+    times: np.ndarray,
+    values: np.ndarray,
+    method: str = "butterworth",
+    cutoff_hz: float = 6.0,
+    order: int = 4,
+    savgol_window_s: float = 0.25,
+    fallback: Optional[Tuple[float, float]] = None
+) -> Dict[str, Any]:
+    """
+    Zero-phase filter an angle series and recompute its ROM
+
+    Args:
+        times: Sample times in seconds
+        values: Angles in degrees
+        method: "butterworth" (low-pass at cutoff_hz, run with sosfiltfilt)
+            or "savgol" (Savitzky-Golay over savgol_window_s)
+        fallback: (min, max) reported when the series can't be filtered,
+            e.g. the tracker's held extremes
+
+    Returns:
+        Refined min, max and range. Single-frame spikes are removed with a
+        running median first, and the result is kept within the despiked
+        extremes since the filters overshoot on sharp turns. Irregular or burst timing falls
+        back to Savitzky-Golay over a few samples, and method "held" or
+        "none" means there were too few samples, or the frame rate was too
+        low, to filter, and the fallback or raw extremes are reported.
+    """
+    if method not in ("butterworth", "savgol", "none"):
+        raise ValueError(f"Unknown refinement method: {method}")
+    if len(values) == 0:
+        # Trackers stored before series were kept still have their held extremes
+        if fallback is not None:
+            low, high = fallback
+            return {"min": round(low, 1), "max": round(high, 1), "range": round(high - low, 1), "frames": 0, "method": "held"}
+        return {"min": 0.0, "max": 0.0, "range": 0.0, "frames": 0, "method": "none"}
+
+    times = np.asarray(times, dtype=np.float64)
+    signal = np.asarray(values, dtype=np.float64)
+    raw_low, raw_high = float(np.min(signal)), float(np.max(signal))
+    sample_rate = _sample_rate(times)
+    applied = "none"
+
+    if method != "none" and len(signal) >= MIN_REFINE_FRAMES:
+        from scipy.signal import butter, savgol_filter, sosfiltfilt
+
+        signal = _despike(signal)
+        raw_low, raw_high = float(np.min(signal)), float(np.max(signal))
+        if sample_rate is None:
+            # Sample spacing is unknown, smooth over neighbouring frames only
+            signal = savgol_filter(signal, FALLBACK_SAVGOL_FRAMES, polyorder=2)
+            applied = "savgol"
+        else:
+            signal = _uniform(times, signal, sample_rate)
+            if method == "butterworth" and cutoff_hz < 0.9 * sample_rate / 2:
+                sos = butter(order, cutoff_hz, btype="low", fs=sample_rate, output="sos")
+                padlen = min(len(signal) - 1, 3 * (2 * len(sos) + 1))
+                signal = sosfiltfilt(sos, signal, padlen=padlen)
+                applied = "butterworth"
+            else:
+                # Savitzky-Golay is also the fallback when the cutoff is above Nyquist
+                window = int(round(savgol_window_s * sample_rate)) | 1
+                window = min(window, len(signal) - (1 - len(signal) % 2))
+                if window >= 5:
+                    signal = savgol_filter(signal, window, polyorder=2)
+                    applied = "savgol"
+
+    if applied != "none":
+        low = min(max(float(np.min(signal)), raw_low), raw_high)
+        high = max(min(float(np.max(signal)), raw_high), raw_low)
+    elif fallback is not None:
+        low, high = fallback
+        applied = "held"
+    else:
+        low, high = raw_low, raw_high
+
+    return {
+        "min": round(low, 1),
+        "max": round(high, 1),
+        "range": round(high - low, 1),
+        "frames": int(len(values)),
+        "sample_rate_hz": round(sample_rate, 2) if sample_rate is not None else None,
+        "method": applied
+    }
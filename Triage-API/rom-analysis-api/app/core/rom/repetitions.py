@@ -0,0 +1,196 @@
+from typing import Any, Dict, Iterable, List, Optional
+from collections import deque
+
+import numpy as np
+
+# Smallest time step in seconds, for samples arriving with the same timestamp
+MIN_DT = 1e-3
+
+class RepetitionDetector:
+    """
+    Streaming repetition and movement-phase detector for one angle series
+
+    A repetition is an excursion away from a rest valley by at least
+    min_prominence degrees that comes back by min_prominence and past the
+    excursion's midpoint. The direction away from rest is taken from the
+    first excursion, so flexion (rising) and extension (falling) angles
+    both work. Memory is bounded by max_reps.
+    """
+
+    __slots__ = (
+        "min_prominence", "hold_speed", "max_reps",
+        "direction", "in_rep", "valley", "peak", "low", "high",
+        "count", "range_sum", "reps", "phase",
+        "_valley_time", "_last_value", "_last_time"
+    )
+
+    def __init__(self, min_prominence: float = 15.0, hold_speed: float = 10.0, max_reps: int = 20):
+        self.min_prominence = min_prominence
+        self.hold_speed = hold_speed
+        self.max_reps = max_reps
+
+        # +1 when repetitions raise the angle, -1 when they lower it, 0 until known
+        self.direction = 0
+        self.in_rep = False
+        # Rest valley and excursion peak, in direction-adjusted degrees
+        self.valley: Optional[float] = None
+        self.peak: Optional[float] = None
+        # Extremes seen before the direction is known
+        self.low: Optional[float] = None
+        self.high: Optional[float] = None
+
+        self.count = 0
+        self.range_sum = 0.0
+        self.reps = deque(maxlen=max_reps)
+        self.phase = "rest"
+
+        self._valley_time: Optional[float] = None
+        self._last_value: Optional[float] = None
+        self._last_time: Optional[float] = None
+
+    def update(self, value: float, timestamp: float) -> str:
+        """Add one angle sample and return the current phase"""
+        if self.direction == 0:
+            self._detect_direction(value, timestamp)
+
+        if self.direction != 0:
+            x = self.direction * value
+            if not self.in_rep:
+                if x <= self.valley:
+                    self.valley = x
+                    self._valley_time = timestamp
+                elif x - self.valley >= self.min_prominence:
+                    self.in_rep = True
+                    self.peak = x
+            else:
+                self.peak = max(self.peak, x)
+                midpoint = (self.valley + self.peak) / 2
+                if self.peak - x >= self.min_prominence and x <= midpoint:
+                    self._complete_rep(timestamp)
+                    self.valley = x
+                    self._valley_time = timestamp
+
+        self.phase = self._phase(value, timestamp)
+        self._last_value = value
+        self._last_time = timestamp
+        return self.phase
+
+    def _detect_direction(self, value: float, timestamp: float):
+        """Pick the direction from the first excursion of min_prominence"""
+        if self.low is None:
+            self.low = self.high = value
+            self._valley_time = timestamp
+            return
+
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        if value - self.low >= self.min_prominence:
+            self.direction = 1
+            self.valley = self.low
+        elif self.high - value >= self.min_prominence:
+            self.direction = -1
+            self.valley = -self.high
+
+    def _complete_rep(self, timestamp: float):
+        """Record the finished repetition in the signal's own units"""
+        start, peak = self.direction * self.valley, self.direction * self.peak
+        rep_range = self.peak - self.valley
+        self.count += 1
+        self.range_sum += rep_range
+        self.reps.append({
+            "rep": self.count,
+            "min": round(min(start, peak), 1),
+            "max": round(max(start, peak), 1),
+            "range": round(rep_range, 1),
+            "duration_s": round(timestamp - self._valley_time, 2) if self._valley_time is not None else None
+        })
+        self.in_rep = False
+        self.peak = None
+
+    def _phase(self, value: float, timestamp: float) -> str:
+        """
+        ascending (away from rest) or returning while moving, holding when
+        still during a repetition and rest when still outside one
+        """
+        if self.direction == 0 or self._last_value is None:
+            return "rest"
+
+        speed = (value - self._last_value) / max(timestamp - self._last_time, MIN_DT)
+        if abs(speed) < self.hold_speed:
+            return "holding" if self.in_rep else "rest"
+        return "ascending" if self.direction * speed > 0 else "returning"
+
+    def summary(self) -> Dict[str, Any]:
+        """Repetition count, phase and the last repetition's ROM"""
+        return {
+            "count": self.count,
+            "phase": self.phase,
+            "last_rep": self.reps[-1] if self.reps else None,
+            "mean_range": round(self.range_sum / self.count, 1) if self.count else 0.0
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable detector state"""
+        return {
+            "min_prominence": self.min_prominence,
+            "hold_speed": self.hold_speed,
+            "max_reps": self.max_reps,
+            "direction": self.direction,
+            "in_rep": self.in_rep,
+            "valley": self.valley,
+            "peak": self.peak,
+            "low": self.low,
+            "high": self.high,
+            "count": self.count,
+            "range_sum": self.range_sum,
+            "reps": list(self.reps),
+            "phase": self.phase
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RepetitionDetector":
+        """Restore a detector saved by to_dict"""
+        detector = cls(
+            min_prominence=data.get("min_prominence", 15.0),
+            hold_speed=data.get("hold_speed", 10.0),
+            max_reps=data.get("max_reps", 20)
+        )
+        for key in ("direction", "in_rep", "valley", "peak", "low", "high", "count", "range_sum", "phase"):
+            if key in data:
+                setattr(detector, key, data[key])
+        detector.reps.extend(data.get("reps", []))
+        return detector
+
+def detect_repetitions(
+    angles: Iterable[float],
+    timestamps: Optional[Iterable[float]] = None,
+    fps: float = 30.0,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Run the streaming detector over a recorded angle series
+
+    Args:
+        angles: Primary angle per frame, NaN where it wasn't measured
+        timestamps: Frame times in seconds, or None for frames at fps
+        fps: Frame rate used without timestamps
+        **kwargs: RepetitionDetector parameters
+
+    Returns:
+        Summary with every repetition and the phase of each frame
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    if timestamps is None:
+        timestamps = np.arange(len(angles)) / fps
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+
+    kwargs.setdefault("max_reps", len(angles))
+    detector = RepetitionDetector(**kwargs)
+    phases: List[Optional[str]] = []
+    for value, timestamp in zip(angles.tolist(), timestamps.tolist()):
+        phases.append(None if np.isnan(value) else detector.update(value, timestamp))
+
+    summary = detector.summary()
+    summary["reps"] = list(detector.reps)
+    summary["phases"] = phases
+    return summary
@@ -1,76 +1,333 @@
-from typing import Dict, Optional
-import numpy as np
+from typing import Any, Dict, Optional, Tuple
+import math
+import time
 from collections import deque
 
+from app.core.rom.repetitions import RepetitionDetector
+from app.core.rom.refinement import AngleSeries, refine_series
+from app.core.rom.codec import decode_tracker, encode_tracker
+
+# Longer pauses between frames don't count towards time in the normal range
+MAX_FRAME_GAP_S = 1.0
+
+# Valid frames between exact re-sums of the smoothing window, against float drift
+RESUM_INTERVAL = 1000
+
 class ROMTracker:
-    """Track ROM data for a session"""
-    
-    def __init__(self, body_part: str, movement_type: str, window_size: int = 5):
+    """
+    Track ROM data for a session
+
+    The current angle is a running-sum mean of the last window_size primary
+    angles. Min and max only move to an angle sustained for hold_frames
+    consecutive valid frames (sliding min/max over monotonic deques), so a
+    single outlier frame can't inflate the ROM. The smoothed angle also feeds
+    a RepetitionDetector. Every update is O(1) amortized. Besides the small
+    state fixed by window_size, hold_frames and the repetition history, the
+    raw angles are recorded in an AngleSeries of up to series_max_frames
+    samples at 12 bytes each, about 216 KB at the default 18000.
+    """
+
+    __slots__ = (
+        "body_part", "movement_type", "window_size", "hold_frames", "normal_range",
+        "min_angle", "max_angle", "peak_min_angle", "peak_max_angle",
+        "angle_history", "frame_count", "valid_frame_count",
+        "normal_frame_count", "time_in_normal_range",
+        "_window_sum", "_total_sum", "_total_sq_sum",
+        "repetitions", "series", "refined", "_hold_low", "_hold_high", "_last_update"
+    )
+
+    def __init__(
+        self,
+        body_part: str,
+        movement_type: str,
+        window_size: int = 5,
+        hold_frames: int = 3,
+        normal_range: Optional[Tuple[float, float]] = None,
+        repetition_params: Optional[Dict[str, float]] = None,
+        series_max_frames: int = 18000
+    ):
         self.body_part = body_part
         self.movement_type = movement_type
         self.window_size = window_size
-        
-        # ROM tracking
+        self.hold_frames = max(1, hold_frames)
+        self.normal_range = tuple(normal_range) if normal_range else None
+
+        # ROM tracking: sustained extremes, and the raw ones for reference
         self.min_angle: Optional[float] = None
         self.max_angle: Optional[float] = None
+        self.peak_min_angle: Optional[float] = None
+        self.peak_max_angle: Optional[float] = None
         self.angle_history = deque(maxlen=window_size)
-        
+
         # Frame counting
         self.frame_count = 0
         self.valid_frame_count = 0
-        
+        self.normal_frame_count = 0
+        self.time_in_normal_range = 0.0
+
+        self._window_sum = 0.0
+        self._total_sum = 0.0
+        self._total_sq_sum = 0.0
+        # (valid frame number, angle) candidates for the sliding min and max
+        self._hold_low = deque()
+        self._hold_high = deque()
+        self._last_update: Optional[float] = None
+
+        # Repetitions and phase of the smoothed angle
+        self.repetitions = RepetitionDetector(**(repetition_params or {}))
+
+        # Raw primary angles for the zero-phase refinement at session end
+        self.series = AngleSeries(series_max_frames)
+        self.refined: Optional[Dict[str, Any]] = None
+
     def update(self, angles: Dict[str, float], primary_angle_key: str) -> Dict[str, float]:
         """Update ROM with new angle measurements"""
         self.frame_count += 1
-        
+
         if primary_angle_key not in angles:
             return self.get_current_rom()
-        
-        angle = angles[primary_angle_key]
-        if np.isnan(angle):
+
+        angle = float(angles[primary_angle_key])
+        if math.isnan(angle):
             return self.get_current_rom()
-        
+
         self.valid_frame_count += 1
+        self._total_sum += angle
+        self._total_sq_sum += angle * angle
+
+        # Running-sum smoothing over the window
+        if len(self.angle_history) == self.window_size:
+            self._window_sum -= self.angle_history[0]
         self.angle_history.append(angle)
-        
-        # Calculate smoothed angle
-        smoothed_angle = np.mean(self.angle_history)
-        
-        # Update min/max
+        self._window_sum += angle
+        if self.valid_frame_count % RESUM_INTERVAL == 0:
+            self._window_sum = math.fsum(self.angle_history)
+        smoothed_angle = self._window_sum / len(self.angle_history)
+
+        now = time.monotonic()
+        self._update_extremes(angle)
+        self._update_time_in_range(smoothed_angle, now)
+        self.repetitions.update(smoothed_angle, now)
+        self.series.append(time.time(), angle)
+
+        return self.get_current_rom(current=smoothed_angle)
+
+    def _update_extremes(self, angle: float):
+        """Move min/max to the extremes held over the last hold_frames angles"""
+        n = self.valid_frame_count
+        low, high = self._hold_low, self._hold_high
+
+        while low and low[-1][1] >= angle:
+            low.pop()
+        low.append((n, angle))
+        while high and high[-1][1] <= angle:
+            high.pop()
+        high.append((n, angle))
+
+        # Drop candidates that left the hold window
+        if low[0][0] <= n - self.hold_frames:
+            low.popleft()
+        if high[0][0] <= n - self.hold_frames:
+            high.popleft()
+
+        if self.peak_min_angle is None:
+            self.peak_min_angle = self.peak_max_angle = angle
+        else:
+            self.peak_min_angle = min(self.peak_min_angle, angle)
+            self.peak_max_angle = max(self.peak_max_angle, angle)
+
+        if n < self.hold_frames:
+            return
+
+        # The angle stayed at least this high (low) for the whole window
+        sustained_high = low[0][1]
+        sustained_low = high[0][1]
         if self.min_angle is None:
-            self.min_angle = smoothed_angle
-            self.max_angle = smoothed_angle
+            self.min_angle = sustained_low
+            self.max_angle = sustained_high
         else:
-            self.min_angle = min(self.min_angle, smoothed_angle)
-            self.max_angle = max(self.max_angle, smoothed_angle)
-        
-        return self.get_current_rom(current=smoothed_angle)
-    
+            self.min_angle = min(self.min_angle, sustained_low)
+            self.max_angle = max(self.max_angle, sustained_high)
+
+    def _update_time_in_range(self, smoothed_angle: float, now: float):
+        """Count frames and seconds the smoothed angle spends in the normal range"""
+        elapsed = now - self._last_update if self._last_update is not None else 0.0
+        self._last_update = now
+
+        if self.normal_range is None:
+            return
+        low, high = self.normal_range
+        if low <= smoothed_angle <= high:
+            self.normal_frame_count += 1
+            self.time_in_normal_range += min(elapsed, MAX_FRAME_GAP_S)
+
     def get_current_rom(self, current: Optional[float] = None) -> Dict[str, float]:
-        """Get current ROM data"""
-        if self.min_angle is None:
+        """Get current ROM data, min and max stay 0 until an angle has been held for hold_frames"""
+        current_angle = current if current is not None else (
+            self._window_sum / len(self.angle_history) if self.angle_history else 0.0
+        )
+
+        extremes = self.held_extremes()
+        if extremes is None:
             return {
-                "current": 0.0,
+                "current": round(current_angle, 1),
                 "min": 0.0,
                 "max": 0.0,
                 "range": 0.0
             }
-        
-        current_angle = current if current is not None else (
-            np.mean(self.angle_history) if self.angle_history else 0.0
-        )
-        
+
+        low, high = extremes
         return {
             "current": round(current_angle, 1),
-            "min": round(self.min_angle, 1),
-            "max": round(self.max_angle, 1),
-            "range": round(self.max_angle - self.min_angle, 1)
+            "min": round(low, 1),
+            "max": round(high, 1),
+            "range": round(high - low, 1)
         }
+
+    def held_extremes(self) -> Optional[Tuple[float, float]]:
+        """
+        (min, max) sustained for hold_frames, None before the first full hold window
+
+        While the angle has moved less than its own variation within one hold
+        window, the sustained min lies above the sustained max; both are then
+        reported at their midpoint, a zero range.
+        """
+        if self.min_angle is None:
+            return None
+        if self.max_angle < self.min_angle:
+            middle = (self.min_angle + self.max_angle) / 2
+            return middle, middle
+        return self.min_angle, self.max_angle
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        """Session statistics of the primary angle"""
+        valid = self.valid_frame_count
+        mean = self._total_sum / valid if valid else None
+        std = math.sqrt(max(0.0, self._total_sq_sum / valid - mean * mean)) if valid else None
+
+        return {
+            "mean": round(mean, 1) if mean is not None else None,
+            "std": round(std, 1) if std is not None else None,
+            "peak_min": round(self.peak_min_angle, 1) if self.peak_min_angle is not None else None,
+            "peak_max": round(self.peak_max_angle, 1) if self.peak_max_angle is not None else None,
+            "valid_ratio": round(valid / self.frame_count, 3) if self.frame_count else 0.0,
+            "frames_in_normal_range": self.normal_frame_count,
+            "normal_range_ratio": round(self.normal_frame_count / valid, 3) if valid else 0.0,
+            "time_in_normal_range_s": round(self.time_in_normal_range, 2)
+        }
+
+    def refine(self, method: str = "butterworth", cutoff_hz: float = 6.0) -> Dict[str, Any]:
+        """ROM recomputed from the zero-phase filtered series, kept in refined"""
+        times, values = self.series.arrays()
+        self.refined = refine_series(
+            times, values,
+            method=method,
+            cutoff_hz=cutoff_hz,
+            fallback=self.held_extremes()
+        )
+        return self.refined
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable tracker state"""
+        return {
+            "body_part": self.body_part,
+            "movement_type": self.movement_type,
+            "window_size": self.window_size,
+            "hold_frames": self.hold_frames,
+            "normal_range": list(self.normal_range) if self.normal_range else None,
+            "min_angle": self.min_angle,
+            "max_angle": self.max_angle,
+            "peak_min_angle": self.peak_min_angle,
+            "peak_max_angle": self.peak_max_angle,
+            "frame_count": self.frame_count,
+            "valid_frame_count": self.valid_frame_count,
+            "normal_frame_count": self.normal_frame_count,
+            "time_in_normal_range": self.time_in_normal_range,
+            "total_sum": self._total_sum,
+            "total_sq_sum": self._total_sq_sum,
+            "angle_history": list(self.angle_history),
+            "hold_low": [list(item) for item in self._hold_low],
+            "hold_high": [list(item) for item in self._hold_high],
+            "repetitions": self.repetitions.to_dict(),
+            "refined": self.refined,
+            "stats": self.get_stats()
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        body_part: Optional[str] = None,
+        movement_type: Optional[str] = None,
+        **kwargs
+    ) -> "ROMTracker":
+        """Restore a tracker saved by to_dict, older states without the newer fields included"""
+        kwargs.setdefault("window_size", data.get("window_size", 5))
+        kwargs.setdefault("hold_frames", data.get("hold_frames", 3))
+        kwargs.setdefault("normal_range", data.get("normal_range"))
+        tracker = cls(
+            body_part or data["body_part"],
+            movement_type or data["movement_type"],
+            **kwargs
+        )
+
+        tracker.min_angle = data.get("min_angle")
+        tracker.max_angle = data.get("max_angle")
+        tracker.peak_min_angle = data.get("peak_min_angle", tracker.min_angle)
+        tracker.peak_max_angle = data.get("peak_max_angle", tracker.max_angle)
+        tracker.frame_count = data.get("frame_count", 0)
+        tracker.valid_frame_count = data.get("valid_frame_count", 0)
+        tracker.normal_frame_count = data.get("normal_frame_count", 0)
+        tracker.time_in_normal_range = data.get("time_in_normal_range", 0.0)
+
+        tracker.angle_history.extend(data.get("angle_history", []))
+        tracker._window_sum = math.fsum(tracker.angle_history)
+        tracker._total_sum = data.get("total_sum", tracker._window_sum)
+        tracker._total_sq_sum = data.get("total_sq_sum", math.fsum(a * a for a in tracker.angle_history))
+        tracker._hold_low.extend(tuple(item) for item in data.get("hold_low", []))
+        tracker._hold_high.extend(tuple(item) for item in data.get("hold_high", []))
+        tracker.refined = data.get("refined")
+        if "repetitions" in data:
+            tracker.repetitions = RepetitionDetector.from_dict(data["repetitions"])
+        if "series" in data:
+            tracker.series.load(*data["series"])
+        return tracker
+    
+    def to_bytes(self, include_series: bool = True) -> bytes:
+        """Compact binary state, include_series=False leaves out the angle series (see app.core.rom.codec)"""
+        return encode_tracker(self, include_series)
     
+    @classmethod
+    def from_bytes(
+        cls,
+        data: bytes,
+        body_part: Optional[str] = None,
+        movement_type: Optional[str] = None,
+        load_series: bool = True,
+        **kwargs
+    ) -> "ROMTracker":
+        """Restore a tracker saved by to_bytes, load_series=False skips the angle series"""
+        return cls.from_dict(decode_tracker(data, load_series), body_part, movement_type, **kwargs)
+
     def reset(self):
         """Reset ROM tracking"""
         self.min_angle = None
         self.max_angle = None
+        self.peak_min_angle = None
+        self.peak_max_angle = None
         self.angle_history.clear()
         self.frame_count = 0
-        self.valid_frame_count = 0
\ No newline at end of file
+        self.valid_frame_count = 0
+        self.normal_frame_count = 0
+        self.time_in_normal_range = 0.0
+        self._window_sum = 0.0
+        self._total_sum = 0.0
+        self._total_sq_sum = 0.0
+        self._hold_low.clear()
+        self._hold_high.clear()
+        self._last_update = None
+        self.series.clear()
+        self.refined = None
+        self.repetitions = RepetitionDetector(
+            self.repetitions.min_prominence, self.repetitions.hold_speed, self.repetitions.max_reps
+        )
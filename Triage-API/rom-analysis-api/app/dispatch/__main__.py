@@ -0,0 +1,50 @@
+"""
+Run the API as several worker processes behind the session-affine dispatcher
+
+    python -m app.dispatch --host 0.0.0.0 --port 8000 --workers 4
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+
+from app.config import settings
+from app.dispatch.dispatcher import Dispatcher
+from app.dispatch.workers import WorkerPool
+
+def worker_env(workers: int) -> dict:
+    """
+    Environment for the worker processes
+
+    ORT_INTRA_OP_THREADS=0 splits every core between one process's concurrent
+    frames, so with several workers the cores are split between them first.
+    """
+    if settings.ORT_INTRA_OP_THREADS:
+        return {}
+    per_worker = (os.cpu_count() or 1) // max(1, workers * settings.INFERENCE_WORKERS)
+    return {"ORT_INTRA_OP_THREADS": str(max(1, per_worker))}
+
+def main():
+    parser = argparse.ArgumentParser(description="Session-affine dispatcher over API worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--app", default="app.main:app", help="ASGI app each worker serves")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    pool = WorkerPool(
+        args.workers,
+        app=args.app,
+        socket_dir=settings.DISPATCHER_SOCKET_DIR or None,
+        health_interval_s=settings.WORKER_HEALTH_INTERVAL_S,
+        start_timeout_s=settings.WORKER_START_TIMEOUT_S,
+        replicas=settings.HASH_RING_REPLICAS,
+        env=worker_env(args.workers)
+    )
+    uvicorn.run(Dispatcher(pool), host=args.host, port=args.port, log_level=args.log_level)
+
+if __name__ == "__main__":
+    main()
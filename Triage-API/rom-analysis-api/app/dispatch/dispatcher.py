@@ -0,0 +1,257 @@
+"""
+Session-affine front dispatcher
+
+A plain ASGI app in front of several API worker processes. Every request
+and WebSocket carrying a session id is forwarded to the worker owning that
+session on the hash ring, so a session's trackers live in one process.
+Requests without a session go to the least loaded worker.
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+import websockets
+
+from app.dispatch.workers import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+STATUS_PATH = "/dispatcher/workers"
+
+# Routes carrying the session id in their path
+_SESSION_PATHS = (
+    re.compile(r"^/ws(?:/stream)?/(?P<session_id>[^/]+)$"),
+    re.compile(r"^/api/v1/sessions/session/(?P<session_id>[^/]+)"),
+)
+# POST /analyze carries it in the JSON body
+_BODY_SESSION = re.compile(rb'"session_id"\s*:\s*"(?P<session_id>[^"\\]*)"')
+
+# Not forwarded between client and worker
+_HOP_BY_HOP = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"host", b"content-length"
+}
+
+def session_from_scope(scope) -> Optional[str]:
+    """Session id from the path or the session_id query parameter"""
+    for pattern in _SESSION_PATHS:
+        match = pattern.match(scope["path"])
+        if match:
+            return match.group("session_id")
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    values = query.get("session_id")
+    return values[0] if values else None
+
+def session_from_body(body: bytes) -> Optional[str]:
+    match = _BODY_SESSION.search(body)
+    return match.group("session_id").decode("utf-8") if match else None
+
+def _forward_headers(scope) -> List[Tuple[bytes, bytes]]:
+    headers = [(k, v) for k, v in scope["headers"] if k.lower() not in _HOP_BY_HOP]
+    client = scope.get("client")
+    if client:
+        headers.append((b"x-forwarded-for", client[0].encode("latin-1")))
+    return headers
+
+class Dispatcher:
+    """ASGI app routing each session to its worker in a WorkerPool"""
+
+    def __init__(self, pool: WorkerPool):
+        self.pool = pool
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.pool.start()
+                except Exception as e:
+                    logger.error(f"Failed to start workers: {e}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.pool.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        if scope["path"] == STATUS_PATH:
+            await self._respond(send, 200, self.pool.status())
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            # The client went away mid-request, don't run a truncated one
+            return
+        session_id = session_from_scope(scope)
+        if session_id is None and body:
+            session_id = session_from_body(body)
+        worker = self.pool.route(session_id)
+        if worker is None:
+            await self._respond(send, 503, {"detail": "No healthy worker available"})
+            return
+
+        path = scope.get("raw_path") or scope["path"].encode("utf-8")
+        url = path.decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+
+        worker.in_flight += 1
+        worker.requests += 1
+        try:
+            request = worker.client.build_request(
+                scope["method"], url, headers=_forward_headers(scope), content=body
+            )
+            try:
+                response = await worker.client.send(request, stream=True)
+            except httpx.TransportError as e:
+                worker.errors += 1
+                if isinstance(e, httpx.ConnectError):
+                    self.pool.mark_down(worker)
+                logger.error(f"Worker {worker.index} unreachable for {scope['method']} {scope['path']}: {e}")
+                await self._respond(send, 502, {"detail": "Worker unavailable"})
+                return
+            try:
+                await send({
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (k, v) for k, v in response.headers.raw if k.lower() not in _HOP_BY_HOP
+                    ]
+                })
+                async for chunk in response.aiter_raw():
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b""})
+            finally:
+                await response.aclose()
+        finally:
+            worker.in_flight -= 1
+
+    async def _websocket(self, scope, receive, send):
+        worker = self.pool.route(session_from_scope(scope))
+        # Wait for the client's handshake before answering it
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if worker is None:
+            await send({"type": "websocket.close", "code": 1013})
+            return
+
+        url = (scope.get("raw_path") or scope["path"].encode("utf-8")).decode("latin-1")
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        try:
+            upstream = await websockets.unix_connect(
+                worker.socket_path,
+                f"ws://worker{url}",
+                subprotocols=scope.get("subprotocols") or None,
+                extra_headers=[
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in _forward_headers(scope)
+                    if not k.lower().startswith(b"sec-websocket")
+                ],
+                max_size=None,
+                compression=None
+            )
+        except OSError as e:
+            worker.errors += 1
+            self.pool.mark_down(worker)
+            logger.error(f"WebSocket to worker {worker.index} unreachable for {scope['path']}: {e}")
+            await send({"type": "websocket.close", "code": 1011})
+            return
+        except Exception as e:
+            worker.errors += 1
+            logger.error(f"WebSocket to worker {worker.index} failed for {scope['path']}: {e}")
+            await send({"type": "websocket.close", "code": 1011})
+            return
+
+        await send({"type": "websocket.accept", "subprotocol": upstream.subprotocol})
+        worker.websockets += 1
+        worker.requests += 1
+        try:
+            close_code = await self._pump(receive, send, upstream)
+        finally:
+            worker.websockets -= 1
+            await upstream.close()
+        if close_code is not None:
+            try:
+                await send({"type": "websocket.close", "code": close_code})
+            except Exception:
+                pass
+
+    async def _pump(self, receive, send, upstream) -> Optional[int]:
+        """
+        Relay messages both ways until either side closes
+
+        Returns:
+            Close code to send the client, None when the client closed first
+        """
+        async def client_to_worker():
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    await upstream.close(code=message.get("code", 1000))
+                    return None
+                if message.get("bytes") is not None:
+                    await upstream.send(message["bytes"])
+                elif message.get("text") is not None:
+                    await upstream.send(message["text"])
+
+        async def worker_to_client():
+            try:
+                async for data in upstream:
+                    if isinstance(data, bytes):
+                        await send({"type": "websocket.send", "bytes": data})
+                    else:
+                        await send({"type": "websocket.send", "text": data})
+            except websockets.ConnectionClosed:
+                pass
+            return upstream.close_code or 1000
+
+        tasks = [asyncio.ensure_future(client_to_worker()), asyncio.ensure_future(worker_to_client())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        task = done.pop()
+        try:
+            return task.result()
+        except Exception as e:
+            logger.error(f"WebSocket relay failed: {e}")
+            return 1011
+
+    @staticmethod
+    async def _read_body(receive) -> Optional[bytes]:
+        """Whole request body, None when the client disconnected before sending it"""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _respond(send, status: int, content: Dict):
+        body = json.dumps(content).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,59 @@
+import bisect
+import hashlib
+from typing import Dict, Hashable, Iterable, List, Optional
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes
+
+    Each node owns replicas points on the ring and a key belongs to the
+    first point at or after its hash. Removing a node only moves the keys
+    it owned, spread over the remaining nodes.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 64):
+        self.replicas = max(1, replicas)
+        self._points: List[int] = []
+        self._owners: Dict[int, Hashable] = {}
+        self._nodes: List[Hashable] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Hashable):
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            # A point colliding with another node's keeps its first owner
+            if point in self._owners:
+                continue
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: Hashable):
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        self._points = [p for p in self._points if self._owners[p] != node]
+        self._owners = {p: self._owners[p] for p in self._points}
+
+    def get(self, key: str) -> Optional[Hashable]:
+        """Node owning a key, None on an empty ring"""
+        if not self._points:
+            return None
+        index = bisect.bisect_left(self._points, _hash(key))
+        return self._owners[self._points[index % len(self._points)]]
+
+    @property
+    def nodes(self) -> List[Hashable]:
+        return list(self._nodes)
+
+    def __contains__(self, node: Hashable) -> bool:
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from app.dispatch.ring import HashRing
+
+logger = logging.getLogger(__name__)
+
+# Directory containing the app package, workers are started from it
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+READY_PATH = "/api/v1/health/ready"
+
+class Worker:
+    """One uvicorn worker process serving the API on a Unix socket"""
+
+    def __init__(self, index: int, socket_path: str):
+        self.index = index
+        self.socket_path = socket_path
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.client: Optional[httpx.AsyncClient] = None
+
+        # Health: the process answers on its socket, ready once its model is loaded
+        self.healthy = False
+        self.ready = False
+        self.last_check: Optional[float] = None
+        self.readiness: Optional[Dict] = None
+
+        # Load
+        self.in_flight = 0
+        self.websockets = 0
+        self.requests = 0
+        self.errors = 0
+        self.restarts = 0
+        self.started_at: Optional[float] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, app: str, env: Dict[str, str]):
+        """Spawn the worker process, replacing a stale socket file"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", app, "--uds", self.socket_path,
+            cwd=PROJECT_ROOT,
+            env=env
+        )
+        self.started_at = time.monotonic()
+        self.healthy = self.ready = False
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=self.socket_path),
+                base_url="http://worker",
+                timeout=None
+            )
+        logger.info(f"Started worker {self.index} (pid {self.process.pid}) on {self.socket_path}")
+
+    async def check(self, timeout: float = 5.0) -> bool:
+        """Probe the worker's readiness endpoint, healthy when it answers at all"""
+        self.last_check = time.monotonic()
+        if not self.alive:
+            self.healthy = self.ready = False
+            return False
+        try:
+            response = await self.client.get(READY_PATH, timeout=timeout)
+            self.readiness = response.json()
+            self.healthy = True
+            self.ready = self.readiness.get("status") == "ready"
+        except Exception:
+            self.healthy = self.ready = False
+        return self.healthy
+
+    async def stop(self, timeout: float = 10.0):
+        """Terminate the process, killing it if it doesn't exit in time"""
+        if self.alive:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+        self.healthy = self.ready = False
+
+    def to_dict(self) -> Dict:
+        """Health and load, for the dispatcher's status endpoint"""
+        now = time.monotonic()
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process is not None else None,
+            "alive": self.alive,
+            "healthy": self.healthy,
+            "ready": self.ready,
+            "in_flight": self.in_flight,
+            "websockets": self.websockets,
+            "requests": self.requests,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "uptime_s": round(now - self.started_at, 1) if self.started_at is not None else None,
+            "last_check_s_ago": round(now - self.last_check, 1) if self.last_check is not None else None,
+            "readiness": self.readiness
+        }
+
+class WorkerPool:
+    """
+    API worker processes with session-affine routing
+
+    Sessions are mapped to workers on a consistent hash ring of the healthy
+    workers, so every request and stream of a session reaches the process
+    holding its trackers. A worker that stops answering leaves the ring,
+    moving only its own sessions, and is restarted if its process exited.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        app: str = "app.main:app",
+        socket_dir: Optional[str] = None,
+        health_interval_s: float = 5.0,
+        start_timeout_s: float = 300.0,
+        replicas: int = 64,
+        env: Optional[Dict[str, str]] = None
+    ):
+        self.app = app
+        self.health_interval_s = health_interval_s
+        self.start_timeout_s = start_timeout_s
+        self.socket_dir = socket_dir or tempfile.mkdtemp(prefix="rom-workers-")
+        self.env = dict(os.environ, **(env or {}))
+        self.workers = [
+            Worker(i, os.path.join(self.socket_dir, f"worker-{i}.sock"))
+            for i in range(max(1, num_workers))
+        ]
+        self.ring = HashRing(replicas=replicas)
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Spawn every worker, wait until they answer, then start health checks"""
+        for worker in self.workers:
+            await worker.start(self.app, self.env)
+
+        deadline = time.monotonic() + self.start_timeout_s
+        pending = list(self.workers)
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            results = await asyncio.gather(*(w.check() for w in pending))
+            pending = [w for w, healthy in zip(pending, results) if not healthy]
+        for worker in pending:
+            logger.error(f"Worker {worker.index} did not come up within {self.start_timeout_s}s")
+
+        self._update_ring()
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        logger.info(f"{len(self.ring)}/{len(self.workers)} workers healthy")
+
+    def route(self, session_id: Optional[str]) -> Optional[Worker]:
+        """Worker owning a session, the least loaded healthy one without a session"""
+        if session_id is not None:
+            index = self.ring.get(session_id)
+            return self.workers[index] if index is not None else None
+        healthy = [w for w in self.workers if w.healthy]
+        if not healthy:
+            return None
+        # Ties go to the worker that has served the fewest requests
+        return min(healthy, key=lambda w: (w.in_flight + w.websockets, w.requests))
+
+    def mark_down(self, worker: Worker):
+        """Take a worker that refused a connection off the ring until its next health check"""
+        worker.healthy = worker.ready = False
+        self._update_ring()
+
+    def status(self) -> Dict:
+        return {
+            "workers": [w.to_dict() for w in self.workers],
+            "healthy": len(self.ring),
+            "in_flight": sum(w.in_flight for w in self.workers),
+            "websockets": sum(w.websockets for w in self.workers)
+        }
+
+    async def close(self):
+        """Stop health checks and every worker"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.gather(*(w.stop() for w in self.workers))
+
+    def _update_ring(self):
+        for worker in self.workers:
+            if worker.healthy and worker.index not in self.ring:
+                self.ring.add(worker.index)
+                logger.info(f"Worker {worker.index} joined the ring")
+            elif not worker.healthy and worker.index in self.ring:
+                self.ring.remove(worker.index)
+                logger.warning(f"Worker {worker.index} left the ring, its sessions move to other workers")
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval_s)
+            for worker in self.workers:
+                if worker.process is not None and not worker.alive:
+                    logger.error(f"Worker {worker.index} exited with code {worker.process.returncode}, restarting")
+                    worker.restarts += 1
+                    await worker.start(self.app, self.env)
+            await asyncio.gather(*(w.check() for w in self.workers))
+            self._update_ring()
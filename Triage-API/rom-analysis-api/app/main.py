@@ -1,3 +1,8 @@
+import time
+
+# Measure time-to-ready from the first import of the app
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -16,20 +21,48 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
     # Startup
+    _startup_started = time.perf_counter()
     logger.info("Starting ROM Analysis API...")
     
+    from app.core.pose.model_manager import ModelManager
+    ModelManager.startup_timings["import_s"] = round(_startup_started - _import_started, 3)
+    
     try:
-        from app.core.pose.model_manager import ModelManager
+        # Load the model once, warm it up, then build the shared services on top
         ModelManager.initialize()
+        ModelManager.warm_up(settings.STARTUP_WARMUP_FRAMES)
+        
+        from app.api.dependencies import get_frame_analyzer
+        frame_analyzer = get_frame_analyzer()
+        
+        storage = frame_analyzer.session_manager.storage
+        if hasattr(storage, "ping") and not await storage.ping():
+            logger.warning(f"Session storage at {settings.REDIS_URL} is not reachable yet")
+        
+        # Session-end refinement runs inline, so import its filters up front
+        if settings.FINALIZE_FILTER != "none":
+            import scipy.signal  # noqa: F401
         logger.info("✓ Model manager initialized successfully")
     except Exception as e:
         logger.error(f"✗ Failed to initialize model manager: {e}")
         # Don't fail startup, let the health check report the issue
     
+    ModelManager.startup_timings["time_to_ready_s"] = round(time.perf_counter() - _import_started, 3)
+    logger.info(f"Startup took {ModelManager.startup_timings}")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down ROM Analysis API...")
+    
+    from app.services.inference_executor import shutdown_inference_executor
+    shutdown_inference_executor()
+    
+    from app.core.pose.processor import PoseProcessor
+    PoseProcessor.shutdown()
+    
+    from app.api.dependencies import close_storage
+    await close_storage()
 
 # Create FastAPI app
 app = FastAPI(
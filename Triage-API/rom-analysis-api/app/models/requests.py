@@ -1,9 +1,12 @@
 from pydantic import BaseModel, Field
+from typing import List, Union
 
 class FrameAnalysisRequest(BaseModel):
     frame_base64: str = Field(..., description="Base64 encoded image")
     session_id: str = Field(..., description="Unique session identifier")
     body_part: str = Field(..., description="Body part to analyze")
-    movement_type: str = Field(..., description="Type of movement")
+    movement_type: Union[str, List[str]] = Field(
+        ..., description="Type of movement, a list of them or \"all\" for every movement of the body part"
+    )
     include_keypoints: bool = Field(False, description="Include keypoints in response")
     include_visualization: bool = Field(False, description="Include visual feedback")
\ No newline at end of file
@@ -30,6 +30,19 @@ class ROMData(BaseModel):
     max: float
     range: float
 
+class RepetitionROM(BaseModel):
+    rep: int
+    min: float
+    max: float
+    range: float
+    duration_s: Optional[float] = None
+
+class RepetitionData(BaseModel):
+    count: int
+    phase: str
+    last_rep: Optional[RepetitionROM] = None
+    mean_range: float
+
 class AnalysisResponse(BaseModel):
     timestamp: datetime
     frame_id: str
@@ -42,6 +55,19 @@ class AnalysisResponse(BaseModel):
     validation: ValidationData
     guidance: GuidanceData
     frame_metrics: FrameMetrics
+    repetitions: Optional[RepetitionData] = None
+    keypoints: Optional[Dict[str, KeypointData]] = None
+    skeleton_connections: Optional[List[List[str]]] = None
+    message: Optional[str] = None
+
+class MultiMovementResponse(BaseModel):
+    timestamp: datetime
+    frame_id: str
+    body_part: str
+    movement_type: List[str]
+    pose_detected: bool
+    pose_confidence: float
+    movements: Dict[str, AnalysisResponse]
+    frame_metrics: FrameMetrics
     keypoints: Optional[Dict[str, KeypointData]] = None
     skeleton_connections: Optional[List[List[str]]] = None
-    message: Optional[str] = None
\ No newline at end of file
@@ -2,29 +2,31 @@ import base64
 import cv2
 import numpy as np
 import uuid
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Union
 from datetime import datetime
 import logging
 import time
 
 from app.core.pose.processor import PoseProcessor
 from app.core.body_parts.registry import MovementRegistry
+from app.core.body_parts.base import Movement
 from app.core.rom.tracker import ROMTracker
 from app.services.session_manager import SessionManager
 from app.services.image_processor import ImageProcessor
+from app.services.inference_executor import InferenceExecutor, get_inference_executor
 from app.models.responses import AnalysisResponse, ROMData
-from app.utils.exceptions import AnalysisError
-from physiotrack_core.rom_calculations import ROMCalculator
+from app.utils.exceptions import AnalysisError, PoseDetectionError
 
 logger = logging.getLogger(__name__)
 
 class FrameAnalyzer:
     """Main service for analyzing frames - returns only JSON data"""
     
-    def __init__(self, session_manager: SessionManager):
+    def __init__(self, session_manager: SessionManager, executor: Optional[InferenceExecutor] = None):
         self.pose_processor = PoseProcessor()
         self.session_manager = session_manager
         self.image_processor = ImageProcessor()
+        self.executor = executor or get_inference_executor()
         
         # Check if pose processor is initialized
         if not self.pose_processor.is_initialized:
@@ -32,84 +34,121 @@ class FrameAnalyzer:
     
     async def analyze(
         self,
-        frame_base64: str,
+        frame_base64: Optional[str],
         session_id: str,
         body_part: str,
-        movement_type: str,
+        movement_type: Union[str, List[str]],
         include_keypoints: bool = False,
-        include_visualization: bool = False  # Ignored - no visualization
+        include_visualization: bool = False,  # Ignored - no visualization
+        frame_bytes: Optional[Union[bytes, memoryview]] = None
     ) -> Dict:
-        """Analyze a single frame and return JSON data only"""
+        """
+        Analyze a single frame (base64 string or raw image bytes) and return JSON data only
+        
+        movement_type is one movement, a list of them or "all" for every movement
+        of the body part. Several movements share one pose inference and come back
+        under "movements", keyed by movement type.
+        """
         
         logger.info(f"Starting analysis for {body_part} - {movement_type}")
         start_time = time.time()
         
-        # Validate movement is supported
-        if not MovementRegistry.is_registered(body_part, movement_type):
-            # Fall back to ROMCalculator if not in registry
-            if body_part not in ROMCalculator.MOVEMENT_ANGLES:
-                raise AnalysisError(f"Unsupported body part: {body_part}")
-            if movement_type not in ROMCalculator.MOVEMENT_ANGLES[body_part]:
-                raise AnalysisError(f"Unsupported movement for {body_part}: {movement_type}")
+        # Validate movements are supported
+        movements = self._resolve_movements(body_part, movement_type)
         
-        # Decode frame
-        try:
-            frame = self.image_processor.decode_base64(frame_base64)
-            logger.info(f"Frame decoded successfully: shape={frame.shape}")
-        except Exception as e:
-            logger.error(f"Failed to decode frame: {e}")
-            raise AnalysisError(f"Failed to decode frame: {str(e)}")
-        
-        # Detect pose
-        try:
-            keypoints, confidence = self.pose_processor.process_frame(frame)
-            logger.info(f"Pose detection complete: {len(keypoints)} keypoints, confidence={confidence}")
-        except Exception as e:
-            logger.error(f"Pose detection failed: {e}")
-            keypoints, confidence = {}, 0.0
+        # Decode, pose inference and angle maths run on the inference executor
+        # so the event loop stays free for other sessions
+        frame_result = await self.executor.run(
+            self._analyze_frame, frame_base64, frame_bytes, session_id, list(movements.values())
+        )
+        keypoints = frame_result["keypoints"]
+        confidence = frame_result["confidence"]
         
         # Generate frame ID
         frame_id = f"{session_id}_{uuid.uuid4().hex[:8]}"
         
+        results = {}
+        for (name, movement), movement_result in zip(movements.items(), frame_result["movements"]):
+            results[name] = await self._movement_response(
+                frame_id, session_id, body_part, name, movement,
+                movement_result, keypoints, confidence, start_time
+            )
+        
+        if isinstance(movement_type, str) and movement_type != "all":
+            response_data = results[movement_type]
+        else:
+            response_data = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "frame_id": frame_id,
+                "body_part": body_part,
+                "movement_type": list(results),
+                "pose_detected": bool(keypoints),
+                "pose_confidence": round(confidence, 3),
+                "movements": results,
+                "frame_metrics": {
+                    "keypoints_detected": len(keypoints),
+                    "angles_calculated": sum(len(r["angles"]) for r in results.values()),
+                    "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+                }
+            }
+        
+        # Add keypoints if requested (for visualization in frontend)
+        positioned = any(not r["invalid_message"] for r in frame_result["movements"])
+        if include_keypoints and keypoints and positioned:
+            response_data["keypoints"] = keypoints.to_json()
+            
+            # Add skeleton connections for frontend visualization
+            response_data["skeleton_connections"] = self._get_skeleton_connections()
+        
+        return response_data
+    
+    def _resolve_movements(self, body_part: str, movement_type: Union[str, List[str]]) -> Dict[str, Movement]:
+        """Registered movements by type for one movement type, a list of them or "all" """
+        if not MovementRegistry.list_movements(body_part):
+            raise AnalysisError(f"Unsupported body part: {body_part}")
+        
+        if movement_type == "all":
+            names = MovementRegistry.list_movements(body_part)
+        elif isinstance(movement_type, str):
+            names = [movement_type]
+        else:
+            names = list(dict.fromkeys(movement_type))
+        if not names:
+            raise AnalysisError(f"No movement requested for {body_part}")
+        
+        movements = {}
+        for name in names:
+            if not MovementRegistry.is_registered(body_part, name):
+                raise AnalysisError(f"Unsupported movement for {body_part}: {name}")
+            movements[name] = MovementRegistry.get_movement(body_part, name)
+        return movements
+    
+    async def _movement_response(
+        self,
+        frame_id: str,
+        session_id: str,
+        body_part: str,
+        movement_type: str,
+        movement: Movement,
+        movement_result: Dict,
+        keypoints: Dict[str, np.ndarray],
+        confidence: float,
+        start_time: float
+    ) -> Dict:
+        """Update one movement's ROM tracker with the frame and build its response"""
         if not keypoints:
             return self._create_no_pose_response(
                 frame_id, session_id, body_part, movement_type
             )
         
-        # Try to use MovementRegistry first
-        try:
-            if MovementRegistry.is_registered(body_part, movement_type):
-                # Use registered movement class
-                movement_class = MovementRegistry.get_movement(body_part, movement_type)
-                movement = movement_class()
-                
-                # Validate position
-                valid, message = movement.validate_position(keypoints)
-                if not valid:
-                    return self._create_invalid_position_response(
-                        frame_id, session_id, body_part, movement_type, message, confidence
-                    )
-                
-                # Calculate angles
-                angles = movement.calculate_angles(keypoints)
-                primary_angle_key = movement.primary_angle
-                normal_range = movement.normal_range
-                
-                # Get max range from ROMCalculator
-                movement_config = ROMCalculator.MOVEMENT_ANGLES.get(body_part, {}).get(movement_type, {})
-                max_range = movement_config.get('max_range', normal_range)
-            else:
-                # Fallback to ROMCalculator
-                angles = ROMCalculator.calculate_movement_angles(
-                    keypoints, body_part, movement_type
-                )
-                movement_config = ROMCalculator.MOVEMENT_ANGLES[body_part][movement_type]
-                primary_angle_key = movement_config.get('primary', 'trunk')
-                normal_range = movement_config['normal_range']
-                max_range = movement_config['max_range']
-                
-        except ValueError as e:
-            raise AnalysisError(str(e))
+        if movement_result["invalid_message"]:
+            return self._create_invalid_position_response(
+                frame_id, session_id, body_part, movement_type,
+                movement_result["invalid_message"], confidence
+            )
+        
+        angles = movement_result["angles"]
+        primary_angle_key = movement_result["primary_angle_key"]
         
         # Get or create ROM tracker
         tracker = await self.session_manager.get_or_create_tracker(
@@ -121,9 +160,7 @@ class FrameAnalyzer:
         rom_data = tracker.update(angles, primary_angle_key)
         
         # Validate ROM
-        validation = ROMCalculator.validate_rom(
-            primary_angle_value, body_part, movement_type
-        )
+        validation = movement.validate_rom(primary_angle_value)
         
         # Calculate processing time
         processing_time_ms = (time.time() - start_time) * 1000
@@ -152,33 +189,95 @@ class FrameAnalyzer:
             }
         }
         
-        # Add keypoints if requested (for visualization in frontend)
-        if include_keypoints:
-            response_data["keypoints"] = {
-                k: {"x": float(v[0]), "y": float(v[1])} 
-                for k, v in keypoints.items()
-            }
-            
-            # Add skeleton connections for frontend visualization
-            response_data["skeleton_connections"] = self._get_skeleton_connections()
-        
         # Add movement guidance
-        response_data["guidance"] = self._get_movement_guidance(
-            body_part, movement_type, primary_angle_value, validation
-        )
+        response_data["guidance"] = movement.guidance(primary_angle_value, validation)
+        
+        # Repetition count and phase of the movement
+        response_data["repetitions"] = tracker.repetitions.summary()
         
         # Save tracker state
         await self.session_manager.save_tracker(session_id, tracker)
         
-        logger.info(f"Analysis complete: {len(angles)} angles calculated")
-        
-        # Ensure we always return a dictionary
-        if not isinstance(response_data, dict):
-            logger.error(f"Response data is not a dict: {type(response_data)}")
-            return {"error": "Invalid response data type"}
+        logger.info(f"Analysis complete: {len(angles)} angles calculated for {movement_type}")
         
         return response_data
     
+    def _analyze_frame(
+        self,
+        frame_base64: Optional[str],
+        frame_bytes: Optional[Union[bytes, memoryview]],
+        session_id: str,
+        movements: List[Movement]
+    ) -> Dict:
+        """
+        Decode a frame, detect pose and calculate every movement's angles
+        (runs on the inference executor)
+        """
+        result = {
+            "keypoints": {},
+            "confidence": 0.0,
+            "movements": [
+                {"invalid_message": None, "angles": {}, "primary_angle_key": None}
+                for _ in movements
+            ]
+        }
+        
+        # Decode frame, reduced to about the model's input size
+        try:
+            max_side = self.pose_processor.decode_max_side
+            if frame_bytes is not None:
+                frame, scale = self.image_processor.decode_bytes_scaled(frame_bytes, max_side)
+            else:
+                frame, scale = self.image_processor.decode_base64_scaled(frame_base64, max_side)
+            logger.info(f"Frame decoded successfully: shape={frame.shape}, scale={scale.round(3).tolist()}")
+        except Exception as e:
+            logger.error(f"Failed to decode frame: {e}")
+            raise AnalysisError(f"Failed to decode frame: {str(e)}")
+        
+        # Detect pose
+        try:
+            required_keypoints = sorted({kp for movement in movements for kp in movement.required_keypoints})
+            keypoints, confidence = self.pose_processor.process_frame(frame, session_id, required_keypoints)
+            logger.info(f"Pose detection complete: {len(keypoints)} keypoints, confidence={confidence}")
+        except PoseDetectionError:
+            # Report a failed detector as an error rather than a frame without a person
+            raise
+        except Exception as e:
+            logger.error(f"Pose detection failed: {e}")
+            keypoints, confidence = {}, 0.0
+        
+        # Report keypoints in the original frame's pixel space so responses
+        # and pixel-based position checks don't depend on the decode size
+        if keypoints and not np.allclose(scale, 1.0):
+            keypoints = keypoints.scaled(scale)
+        
+        # Smooth over the session's frames and fill briefly missing keypoints,
+        # with the first movement's filter when several share the frame
+        try:
+            keypoints = self.pose_processor.filter_keypoints(keypoints, session_id, movements[0].keypoint_filter)
+        except Exception as e:
+            logger.error(f"Keypoint filtering failed: {e}")
+        
+        result["keypoints"] = keypoints
+        result["confidence"] = confidence
+        
+        if not keypoints:
+            return result
+        
+        # The keypoint set caches the joint angles, so every movement
+        # after the first reuses one angle pass
+        for movement, movement_result in zip(movements, result["movements"]):
+            # Validate position
+            valid, message = movement.validate_position(keypoints)
+            if not valid:
+                movement_result["invalid_message"] = message
+                continue
+            
+            # Calculate angles
+            movement_result["angles"] = movement.calculate_angles(keypoints)
+            movement_result["primary_angle_key"] = movement.primary_angle
+        return result
+    
     def _create_no_pose_response(
         self, 
         frame_id: str, 
@@ -275,67 +374,3 @@ class FrameAnalyzer:
             ["LAnkle", "LBigToe"],
             ["RAnkle", "RBigToe"]
         ]
-    
-    def _get_movement_guidance(
-        self,
-        body_part: str,
-        movement_type: str,
-        current_angle: float,
-        validation: Dict
-    ) -> Dict[str, str]:
-        """Generate movement guidance based on current position"""
-        guidance = {
-            "instruction": "",
-            "feedback": validation['message'],
-            "improvement": ""
-        }
-        
-        # Movement-specific guidance
-        if body_part == "lower_back":
-            if movement_type == "flexion":
-                if current_angle < 10:
-                    guidance["instruction"] = "Bend forward slowly from your hips"
-                    guidance["improvement"] = "Try to increase your forward bend"
-                elif current_angle > 60:
-                    guidance["instruction"] = "You've reached good flexion"
-                    guidance["improvement"] = "Hold this position or slowly return"
-                else:
-                    guidance["instruction"] = "Good position, continue the movement"
-                    guidance["improvement"] = "Maintain smooth, controlled motion"
-            
-            elif movement_type == "extension":
-                if current_angle > -5:
-                    guidance["instruction"] = "Lean backward slowly"
-                    guidance["improvement"] = "Engage your core for support"
-                elif current_angle < -30:
-                    guidance["instruction"] = "Maximum extension reached"
-                    guidance["improvement"] = "Don't push beyond comfort"
-                else:
-                    guidance["instruction"] = "Good extension position"
-                    guidance["improvement"] = "Keep the movement controlled"
-            
-            elif movement_type == "lateral_flexion":
-                if abs(current_angle) < 5:
-                    guidance["instruction"] = "Bend sideways from your waist"
-                    guidance["improvement"] = "Keep your body in one plane"
-                elif abs(current_angle) > 30:
-                    guidance["instruction"] = "Good lateral flexion achieved"
-                    guidance["improvement"] = "Try the other side for balance"
-                else:
-                    guidance["instruction"] = "Continue the side bend"
-                    guidance["improvement"] = "Keep shoulders and hips aligned"
-            
-            elif movement_type == "rotation":
-                if abs(current_angle) < 10:
-                    guidance["instruction"] = "Rotate your upper body"
-                    guidance["improvement"] = "Keep hips facing forward"
-                elif abs(current_angle) > 45:
-                    guidance["instruction"] = "Maximum rotation reached"
-                    guidance["improvement"] = "Hold briefly, then return"
-                else:
-                    guidance["instruction"] = "Good rotation angle"
-                    guidance["improvement"] = "Maintain controlled movement"
-        
-        # Add more body parts guidance as needed
-        
-        return guidance
\ No newline at end of file
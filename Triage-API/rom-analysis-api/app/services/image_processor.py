@@ -1,24 +1,48 @@
 import base64
 import cv2
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple, Union
 from io import BytesIO
 
+from app.utils.converters import read_image_header
+
+# Reduced JPEG decode modes, largest reduction first
+REDUCED_DECODE_MODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
 class ImageProcessor:
     """Handle image encoding/decoding and visualization"""
     
     @staticmethod
-    def decode_base64(base64_string: str) -> np.ndarray:
-        """Decode base64 string to numpy array"""
+    def _base64_to_bytes(base64_string: str) -> bytes:
         # Remove data URL prefix if present
         if "," in base64_string:
             base64_string = base64_string.split(",")[1]
         
         # Decode base64
-        img_bytes = base64.b64decode(base64_string)
-        
-        # Convert to numpy array
+        return base64.b64decode(base64_string)
+    
+    @staticmethod
+    def decode_base64(base64_string: str) -> np.ndarray:
+        """Decode base64 string to numpy array"""
+        return ImageProcessor.decode_bytes(ImageProcessor._base64_to_bytes(base64_string))
+    
+    @staticmethod
+    def decode_base64_scaled(base64_string: str, max_side: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode base64 string with its longest side reduced to max_side, see decode_bytes_scaled"""
+        return ImageProcessor.decode_bytes_scaled(ImageProcessor._base64_to_bytes(base64_string), max_side)
+    
+    @staticmethod
+    def decode_bytes(img_bytes: Union[bytes, memoryview]) -> np.ndarray:
+        """Decode raw JPEG/PNG/WebP bytes to numpy array"""
+        # Wrap the buffer without copying
         nparr = np.frombuffer(img_bytes, np.uint8)
+        if nparr.size == 0:
+            raise ValueError("Empty image data")
+        
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         if img is None:
@@ -26,6 +50,62 @@ class ImageProcessor:
         
         return img
     
+    @staticmethod
+    def decode_bytes_scaled(
+        img_bytes: Union[bytes, memoryview],
+        max_side: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode image bytes with the longest side reduced to about max_side
+        
+        JPEGs large enough are decoded at 1/2, 1/4 or 1/8 scale directly by
+        the codec, anything still too large is area-downscaled afterwards.
+        
+        Returns:
+            Tuple of (image, scale) where scale is the (x, y) factor that
+            maps pixel coordinates in image back to the original frame
+        """
+        nparr = np.frombuffer(img_bytes, np.uint8)
+        if nparr.size == 0:
+            raise ValueError("Empty image data")
+        
+        header = read_image_header(nparr)
+        img = None
+        orig_w = orig_h = None
+        
+        if header is not None:
+            image_format, width, height = header
+            orig_w, orig_h = width, height
+            
+            # Pick the largest codec reduction that keeps the longest side >= max_side
+            if image_format == "jpeg" and max_side > 0:
+                for factor, mode in REDUCED_DECODE_MODES:
+                    if max(width, height) // factor >= max_side:
+                        img = cv2.imdecode(nparr, mode)
+                        if img is not None:
+                            reduced = (-(-width // factor), -(-height // factor))
+                            if (img.shape[1], img.shape[0]) != reduced:
+                                # EXIF orientation swapped the axes
+                                orig_w, orig_h = height, width
+                        break
+        
+        if img is None:
+            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError("Failed to decode image")
+            # Decoded size already accounts for EXIF orientation
+            orig_h, orig_w = img.shape[:2]
+        
+        # Area-downscale whatever the codec could not reduce
+        longest = max(img.shape[:2])
+        if max_side > 0 and longest > max_side:
+            ratio = max_side / longest
+            new_size = (max(1, round(img.shape[1] * ratio)), max(1, round(img.shape[0] * ratio)))
+            img = cv2.resize(img, new_size, interpolation=cv2.INTER_AREA)
+        
+        scale = np.array([orig_w / img.shape[1], orig_h / img.shape[0]])
+        return img, scale
+    
     @staticmethod
     def encode_base64(image: np.ndarray, format: str = ".jpg") -> str:
         """Encode numpy array to base64 string"""
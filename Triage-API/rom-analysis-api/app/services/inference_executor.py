@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.utils.exceptions import InferenceBusyError
+
+logger = logging.getLogger(__name__)
+
+class InferenceExecutor:
+    """Bounded thread pool that keeps CPU-bound frame work off the event loop"""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference"
+        )
+        self._lock = Lock()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of frames running or waiting at once"""
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of frames currently running or waiting"""
+        return self._in_flight
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func on the pool, rejecting work once the queue is full"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise InferenceBusyError(
+                    f"Inference queue full ({self._in_flight}/{self.capacity} frames in flight)"
+                )
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+
+        # Release the slot when the work finishes, not when the caller stops
+        # waiting, so cancelled requests cannot oversubscribe the pool
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=wait)
+
+_executor: Optional[InferenceExecutor] = None
+_executor_lock = Lock()
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get the process-wide inference executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = InferenceExecutor(
+                max_workers=settings.INFERENCE_WORKERS,
+                max_queue=settings.INFERENCE_QUEUE_SIZE
+            )
+            logger.info(
+                f"Inference executor started with {_executor.max_workers} workers, "
+                f"queue size {_executor.max_queue}"
+            )
+        return _executor
+
+def shutdown_inference_executor():
+    """Shut down the process-wide inference executor if it was started"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
\ No newline at end of file
@@ -1,17 +1,67 @@
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Tuple
+from collections import OrderedDict
 from app.core.rom.tracker import ROMTracker
+from app.core.rom.codec import decode_series, encode_series, is_encoded
+from app.core.body_parts.registry import MovementRegistry
 from app.storage.interface import StorageInterface
+from app.config import settings
+import asyncio
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# A tracker's recorded angle series is stored apart from it, under its key plus this
+SERIES_KEY_SUFFIX = ":series"
+
 class SessionManager:
-    """Manage ROM tracking sessions"""
+    """
+    Manage ROM tracking sessions
+    
+    Trackers live in trackers_cache and are written to storage behind the
+    frames (write-behind). save_tracker only marks a tracker dirty, repeated
+    saves coalesce into one write of its latest state. A tracker is written
+    once it has persist_max_frames unsaved updates or its oldest unsaved
+    update is persist_interval_s old, and on finalize, get_session, flush
+    and close. A crash loses at most that many frames or about that many
+    seconds of each tracker. persist_interval_s <= 0 writes on every save.
+    
+    Those writes carry the tracker's fixed-size state only. Its recorded
+    angle series, up to a few hundred KB, is written under its own key when
+    the tracker is evicted or finalized, when its session's stream closes
+    (flush with series=True) and on close.
+    
+    The cache keeps at most max_cached_trackers, least recently used first
+    out, and drops trackers unused for idle_s. Evicted trackers are written
+    first and reloaded from storage when their session comes back.
+    """
     
-    def __init__(self, storage: StorageInterface):
+    def __init__(
+        self,
+        storage: StorageInterface,
+        persist_interval_s: float = 2.0,
+        persist_max_frames: int = 30,
+        max_cached_trackers: int = 1024,
+        idle_s: float = 3600.0
+    ):
         self.storage = storage
-        self.trackers_cache = {}  # In-memory cache for active trackers
+        # In-memory cache for active trackers, least recently used first
+        self.trackers_cache: "OrderedDict[str, ROMTracker]" = OrderedDict()
+        self.persist_interval_s = persist_interval_s
+        self.persist_max_frames = max(1, persist_max_frames)
+        self.max_cached_trackers = max(1, max_cached_trackers)
+        self.idle_s = idle_s
+        
+        self._last_used: Dict[str, float] = {}
+        # session id -> its cached tracker keys
+        self._session_trackers: Dict[str, Set[str]] = {}
+        
+        # key -> (tracker, monotonic time of its oldest unsaved update, unsaved updates)
+        self._dirty: Dict[str, Tuple[ROMTracker, float, int]] = {}
+        # key -> tracker whose series has samples not yet in storage
+        self._dirty_series: Dict[str, ROMTracker] = {}
+        self._flusher: Optional[asyncio.Task] = None
     
     async def get_or_create_tracker(
         self, 
@@ -22,58 +72,239 @@ class SessionManager:
         """Get existing tracker or create new one"""
         tracker_key = f"{session_id}:{body_part}:{movement_type}"
         
+        now = time.monotonic()
+        
         # Check in-memory cache first
-        if tracker_key in self.trackers_cache:
-            return self.trackers_cache[tracker_key]
+        tracker = self.trackers_cache.get(tracker_key)
+        if tracker is not None:
+            self.trackers_cache.move_to_end(tracker_key)
+            self._last_used[tracker_key] = now
+            return tracker
         
-        # Try to get existing tracker from storage
-        tracker_data = await self.storage.get(tracker_key)
+        # An evicted tracker may still be waiting to be written
+        if tracker_key in self._dirty:
+            tracker = self._dirty[tracker_key][0]
+            self._cache(session_id, tracker_key, tracker, now)
+            return tracker
         
-        if tracker_data:
-            # Reconstruct tracker from stored data
-            tracker = ROMTracker(body_part, movement_type)
-            if isinstance(tracker_data, str):
-                tracker_data = json.loads(tracker_data)
-            
-            tracker.min_angle = tracker_data.get("min_angle")
-            tracker.max_angle = tracker_data.get("max_angle")
-            tracker.frame_count = tracker_data.get("frame_count", 0)
-            tracker.valid_frame_count = tracker_data.get("valid_frame_count", 0)
-            
-            # Restore angle history if available
-            if "angle_history" in tracker_data:
-                for angle in tracker_data["angle_history"]:
-                    tracker.angle_history.append(angle)
+        # Try to get existing tracker from storage
+        series_key = tracker_key + SERIES_KEY_SUFFIX
+        stored = await self.storage.get_many([tracker_key, series_key])
+        if stored.get(tracker_key):
+            tracker = self._load_tracker(stored[tracker_key], body_part, movement_type, stored.get(series_key))
         else:
             # Create new tracker
-            tracker = ROMTracker(body_part, movement_type)
+            tracker = ROMTracker(body_part, movement_type, **self._tracker_kwargs(body_part, movement_type))
         
         # Cache the tracker
-        self.trackers_cache[tracker_key] = tracker
+        self._cache(session_id, tracker_key, tracker, now)
+        await self._evict_trackers(now)
         
         return tracker
     
+    @classmethod
+    def _tracker_kwargs(cls, body_part: str, movement_type: str) -> Dict:
+        return {
+            "window_size": settings.ANGLE_SMOOTHING_WINDOW,
+            "hold_frames": settings.ROM_HOLD_FRAMES,
+            "normal_range": cls._normal_range(body_part, movement_type),
+            "repetition_params": {
+                "min_prominence": settings.REP_MIN_PROMINENCE,
+                "hold_speed": settings.REP_HOLD_SPEED,
+                "max_reps": settings.REP_HISTORY
+            },
+            "series_max_frames": settings.ROM_SERIES_MAX_FRAMES
+        }
+    
+    @classmethod
+    def _load_tracker(
+        cls,
+        tracker_data,
+        body_part: str,
+        movement_type: str,
+        series_data: Optional[bytes] = None
+    ) -> ROMTracker:
+        """
+        Reconstruct a tracker from stored data, binary or the older JSON
+        
+        The separately stored series replaces any series in the tracker
+        data itself, which only older records carry.
+        """
+        tracker_kwargs = cls._tracker_kwargs(body_part, movement_type)
+        if is_encoded(tracker_data):
+            tracker = ROMTracker.from_bytes(tracker_data, body_part, movement_type, **tracker_kwargs)
+        else:
+            if isinstance(tracker_data, str):
+                tracker_data = json.loads(tracker_data)
+            tracker = ROMTracker.from_dict(tracker_data, body_part, movement_type, **tracker_kwargs)
+        if series_data:
+            tracker.series.load(*decode_series(series_data))
+        return tracker
+    
+    def _cache(self, session_id: str, tracker_key: str, tracker: ROMTracker, now: float):
+        self.trackers_cache[tracker_key] = tracker
+        self._last_used[tracker_key] = now
+        self._session_trackers.setdefault(session_id, set()).add(tracker_key)
+    
+    def _uncache(self, tracker_key: str):
+        self.trackers_cache.pop(tracker_key, None)
+        self._last_used.pop(tracker_key, None)
+        session_id = tracker_key.split(":", 1)[0]
+        keys = self._session_trackers.get(session_id)
+        if keys is not None:
+            keys.discard(tracker_key)
+            if not keys:
+                del self._session_trackers[session_id]
+    
+    async def _evict_trackers(self, now: float):
+        """Drop least recently used trackers beyond the cache size or idle too long, writing them first"""
+        victims = []
+        cutoff = now - self.idle_s
+        for key in self.trackers_cache:
+            over = len(self.trackers_cache) - len(victims) > self.max_cached_trackers
+            if not over and self._last_used[key] >= cutoff:
+                break
+            victims.append(key)
+        if not victims:
+            return
+        
+        dirty = {
+            key: self.trackers_cache[key] for key in victims
+            if key in self._dirty or key in self._dirty_series
+        }
+        if dirty:
+            try:
+                await self._write(dirty, series=True)
+            except Exception as e:
+                # Keep unsaved trackers cached, they are retried on the next flush
+                logger.error(f"Failed to persist evicted trackers: {e}")
+                victims = [key for key in victims if key not in dirty]
+        for key in victims:
+            self._uncache(key)
+        logger.debug(f"Evicted {len(victims)} trackers from the cache")
+    
+    @staticmethod
+    def _normal_range(body_part: str, movement_type: str) -> Optional[Tuple[float, float]]:
+        """Normal ROM range of a registered movement, for the tracker's time-in-range stats"""
+        if not MovementRegistry.is_registered(body_part, movement_type):
+            return None
+        return MovementRegistry.get_movement(body_part, movement_type).normal_range
+    
     async def save_tracker(self, session_id: str, tracker: ROMTracker):
-        """Save tracker state"""
+        """Mark tracker state for saving, written now once the persistence budget is used up"""
         tracker_key = f"{session_id}:{tracker.body_part}:{tracker.movement_type}"
+        self._dirty_series[tracker_key] = tracker
+        if self.persist_interval_s <= 0:
+            await self._write({tracker_key: tracker})
+            return
+        
+        now = time.monotonic()
+        _, since, frames = self._dirty.get(tracker_key, (tracker, now, 0))
+        self._dirty[tracker_key] = (tracker, since, frames + 1)
+        self._start_flusher()
+        
+        if frames + 1 >= self.persist_max_frames or now - since >= self.persist_interval_s:
+            try:
+                await self.flush(session_id)
+            except Exception as e:
+                logger.error(f"Failed to persist session {session_id}, retrying later: {e}")
+    
+    async def save_trackers(self, session_id: str, trackers: List[ROMTracker]):
+        """Save several trackers of a session, with their series, in one storage write"""
+        await self._write({
+            f"{session_id}:{tracker.body_part}:{tracker.movement_type}": tracker
+            for tracker in trackers
+        }, series=True)
+    
+    async def flush(self, session_id: Optional[str] = None, due_only: bool = False, series: bool = False):
+        """
+        Write dirty trackers in one storage write
         
-        tracker_data = {
-            "min_angle": tracker.min_angle,
-            "max_angle": tracker.max_angle,
-            "frame_count": tracker.frame_count,
-            "valid_frame_count": tracker.valid_frame_count,
-            "body_part": tracker.body_part,
-            "movement_type": tracker.movement_type,
-            "angle_history": list(tracker.angle_history)  # Convert deque to list
+        Args:
+            session_id: Only this session's trackers, all sessions when None
+            due_only: Only trackers whose oldest unsaved update is
+                persist_interval_s old
+            series: Also write every angle series with unsaved samples
+        """
+        prefix = f"{session_id}:" if session_id is not None else ""
+        deadline = time.monotonic() - self.persist_interval_s
+        batch = {
+            key: entry[0] for key, entry in self._dirty.items()
+            if key.startswith(prefix) and (not due_only or entry[1] <= deadline)
         }
+        if series:
+            batch.update({key: tracker for key, tracker in self._dirty_series.items() if key.startswith(prefix)})
+        if not batch:
+            return
+        await self._write(batch, series=series)
+    
+    async def close(self):
+        """Stop the background flusher and write every dirty tracker"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush(series=True)
+    
+    @property
+    def dirty_count(self) -> int:
+        """Trackers with updates not yet in storage"""
+        return len(self._dirty)
+    
+    async def _write(self, trackers: Dict[str, ROMTracker], series: bool = False):
+        """
+        Encode trackers and write them with the session TTL, with series
+        their angle series too
         
-        # Save to storage with TTL
-        await self.storage.set(tracker_key, json.dumps(tracker_data), ttl=3600)
+        If the write fails every tracker is left dirty, merged with any
+        updates that came in meanwhile, so the next flush retries it.
+        """
+        now = time.monotonic()
+        pending = {key: self._dirty.pop(key, (tracker, now, 1)) for key, tracker in trackers.items()}
+        items = {key: tracker.to_bytes(include_series=False) for key, tracker in trackers.items()}
+        if series:
+            for key, tracker in trackers.items():
+                self._dirty_series.pop(key, None)
+                items[key + SERIES_KEY_SUFFIX] = encode_series(tracker.series)
+        try:
+            await self.storage.set_many(items, ttl=settings.SESSION_TTL)
+        except Exception:
+            for key, (tracker, since, frames) in pending.items():
+                _, newer_since, newer_frames = self._dirty.get(key, (tracker, since, 0))
+                self._dirty[key] = (tracker, min(since, newer_since), frames + newer_frames)
+                if series:
+                    self._dirty_series[key] = tracker
+            self._start_flusher()
+            raise
+    
+    def _start_flusher(self):
+        """Start the task writing idle dirty trackers once their time budget is up"""
+        if self.persist_interval_s <= 0:
+            # Written through, left-over dirty trackers go out on eviction, get_session and close
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        # Checking four times per interval keeps the loss bound close to persist_interval_s
+        while True:
+            await asyncio.sleep(self.persist_interval_s / 4)
+            try:
+                await self.flush(due_only=True)
+            except Exception as e:
+                logger.error(f"Background tracker flush failed: {e}")
     
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get all data for a session"""
-        pattern = f"{session_id}:*"
-        all_data = await self.storage.get_pattern(pattern)
+        # Read this session's latest state, not what was last written behind
+        await self.flush(session_id)
+        
+        # The session summary doesn't need the angle series
+        keys = await self.storage.keys(f"{session_id}:*")
+        all_data = await self.storage.get_many(key for key in keys if not key.endswith(SERIES_KEY_SUFFIX))
         
         if not all_data:
             return None
@@ -84,8 +315,16 @@ class SessionManager:
         }
         
         for key, data in all_data.items():
+            # Decode binary state, the session summary doesn't need the angle series
+            if is_encoded(data):
+                try:
+                    data = ROMTracker.from_bytes(data, load_series=False).to_dict()
+                except ValueError as e:
+                    logger.error(f"Failed to decode tracker state for key {key}: {e}")
+                    continue
+            
             # Parse JSON data if stored as string
-            if isinstance(data, str):
+            elif isinstance(data, str):
                 try:
                     data = json.loads(data)
                 except json.JSONDecodeError:
@@ -102,38 +341,76 @@ class SessionManager:
                     session_data["trackers"][body_part] = {}
                 
                 session_data["trackers"][body_part][movement_type] = {
-                    "rom": {
-                        "min": data.get("min_angle", 0),
-                        "max": data.get("max_angle", 0),
-                        "range": (data.get("max_angle", 0) - data.get("min_angle", 0)) if data.get("min_angle") is not None else 0,
-                        "current": data.get("angle_history", [0])[-1] if data.get("angle_history") else 0
-                    },
+                    "rom": ROMTracker.from_dict(data, body_part, movement_type).get_current_rom(),
                     "frame_count": data.get("frame_count", 0),
-                    "valid_frame_count": data.get("valid_frame_count", 0)
+                    "valid_frame_count": data.get("valid_frame_count", 0),
+                    "stats": data.get("stats", {}),
+                    "repetitions": data.get("repetitions", {}).get("reps", []),
+                    "refined_rom": data.get("refined")
                 }
         
         return session_data
     
+    async def finalize_session(self, session_id: str) -> Dict:
+        """
+        Refine the ROM of every active tracker of a session from its recorded
+        angle series with a zero-phase filter, and store it next to the live ROM
+        """
+        start = time.perf_counter()
+        results: Dict[str, Dict] = {}
+        cached = self._session_trackers.get(session_id, set())
+        trackers = [self.trackers_cache[key] for key in cached]
+        
+        # Trackers evicted from this process, or recorded by another one
+        # before a restart or reroute, are only in storage
+        stored = []
+        for key in await self.storage.keys(f"{session_id}:*"):
+            if key in cached or key.endswith(SERIES_KEY_SUFFIX) or len(key.split(":")) < 3:
+                continue
+            if key in self._dirty:
+                # Newer than what storage has
+                trackers.append(self._dirty[key][0])
+                continue
+            stored.append(key)
+        data = await self.storage.get_many(stored + [key + SERIES_KEY_SUFFIX for key in stored])
+        for key in stored:
+            if key not in data:
+                continue
+            parts = key.split(":")
+            try:
+                trackers.append(self._load_tracker(data[key], parts[1], parts[2], data.get(key + SERIES_KEY_SUFFIX)))
+            except (ValueError, json.JSONDecodeError) as e:
+                logger.error(f"Failed to decode tracker state for key {key}: {e}")
+        for key, (tracker, _, _) in self._dirty.items():
+            if key.startswith(f"{session_id}:") and key not in cached and tracker not in trackers:
+                trackers.append(tracker)
+        
+        for tracker in trackers:
+            refined = tracker.refine(settings.FINALIZE_FILTER, settings.FINALIZE_CUTOFF_HZ)
+            results.setdefault(tracker.body_part, {})[tracker.movement_type] = refined
+        await self.save_trackers(session_id, trackers)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Finalized session {session_id}: {sum(len(r) for r in results.values())} trackers in {elapsed_ms:.1f}ms")
+        return {"session_id": session_id, "trackers": results}
+    
     async def clear_session(self, session_id: str):
         """Clear all data for a session"""
+        for key in [k for k in self._dirty if k.startswith(f"{session_id}:")]:
+            del self._dirty[key]
+        for key in [k for k in self._dirty_series if k.startswith(f"{session_id}:")]:
+            del self._dirty_series[key]
+        
         pattern = f"{session_id}:*"
         await self.storage.delete_pattern(pattern)
         
         # Clear from cache
-        keys_to_remove = [k for k in self.trackers_cache.keys() if k.startswith(f"{session_id}:")]
-        for key in keys_to_remove:
-            del self.trackers_cache[key]
+        for key in list(self._session_trackers.get(session_id, ())):
+            self._uncache(key)
         
         logger.info(f"Cleared session {session_id}")
     
     async def get_active_sessions(self) -> List[str]:
         """Get list of active session IDs"""
-        all_keys = await self.storage.get_pattern("*")
-        session_ids = set()
-        
-        for key in all_keys:
-            parts = key.split(":")
-            if len(parts) >= 1:
-                session_ids.add(parts[0])
-        
-        return list(session_ids)
\ No newline at end of file
+        # Sessions whose trackers haven't been written yet are only in the cache
+        return list(set(await self.storage.prefixes()) | set(self._session_trackers))
\ No newline at end of file
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Tuple
+
+from fastapi import WebSocket
+
+class LatestItemSlot:
+    """Single-slot buffer where a newer item replaces the stale one still waiting"""
+
+    def __init__(self):
+        self._item: Any = None
+        self._has_item = False
+        self._closed = False
+        self._event = asyncio.Event()
+        self._dropped_since_get = 0
+        self.total_dropped = 0
+
+    def put(self, item: Any) -> bool:
+        """Store item, dropping any unconsumed one. Returns True if an item was dropped"""
+        dropped = self._has_item
+        if dropped:
+            self._dropped_since_get += 1
+            self.total_dropped += 1
+        self._item = item
+        self._has_item = True
+        self._event.set()
+        return dropped
+
+    async def get(self) -> Tuple[Any, int]:
+        """Wait for the newest item. Returns (item, items dropped since last get), or (None, 0) once closed"""
+        while not self._has_item:
+            if self._closed:
+                return None, 0
+            self._event.clear()
+            await self._event.wait()
+
+        item, dropped = self._item, self._dropped_since_get
+        self._item = None
+        self._has_item = False
+        self._dropped_since_get = 0
+        return item, dropped
+
+    def close(self):
+        """Wake up waiters; get() returns (None, 0) once the slot is empty"""
+        self._closed = True
+        self._event.set()
+
+class StreamSender:
+    """Serialize sends on a WebSocket and bound how long a slow client may block one"""
+
+    def __init__(self, websocket: WebSocket, timeout: float):
+        self.websocket = websocket
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+
+    async def send_json(self, data: dict):
+        """Send JSON, raising asyncio.TimeoutError if the client does not keep up"""
+        async with self._lock:
+            await asyncio.wait_for(self.websocket.send_json(data), timeout=self.timeout)
+
+    async def send_text(self, data: str):
+        """Send text, raising asyncio.TimeoutError if the client does not keep up"""
+        async with self._lock:
+            await asyncio.wait_for(self.websocket.send_text(data), timeout=self.timeout)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 class StorageInterface(ABC):
     """Abstract interface for storage backends"""
@@ -27,4 +27,26 @@ class StorageInterface(ABC):
     @abstractmethod
     async def delete_pattern(self, pattern: str):
         """Delete all keys matching pattern"""
-        pass
\ No newline at end of file
+        pass
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several keys at once, missing keys are left out"""
+        values = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """Set several values at once with optional TTL"""
+        for key, value in items.items():
+            await self.set(key, value, ttl=ttl)
+    
+    async def keys(self, pattern: str) -> List[str]:
+        """Keys matching pattern, without loading their values"""
+        return list((await self.get_pattern(pattern)).keys())
+    
+    async def prefixes(self) -> List[str]:
+        """Distinct session prefixes (the part before the first ":") of all keys"""
+        return list({key.split(":", 1)[0] for key in await self.keys("*")})
@@ -1,53 +1,214 @@
-from typing import Any, Dict, Optional
-from datetime import datetime, timedelta
+import asyncio
+import heapq
+import logging
+import sys
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Set, Tuple
+
 from app.storage.interface import StorageInterface
 
+logger = logging.getLogger(__name__)
+
+# Keys are "<session>:<rest>", the session part is indexed
+SESSION_SEPARATOR = ":"
+
+def _session_of(key: str) -> str:
+    return key.split(SESSION_SEPARATOR, 1)[0]
+
+def _size_of(value: Any) -> int:
+    """Approximate memory of a value, exact for the JSON strings and bytes trackers are stored as"""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    return sys.getsizeof(value)
+
 class InMemoryStorage(StorageInterface):
-    """In-memory storage implementation"""
-    
-    def __init__(self):
-        self._data: Dict[str, Any] = {}
-        self._expiry: Dict[str, datetime] = {}
-    
+    """
+    In-memory storage implementation
+
+    Entries are kept in LRU order and the least recently used are evicted
+    beyond max_entries or max_bytes. Expired keys are dropped when read and
+    by a background sweeper every sweep_interval_s. Keys are indexed by
+    their session prefix, so session lookups cost O(keys in the session).
+    """
+
+    def __init__(self, max_entries: int = 100000, max_bytes: int = 0, sweep_interval_s: float = 30.0):
+        """
+        Args:
+            max_entries: Most keys kept, 0 for no limit
+            max_bytes: Most value bytes kept (approximate), 0 for no limit
+            sweep_interval_s: Seconds between expiry sweeps, 0 only expires on read
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval_s = sweep_interval_s
+
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._expiry: Dict[str, float] = {}
+        # (deadline, key) heap, entries whose key was re-set or deleted are skipped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sessions: Dict[str, Set[str]] = {}
+
+        self.evictions = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
     async def get(self, key: str) -> Optional[Any]:
         """Get value by key"""
-        # Check expiry
-        if key in self._expiry:
-            if datetime.utcnow() > self._expiry[key]:
-                await self.delete(key)
-                return None
-        
-        return self._data.get(key)
-    
+        if self._expired(key, time.monotonic()):
+            self._remove(key)
+            return None
+
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set value with optional TTL in seconds"""
-        self._data[key] = value
-        
-        if ttl:
-            self._expiry[key] = datetime.utcnow() + timedelta(seconds=ttl)
-        elif key in self._expiry:
-            del self._expiry[key]
-    
+        self._store(key, value, ttl)
+        self._evict()
+        self._start_sweeper()
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """Set several values, evicting once afterwards"""
+        for key, value in items.items():
+            self._store(key, value, ttl)
+        self._evict()
+        self._start_sweeper()
+
     async def delete(self, key: str):
         """Delete value by key"""
-        if key in self._data:
-            del self._data[key]
-        if key in self._expiry:
-            del self._expiry[key]
-    
+        self._remove(key)
+
+    async def keys(self, pattern: str) -> List[str]:
+        """Live keys matching pattern, glob syntax"""
+        now = time.monotonic()
+        matched = []
+        for key in self._candidates(pattern):
+            if self._expired(key, now):
+                self._remove(key)
+            elif fnmatchcase(key, pattern):
+                matched.append(key)
+        return matched
+
     async def get_pattern(self, pattern: str) -> Dict[str, Any]:
-        """Get all keys matching pattern (simple wildcard support)"""
-        # Simple pattern matching (supports * at end)
-        if pattern.endswith("*"):
-            prefix = pattern[:-1]
-            return {
-                k: v for k, v in self._data.items()
-                if k.startswith(prefix)
-            }
-        return {pattern: self._data.get(pattern)} if pattern in self._data else {}
-    
+        """Get all keys matching pattern, glob syntax"""
+        return {key: self._data[key] for key in await self.keys(pattern)}
+
     async def delete_pattern(self, pattern: str):
         """Delete all keys matching pattern"""
-        keys_to_delete = list(self.get_pattern(pattern).keys())
-        for key in keys_to_delete:
-            await self.delete(key)
\ No newline at end of file
+        for key in await self.keys(pattern):
+            self._remove(key)
+
+    async def prefixes(self) -> List[str]:
+        """Sessions with at least one key, from the index"""
+        return list(self._sessions)
+
+    def sweep(self) -> int:
+        """Drop every expired key, returns how many"""
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if self._expiry.get(key) == deadline:
+                self._remove(key)
+                removed += 1
+        return removed
+
+    async def close(self):
+        """Stop the background sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate bytes held by values"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _store(self, key: str, value: Any, ttl: Optional[int]):
+        if key in self._data:
+            self._bytes -= self._sizes[key]
+        else:
+            self._sessions.setdefault(_session_of(key), set()).add(key)
+        self._data[key] = value
+        self._data.move_to_end(key)
+        self._sizes[key] = size = _size_of(value)
+        self._bytes += size
+
+        if ttl:
+            deadline = time.monotonic() + ttl
+            self._expiry[key] = deadline
+            heapq.heappush(self._expiry_heap, (deadline, key))
+        else:
+            self._expiry.pop(key, None)
+
+    def _remove(self, key: str):
+        if key not in self._data:
+            return
+        del self._data[key]
+        self._bytes -= self._sizes.pop(key)
+        self._expiry.pop(key, None)
+        session = _session_of(key)
+        keys = self._sessions.get(session)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._sessions[session]
+
+    def _expired(self, key: str, now: float) -> bool:
+        deadline = self._expiry.get(key)
+        return deadline is not None and now > deadline
+
+    def _evict(self):
+        """Drop least recently used keys until within the entry and byte caps"""
+        evicted = 0
+        # Always keep the most recent key, even when it alone is over max_bytes
+        while len(self._data) > 1 and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._data)))
+            evicted += 1
+        if evicted:
+            self.evictions += evicted
+            logger.debug(f"Evicted {evicted} least recently used keys")
+
+        # Stale heap entries pile up when keys are re-set, rebuild from the live deadlines
+        if len(self._expiry_heap) > 2 * len(self._expiry) + 64:
+            self._expiry_heap = [(deadline, key) for key, deadline in self._expiry.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _candidates(self, pattern: str) -> List[str]:
+        """Keys that could match pattern, only the session's when its prefix is literal"""
+        session, sep, _ = pattern.partition(SESSION_SEPARATOR)
+        if sep and not any(c in session for c in "*?["):
+            return list(self._sessions.get(session, ()))
+        return list(self._data)
+
+    def _start_sweeper(self):
+        if self.sweep_interval_s <= 0 or (self._sweeper is not None and not self._sweeper.done()):
+            return
+        try:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+        except RuntimeError:
+            # No event loop, keys still expire on read
+            pass
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval_s)
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"Swept {removed} expired keys")
@@ -0,0 +1,144 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.storage.interface import StorageInterface
+
+logger = logging.getLogger(__name__)
+
+# Values are stored with a one-byte type tag so they come back as they were set
+_STR, _BYTES, _JSON = b"s", b"b", b"j"
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, str):
+        return _STR + value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _BYTES + bytes(value)
+    return _JSON + json.dumps(value).encode("utf-8")
+
+def _decode(raw: Optional[bytes]) -> Optional[Any]:
+    if raw is None:
+        return None
+    tag, payload = raw[:1], raw[1:]
+    if tag == _STR:
+        return payload.decode("utf-8")
+    if tag == _BYTES:
+        return payload
+    if tag == _JSON:
+        return json.loads(payload)
+    # Written by something else, hand it over untouched
+    return raw
+
+class RedisStorage(StorageInterface):
+    """
+    Redis storage implementation on redis.asyncio
+
+    Commands share one connection pool. Multi-key writes go through a
+    non-transactional pipeline, pattern lookups walk the keyspace with SCAN
+    (never KEYS) and fetch values with MGET per SCAN batch.
+    """
+
+    def __init__(self, client, ttl: Optional[int] = None, scan_count: int = 500):
+        """
+        Args:
+            client: redis.asyncio.Redis (or a fakeredis stand-in), without
+                decode_responses since values are stored as bytes
+            ttl: Default expiry in seconds for keys set without one
+            scan_count: Keys asked for per SCAN call and per MGET/UNLINK batch
+        """
+        self.client = client
+        self.ttl = ttl
+        self.scan_count = max(1, scan_count)
+
+    @classmethod
+    def from_url(
+        cls,
+        url: str,
+        ttl: Optional[int] = None,
+        max_connections: int = 20,
+        scan_count: int = 500
+    ) -> "RedisStorage":
+        """Connect through a pooled client, connections are opened on first use"""
+        import redis.asyncio as redis
+
+        client = redis.Redis.from_url(url, max_connections=max_connections)
+        return cls(client, ttl=ttl, scan_count=scan_count)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value by key"""
+        return _decode(await self.client.get(key))
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Set value with optional TTL in seconds, the storage's TTL by default"""
+        await self.client.set(key, _encode(value), ex=ttl or self.ttl)
+
+    async def delete(self, key: str):
+        """Delete value by key"""
+        await self.client.unlink(key)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several keys with one MGET, missing keys are left out"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.client.mget(keys)
+        return {key: _decode(raw) for key, raw in zip(keys, values) if raw is not None}
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """Set several values in one round trip"""
+        if not items:
+            return
+        ttl = ttl or self.ttl
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, _encode(value), ex=ttl)
+            await pipe.execute()
+
+    async def keys(self, pattern: str) -> List[str]:
+        """Keys matching pattern, found with SCAN"""
+        return [key async for batch in self._scan_batches(pattern) for key in batch]
+
+    async def get_pattern(self, pattern: str) -> Dict[str, Any]:
+        """Get all keys matching pattern, Redis glob syntax"""
+        values: Dict[str, Any] = {}
+        async for batch in self._scan_batches(pattern):
+            values.update(await self.get_many(batch))
+        return values
+
+    async def delete_pattern(self, pattern: str):
+        """Delete all keys matching pattern, batch by batch as SCAN finds them"""
+        async for batch in self._scan_batches(pattern):
+            await self.client.unlink(*batch)
+
+    async def ping(self) -> bool:
+        """Check that Redis answers"""
+        try:
+            return bool(await self.client.ping())
+        except Exception as e:
+            logger.error(f"Redis ping failed: {e}")
+            return False
+
+    async def close(self):
+        """Close the client and its connection pool"""
+        await self.client.aclose()
+
+    async def _scan_batches(self, pattern: str):
+        """SCAN results in lists of up to scan_count keys, each key once"""
+        seen = set()
+        batch: List[str] = []
+        async for key in self.client.scan_iter(match=pattern, count=self.scan_count):
+            key = self._key(key)
+            # SCAN may return a key more than once while the keyspace is rehashed
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(key)
+            if len(batch) >= self.scan_count:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _key(key) -> str:
+        return key.decode("utf-8") if isinstance(key, bytes) else key
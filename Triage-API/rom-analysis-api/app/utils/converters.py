@@ -0,0 +1,63 @@
+import struct
+from typing import Optional, Tuple
+
+# Optional header in front of binary WebSocket frames:
+# uint32 client frame number + float64 capture timestamp (ms since epoch), little-endian
+BINARY_FRAME_HEADER = struct.Struct("<Id")
+
+def parse_binary_frame(data: bytes, has_header: bool) -> Tuple[Optional[int], Optional[float], memoryview]:
+    """Split a binary WebSocket frame into (frame_number, capture_timestamp, image_bytes)"""
+    payload = memoryview(data)
+    if not has_header:
+        return None, None, payload
+    
+    if len(payload) < BINARY_FRAME_HEADER.size:
+        raise ValueError(
+            f"Binary frame shorter than its {BINARY_FRAME_HEADER.size}-byte header"
+        )
+    
+    frame_number, capture_timestamp = BINARY_FRAME_HEADER.unpack_from(payload)
+    return frame_number, capture_timestamp, payload[BINARY_FRAME_HEADER.size:]
+
+def build_binary_frame(image_bytes: bytes, frame_number: int, capture_timestamp: float) -> bytes:
+    """Prepend the binary frame header to encoded image bytes (client-side helper)"""
+    return BINARY_FRAME_HEADER.pack(frame_number, capture_timestamp) + image_bytes
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers (baseline, progressive, lossless...), excluding DHT/JPG/DAC
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def read_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """Read (format, width, height) from a JPEG or PNG header without decoding the image"""
+    buf = memoryview(data)
+    
+    if len(buf) >= 24 and bytes(buf[:8]) == PNG_SIGNATURE:
+        width, height = struct.unpack_from(">II", buf, 16)
+        return "png", width, height
+    
+    if len(buf) < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+    
+    # Walk JPEG segments until the start-of-frame segment
+    i = 2
+    while i + 9 <= len(buf):
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:
+            # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers carry no length
+            i += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", buf, i + 5)
+            return "jpeg", width, height
+        length = struct.unpack_from(">H", buf, i + 2)[0]
+        i += 2 + length
+    
+    return None
@@ -20,4 +20,8 @@ class InvalidFrameError(ROMAnalysisError):
 
 class SessionNotFoundError(ROMAnalysisError):
     """Session not found"""
+    pass
+
+class InferenceBusyError(ROMAnalysisError):
+    """Inference queue is full"""
     pass
\ No newline at end of file
@@ -3,5 +3,6 @@ Simplified PhysioTrack core for API usage
 """
 from .pose_detection import PoseDetector
 from .angle_computation import calculate_angle_between_points
+from .keypoint_set import KeypointSet, KeypointSequence
 
-__all__ = ['PoseDetector', 'calculate_angle_between_points']
\ No newline at end of file
+__all__ = ['PoseDetector', 'calculate_angle_between_points', 'KeypointSet', 'KeypointSequence']
\ No newline at end of file
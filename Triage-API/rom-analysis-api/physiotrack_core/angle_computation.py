@@ -5,6 +5,8 @@ Includes ALL angle calculation strategies from
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Union
 
+from .keypoint_set import KeypointSet, KeypointSequence
+
 # Complete angle definitions from 
 ANGLE_DEFINITIONS = {
     # Joint angles
@@ -323,24 +325,175 @@ def apply_flip_correction(
     
     return points_list
 
+# Foot points whose direction decides the left/right flip
+FLIP_FOOT_POINTS = ['LBigToe', 'LHeel', 'RBigToe', 'RHeel']
+
+# Angles normalized to [-90, 90] instead of [-180, 180]
+HALF_RANGE_ANGLES = ('pelvis', 'shoulders')
+
+class AngleEngine:
+    """
+    ANGLE_DEFINITIONS compiled into index arrays over a fixed keypoint layout
+    
+    Computes every angle of a (K, 2) or (T, K, 2) array in one NumPy pass,
+    with the same results as compute_angle.
+    """
+    
+    def __init__(self, definitions: Dict[str, Dict]):
+        self.angle_names = list(definitions.keys())
+        self.angle_index = {name: i for i, name in enumerate(self.angle_names)}
+        
+        # Layout: every point used by an angle, then the feet for the flip check
+        names = []
+        for angle_def in definitions.values():
+            names.extend(pt for pt in angle_def['points'] if pt not in names)
+        names.extend(pt for pt in FLIP_FOOT_POINTS if pt not in names)
+        self.keypoint_names = tuple(names)
+        self.keypoint_index = {name: i for i, name in enumerate(names)}
+        self._foot_idx = np.array([self.keypoint_index[pt] for pt in FLIP_FOOT_POINTS])
+        
+        # Every angle as the angle between vectors ab and cd: ab is the first vector of
+        # points_to_angles, cd the second, or a zero vector for angles to the horizontal
+        vectors = []
+        for name in self.angle_names:
+            pts = definitions[name]['points']
+            if len(pts) == 2:
+                vectors.append((pts[1], pts[0], pts[1], pts[1]))
+            elif len(pts) == 3:
+                vectors.append((pts[1], pts[0], pts[1], pts[2]))
+            else:
+                vectors.append(tuple(pts))
+        self._idx = np.array([[self.keypoint_index[pt] for pt in pts] for pts in vectors])
+        self._sided = np.array([[pt.startswith(('L', 'R')) for pt in pts] for pts in vectors])
+        self._segment = np.array([len(definitions[name]['points']) == 2 for name in self.angle_names])
+        self._offset = np.array([definitions[name]['offset'] for name in self.angle_names], dtype=np.float64)
+        self._scale = np.array([definitions[name]['scale'] for name in self.angle_names], dtype=np.float64)
+        self._limit = np.array([90.0 if name in HALF_RANGE_ANGLES else 180.0 for name in self.angle_names])
+    
+    def keypoints_to_array(self, keypoints: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Keypoints dictionary to a (K, 2) array in the engine layout and a presence mask"""
+        present = np.array([name in keypoints for name in self.keypoint_names])
+        points = np.zeros((len(self.keypoint_names), 2))
+        if present.any():
+            values = np.array([keypoints[name] for name in self.keypoint_names if name in keypoints])
+            if values.shape[1:] != (2,):
+                raise ValueError(f"Expected 2D keypoints, got shape {values.shape[1:]}")
+            points = points.astype(values.dtype)
+            points[present] = values
+        return points, present
+    
+    def compute(
+        self,
+        points: np.ndarray,
+        present: Optional[np.ndarray] = None,
+        flip_left_right: bool = True
+    ) -> np.ndarray:
+        """
+        Every angle of a (K, 2) or (T, K, 2) array in the engine layout
+        
+        Returns a (A,) or (T, A) float64 array in angle_names order, NaN where
+        a point is missing.
+        """
+        points = np.asarray(points)
+        pts = points[..., self._idx, :]
+        
+        # Mirror sided points of frames where a foot points left
+        if flip_left_right:
+            feet = points[..., self._foot_idx, 0]
+            flip = (feet[..., 0] - feet[..., 1] < 0) | (feet[..., 2] - feet[..., 3] < 0)
+            if present is not None:
+                flip &= present[..., self._foot_idx].all(axis=-1)
+            if flip.any():
+                x = pts[..., 0]
+                np.negative(x, out=x, where=flip[..., None, None] & self._sided)
+        
+        # Vectors ab and cd, then the angle between them
+        vectors = pts[..., 1::2, :] - pts[..., 0::2, :]
+        directions = np.arctan2(vectors[..., 1], vectors[..., 0])
+        rad = directions[..., 0] - directions[..., 1]
+        
+        # points_to_angles converts segment angles to degrees in float64 and
+        # joint angles in the input precision, keep that so results are identical
+        if rad.dtype == np.float64:
+            ang = np.degrees(rad)
+        else:
+            ang = np.where(self._segment, np.degrees(rad.astype(np.float64)), np.degrees(rad).astype(np.float64))
+        ang = (ang + self._offset) * self._scale
+        
+        # Normalize angles
+        ang = np.where(ang > self._limit, ang - 2 * self._limit, ang)
+        ang = np.where(ang < -self._limit, ang + 2 * self._limit, ang)
+        
+        if present is not None and not present.all():
+            ang[~present[..., self._idx].all(axis=-1)] = np.nan
+        return ang
+
+ANGLE_ENGINE = AngleEngine(ANGLE_DEFINITIONS)
+
 def calculate_all_angles(
     keypoints: Dict[str, np.ndarray],
-    angle_subset: List[str] = None
+    angle_subset: List[str] = None,
+    flip_left_right: bool = True
 ) -> Dict[str, float]:
     """
     Calculate all angles or a subset from keypoints
     """
     if angle_subset is None:
-        angle_subset = list(ANGLE_DEFINITIONS.keys())
+        angle_subset = ANGLE_ENGINE.angle_names
+    
+    if isinstance(keypoints, KeypointSet):
+        # Every angle of the frame is computed once and shared between callers
+        cache_key = 'angles' if flip_left_right else 'angles_unflipped'
+        values = keypoints.cache.get(cache_key)
+        if values is None:
+            points, present = keypoints.gather(ANGLE_ENGINE.keypoint_names)
+            values = keypoints.cache[cache_key] = ANGLE_ENGINE.compute(points, present, flip_left_right)
+        return _select_angles(values, angle_subset)
+    
+    try:
+        points, present = ANGLE_ENGINE.keypoints_to_array(keypoints)
+    except ValueError:
+        # 3D keypoints take the per-angle path
+        angles = {}
+        for angle_name in angle_subset:
+            angle_value = compute_angle(angle_name, keypoints, flip_left_right)
+            if not np.isnan(angle_value):
+                angles[angle_name] = angle_value
+        return angles
     
+    return _select_angles(ANGLE_ENGINE.compute(points, present, flip_left_right), angle_subset)
+
+def _select_angles(values: np.ndarray, angle_subset: List[str]) -> Dict[str, float]:
+    """Angles of an engine result that could be calculated, by name"""
     angles = {}
     for angle_name in angle_subset:
-        angle_value = compute_angle(angle_name, keypoints)
-        if not np.isnan(angle_value):
-            angles[angle_name] = angle_value
+        column = ANGLE_ENGINE.angle_index.get(angle_name)
+        if column is not None and not np.isnan(values[column]):
+            angles[angle_name] = float(values[column])
     
     return angles
 
+def calculate_all_angles_batch(
+    sequence: KeypointSequence,
+    angle_subset: List[str] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate all angles or a subset for every frame of a keypoint sequence
+    
+    Returns (T,) float64 arrays, NaN in frames where an angle can't be calculated
+    """
+    if angle_subset is None:
+        angle_subset = ANGLE_ENGINE.angle_names
+    
+    values = sequence.cache.get('angles')
+    if values is None:
+        values = sequence.cache['angles'] = ANGLE_ENGINE.compute(*sequence.gather(ANGLE_ENGINE.keypoint_names))
+    
+    return {
+        angle_name: values[:, ANGLE_ENGINE.angle_index[angle_name]]
+        for angle_name in angle_subset if angle_name in ANGLE_ENGINE.angle_index
+    }
+
 def get_angle_requirements(angle_name: str) -> Dict[str, any]:
     """
     Get requirements for a specific angle calculation
@@ -366,10 +519,30 @@ def mean_angles(angles_list: List[float]) -> float:
     
     return float(mean_angle)
 
+def mean_angles_batch(angles: np.ndarray, axis: int = 0) -> np.ndarray:
+    """
+    Circular mean of angles along an axis, ignoring NaN
+    
+    NaN where a slice has no valid angle
+    """
+    angles_rad = np.radians(np.asarray(angles, dtype=np.float64))
+    valid = ~np.isnan(angles_rad)
+    count = valid.sum(axis=axis)
+    
+    sin_sum = np.where(valid, np.sin(angles_rad), 0.0).sum(axis=axis)
+    cos_sum = np.where(valid, np.cos(angles_rad), 0.0).sum(axis=axis)
+    mean_angle = np.degrees(np.arctan2(sin_sum, cos_sum))
+    
+    return np.where(count > 0, mean_angle, np.nan)
+
 def add_virtual_keypoints(keypoints: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
     """
     Add computed keypoints like Neck and Hip if not present
     """
+    # Keypoint sets derive Neck and Hip when they are built
+    if isinstance(keypoints, KeypointSet):
+        return keypoints
+    
     keypoints = keypoints.copy()
     
     # Add Neck if not present
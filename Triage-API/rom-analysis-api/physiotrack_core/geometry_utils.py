@@ -2,25 +2,23 @@
 Geometric utility functions from PhysioTrack
 """
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 
-def euclidean_distance(q1: np.ndarray, q2: np.ndarray) -> float:
+def euclidean_distance(q1: np.ndarray, q2: np.ndarray) -> Union[float, np.ndarray]:
     """
-    Euclidean distance between 2 points (N-dim)
-    """
-    q1 = np.array(q1)
-    q2 = np.array(q2)
-    dist = q2 - q1
+    Euclidean distance between 2 points (N-dim), or row-wise between two
+    arrays of points (..., N)
     
-    if np.isnan(dist).all():
-        return np.inf
+    Missing (NaN) coordinates are ignored, all-NaN points are infinitely far
+    """
+    dist = np.asarray(q2) - np.asarray(q1)
     
-    if len(dist.shape) == 1:
-        euc_dist = np.sqrt(np.nansum([d**2 for d in dist]))
-    else:
-        euc_dist = np.sqrt(np.nansum([d**2 for d in dist], axis=1))
+    euc_dist = np.sqrt(np.nansum(dist ** 2, axis=-1))
+    euc_dist = np.where(np.isnan(dist).all(axis=-1), np.inf, euc_dist)
     
-    return float(euc_dist)
+    if euc_dist.ndim == 0:
+        return float(euc_dist)
+    return euc_dist
 
 def angle_2d_vectors(v1: np.ndarray, v2: np.ndarray) -> float:
     """
@@ -0,0 +1,95 @@
+"""
+Keypoint layouts of the supported pose models
+"""
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# HALPE_26 (BodyWithFeet), model output order
+HALPE_26 = [
+    "Nose", "LEye", "REye", "LEar", "REar",
+    "LShoulder", "RShoulder", "LElbow", "RElbow",
+    "LWrist", "RWrist", "LHip", "RHip",
+    "LKnee", "RKnee", "LAnkle", "RAnkle",
+    "Head", "Neck", "Hip", "LBigToe", "RBigToe",
+    "LSmallToe", "RSmallToe", "LHeel", "RHeel"
+]
+
+# COCO_17 (Body), model output order
+COCO_17 = [
+    "Nose", "LEye", "REye", "LEar", "REar",
+    "LShoulder", "RShoulder", "LElbow", "RElbow",
+    "LWrist", "RWrist", "LHip", "RHip",
+    "LKnee", "RKnee", "LAnkle", "RAnkle"
+]
+
+def _hand_keypoints(side: str) -> List[str]:
+    """The 21 hand points of COCO_133, with the named fingers used by the angle definitions"""
+    names = [f"{side}Hand{i}" for i in range(21)]
+    names[2] = f"{side}Thumb"
+    names[5] = f"{side}Index"
+    names[17] = f"{side}Pinky"
+    return names
+
+# COCO_133 (Wholebody), model output order: body, feet, face, left hand, right hand
+COCO_133 = (
+    COCO_17
+    + ["LBigToe", "LSmallToe", "LHeel", "RBigToe", "RSmallToe", "RHeel"]
+    + [f"Face{i}" for i in range(68)]
+    + _hand_keypoints("L")
+    + _hand_keypoints("R")
+)
+
+# Keypoints derived as the midpoint of two others when the model doesn't provide them
+VIRTUAL_KEYPOINTS = {
+    "Neck": ("LShoulder", "RShoulder"),
+    "Hip": ("LHip", "RHip"),
+}
+
+class SkeletonLayout:
+    """Slot layout of a model's keypoints, with slots for the virtual keypoints"""
+
+    def __init__(self, keypoint_names: Sequence[str]):
+        self.keypoint_names = list(keypoint_names)
+        self.num_model_keypoints = len(self.keypoint_names)
+        self.names = self.keypoint_names + [name for name in VIRTUAL_KEYPOINTS if name not in self.keypoint_names]
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        # (slot, source a, source b) of every virtual keypoint the layout can derive
+        self.virtual_slots = [
+            (self.index[name], self.index[a], self.index[b])
+            for name, (a, b) in VIRTUAL_KEYPOINTS.items()
+            if a in self.index and b in self.index
+        ]
+        self._gather_cache: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    def gather_indices(self, names: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slot index of each name and whether the layout has it, cached per name tuple"""
+        cached = self._gather_cache.get(names)
+        if cached is None:
+            known = np.array([name in self.index for name in names], dtype=bool)
+            idx = np.array([self.index.get(name, 0) for name in names], dtype=np.intp)
+            cached = self._gather_cache[names] = (idx, known)
+        return cached
+
+SKELETON_LAYOUTS = {
+    "HALPE_26": SkeletonLayout(HALPE_26),
+    "COCO_17": SkeletonLayout(COCO_17),
+    "COCO_133": SkeletonLayout(COCO_133),
+}
+
+@lru_cache(maxsize=None)
+def _layout_for_names(keypoint_names: Tuple[str, ...]) -> SkeletonLayout:
+    for layout in SKELETON_LAYOUTS.values():
+        if tuple(layout.keypoint_names) == keypoint_names:
+            return layout
+    return SkeletonLayout(keypoint_names)
+
+def get_layout(keypoint_names: Sequence[str]) -> SkeletonLayout:
+    """Layout for a model's keypoint names, shared between calls"""
+    return _layout_for_names(tuple(keypoint_names))
@@ -0,0 +1,358 @@
+"""
+Temporal keypoint filters, run per session on the whole keypoint array
+
+Every filter keeps its state in arrays preallocated for the layout's K
+slots and updates them with in-place NumPy operations, so a frame costs
+O(K) and allocates nothing. Keypoints that drop below the confidence
+threshold for a few frames are filled from the filter's estimate instead
+of going missing.
+"""
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+
+from .keypoint_set import KeypointSet
+
+logger = logging.getLogger(__name__)
+
+# Smallest time step in seconds, for frames arriving with the same timestamp
+MIN_DT = 1e-3
+
+# Velocity uncertainty of a newly seen keypoint for the Kalman filter, px/s
+INITIAL_VELOCITY_STD = 500.0
+
+class KeypointFilter(ABC):
+    """
+    Base of the temporal filters: gap bookkeeping over K keypoint slots
+
+    Subclasses implement _initialize (first measurement), _correct (a new
+    measurement) and _predict (estimate for a missing keypoint), each writing
+    only where the given mask is set.
+    """
+
+    def __init__(self, num_keypoints: int, max_gap_frames: int = 5):
+        self.num_keypoints = num_keypoints
+        self.max_gap_frames = max_gap_frames
+        self.lock = Lock()
+
+        # Keypoints with an estimate, frames since their last measurement and its time
+        self.tracked = np.zeros(num_keypoints, dtype=bool)
+        self.missing_frames = np.zeros(num_keypoints, dtype=np.int32)
+        self.last_time = np.zeros(num_keypoints, dtype=np.float64)
+
+        # Scratch buffers reused every frame
+        self._dt64 = np.zeros(num_keypoints, dtype=np.float64)
+        self._dt = np.zeros((num_keypoints, 1), dtype=np.float32)
+        self._measured = np.zeros(num_keypoints, dtype=bool)
+        self._new = np.zeros(num_keypoints, dtype=bool)
+        self._fill = np.zeros(num_keypoints, dtype=bool)
+        self._mask = np.zeros(num_keypoints, dtype=bool)
+
+    def reset(self):
+        """Forget every estimate"""
+        with self.lock:
+            self.tracked[:] = False
+            self.missing_frames[:] = 0
+
+    def apply(self, xy: np.ndarray, valid: np.ndarray, timestamp: float) -> int:
+        """
+        Filter one frame in place
+
+        Args:
+            xy: (K, 2) float32 coordinates, replaced by the filtered ones
+            valid: (K,) measured keypoints, set for the ones filled from the estimate
+            timestamp: Frame time in seconds
+
+        Returns:
+            Number of keypoints filled
+        """
+        with self.lock:
+            np.subtract(timestamp, self.last_time, out=self._dt64)
+            np.maximum(self._dt64, MIN_DT, out=self._dt64)
+            self._dt[:, 0] = self._dt64
+            dt = self._dt
+
+            # Split into measured, newly seen and missing-but-tracked keypoints
+            np.logical_and(valid, self.tracked, out=self._measured)
+            np.logical_not(self.tracked, out=self._mask)
+            np.logical_and(valid, self._mask, out=self._new)
+            np.logical_not(valid, out=self._mask)
+            np.logical_and(self._mask, self.tracked, out=self._mask)
+            np.add(self.missing_frames, 1, out=self.missing_frames, where=self._mask)
+            np.less_equal(self.missing_frames, self.max_gap_frames, out=self._fill)
+            np.logical_and(self._fill, self._mask, out=self._fill)
+
+            # Tracks missing for longer than the gap limit start over
+            np.greater(self.missing_frames, self.max_gap_frames, out=self._mask)
+            np.logical_and(self._mask, self.tracked, out=self._mask)
+            np.copyto(self.tracked, False, where=self._mask)
+
+            self._correct(xy, self._measured[:, None], dt)
+            self._initialize(xy, self._new[:, None])
+            self._predict(xy, self._fill[:, None], dt)
+
+            np.logical_or(self._measured, self._new, out=self._mask)
+            np.logical_or(self.tracked, self._mask, out=self.tracked)
+            np.copyto(self.missing_frames, 0, where=self._mask)
+            np.copyto(self.last_time, timestamp, where=self._mask)
+            np.logical_or(valid, self._fill, out=valid)
+            return int(np.count_nonzero(self._fill))
+
+    @abstractmethod
+    def _initialize(self, xy: np.ndarray, mask: np.ndarray):
+        """Start the estimate of newly seen keypoints from their measurement"""
+        pass
+
+    @abstractmethod
+    def _correct(self, xy: np.ndarray, mask: np.ndarray, dt: np.ndarray):
+        """Update the estimate of measured keypoints, writing the filtered positions"""
+        pass
+
+    @abstractmethod
+    def _predict(self, xy: np.ndarray, mask: np.ndarray, dt: np.ndarray):
+        """Write the estimate of tracked keypoints missing in this frame"""
+        pass
+
+class OneEuroFilter(KeypointFilter):
+    """
+    One-Euro filter: low-pass whose cutoff rises with speed
+
+    Slow movement is smoothed strongly (min_cutoff, Hz) while fast movement
+    follows with little lag (beta, per px/s). Missing keypoints hold their
+    last estimate.
+    """
+
+    def __init__(
+        self,
+        num_keypoints: int,
+        max_gap_frames: int = 5,
+        min_cutoff: float = 1.0,
+        beta: float = 0.05,
+        d_cutoff: float = 1.0
+    ):
+        super().__init__(num_keypoints, max_gap_frames)
+        self.min_cutoff = np.float32(min_cutoff)
+        self.beta = np.float32(beta)
+        self.tau_d = np.float32(1.0 / (2 * np.pi * d_cutoff))
+
+        self.x_hat = np.zeros((num_keypoints, 2), dtype=np.float32)
+        self.dx_hat = np.zeros((num_keypoints, 2), dtype=np.float32)
+        self._s1 = np.zeros((num_keypoints, 2), dtype=np.float32)
+        self._s2 = np.zeros((num_keypoints, 2), dtype=np.float32)
+        self._alpha_d = np.zeros((num_keypoints, 1), dtype=np.float32)
+
+    def _initialize(self, xy, mask):
+        np.copyto(self.x_hat, xy, where=mask)
+        np.copyto(self.dx_hat, 0, where=mask)
+
+    def _correct(self, xy, mask, dt):
+        s1, s2 = self._s1, self._s2
+
+        # Smoothed speed, alpha = 1 / (1 + tau / dt)
+        np.subtract(xy, self.x_hat, out=s1)
+        np.divide(s1, dt, out=s1)
+        np.divide(self.tau_d, dt, out=self._alpha_d)
+        np.add(self._alpha_d, 1, out=self._alpha_d)
+        np.reciprocal(self._alpha_d, out=self._alpha_d)
+        np.subtract(s1, self.dx_hat, out=s1)
+        np.multiply(s1, self._alpha_d, out=s1)
+        np.add(self.dx_hat, s1, out=self.dx_hat, where=mask)
+
+        # Speed-dependent cutoff, alpha = 1 / (1 + 1 / (2 pi cutoff dt))
+        np.abs(self.dx_hat, out=s2)
+        np.multiply(s2, self.beta, out=s2)
+        np.add(s2, self.min_cutoff, out=s2)
+        np.multiply(s2, np.float32(2 * np.pi), out=s2)
+        np.multiply(s2, dt, out=s2)
+        np.reciprocal(s2, out=s2)
+        np.add(s2, 1, out=s2)
+        np.reciprocal(s2, out=s2)
+
+        np.subtract(xy, self.x_hat, out=s1)
+        np.multiply(s1, s2, out=s1)
+        np.add(self.x_hat, s1, out=self.x_hat, where=mask)
+        np.copyto(xy, self.x_hat, where=mask)
+
+    def _predict(self, xy, mask, dt):
+        np.copyto(xy, self.x_hat, where=mask)
+
+class KalmanFilter(KeypointFilter):
+    """
+    Constant-velocity Kalman filter per coordinate
+
+    process_noise is the acceleration standard deviation (px/s^2) and
+    measurement_noise the detector's position standard deviation (px).
+    Missing keypoints are extrapolated along their velocity.
+    """
+
+    def __init__(
+        self,
+        num_keypoints: int,
+        max_gap_frames: int = 5,
+        process_noise: float = 500.0,
+        measurement_noise: float = 4.0
+    ):
+        super().__init__(num_keypoints, max_gap_frames)
+        self.q = np.float32(process_noise ** 2)
+        self.r = np.float32(measurement_noise ** 2)
+
+        shape = (num_keypoints, 2)
+        # State (position, velocity) and its covariance [[p00, p01], [p01, p11]]
+        self.pos = np.zeros(shape, dtype=np.float32)
+        self.vel = np.zeros(shape, dtype=np.float32)
+        self.p00 = np.zeros(shape, dtype=np.float32)
+        self.p01 = np.zeros(shape, dtype=np.float32)
+        self.p11 = np.zeros(shape, dtype=np.float32)
+        self._s = [np.zeros(shape, dtype=np.float32) for _ in range(8)]
+        self._q = [np.zeros((num_keypoints, 1), dtype=np.float32) for _ in range(3)]
+
+    def _initialize(self, xy, mask):
+        np.copyto(self.pos, xy, where=mask)
+        np.copyto(self.vel, 0, where=mask)
+        np.copyto(self.p00, self.r, where=mask)
+        np.copyto(self.p01, 0, where=mask)
+        np.copyto(self.p11, np.float32(INITIAL_VELOCITY_STD ** 2), where=mask)
+
+    def _correct(self, xy, mask, dt):
+        pos_pred, p00, p01, p11, gain0, gain1, innovation, step = self._s
+        q2, q3, q4 = self._q
+
+        # Process noise terms q dt^2, q dt^3 / 2 and q dt^4 / 4
+        np.multiply(dt, dt, out=q2)
+        np.multiply(q2, dt, out=q3)
+        np.multiply(q3, dt, out=q4)
+        np.multiply(q2, self.q, out=q2)
+        np.multiply(q3, self.q / 2, out=q3)
+        np.multiply(q4, self.q / 4, out=q4)
+
+        # Predict: pos + vel dt, P = F P F' + Q
+        np.multiply(self.vel, dt, out=pos_pred)
+        np.add(pos_pred, self.pos, out=pos_pred)
+        np.multiply(self.p11, dt, out=p01)
+        np.add(p01, self.p01, out=p01)
+        np.add(p01, self.p01, out=p00)
+        np.multiply(p00, dt, out=p00)
+        np.add(p00, self.p00, out=p00)
+        np.add(p00, q4, out=p00)
+        np.add(p01, q3, out=p01)
+        np.add(self.p11, q2, out=p11)
+
+        # Gains p00 / (p00 + r) and p01 / (p00 + r)
+        np.add(p00, self.r, out=gain1)
+        np.divide(p00, gain1, out=gain0)
+        np.divide(p01, gain1, out=gain1)
+
+        # Update the state with the innovation
+        np.subtract(xy, pos_pred, out=innovation)
+        np.multiply(gain1, innovation, out=step)
+        np.add(self.vel, step, out=self.vel, where=mask)
+        np.multiply(gain0, innovation, out=step)
+        np.add(pos_pred, step, out=self.pos, where=mask)
+
+        # Update the covariance, P = (I - K H) P
+        np.multiply(gain1, p01, out=step)
+        np.subtract(p11, step, out=self.p11, where=mask)
+        np.subtract(1, gain0, out=gain0)
+        np.multiply(gain0, p00, out=self.p00, where=mask)
+        np.multiply(gain0, p01, out=self.p01, where=mask)
+        np.copyto(xy, self.pos, where=mask)
+
+    def _predict(self, xy, mask, dt):
+        step = self._s[7]
+        np.multiply(self.vel, dt, out=step)
+        np.add(step, self.pos, out=step)
+        np.copyto(xy, step, where=mask)
+
+KEYPOINT_FILTERS = {
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+class KeypointFilterBank:
+    """
+    Keypoint filter of every session, the least recently used evicted
+    past max_sessions
+
+    Each session keeps one filter; switching the filter type (another
+    movement) starts it over.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 256,
+        max_gap_frames: int = 5,
+        filter_params: Optional[Dict[str, Dict]] = None
+    ):
+        self.max_sessions = max_sessions
+        self.max_gap_frames = max_gap_frames
+        self.filter_params = filter_params or {}
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def filter(
+        self,
+        session_id: Optional[str],
+        keypoints: Mapping[str, np.ndarray],
+        filter_name: Optional[str],
+        timestamp: float
+    ) -> Mapping[str, np.ndarray]:
+        """
+        Filter a frame's keypoints with the session's filter
+
+        Keypoints sets are filtered in place. A frame without a usable pose
+        (empty keypoints) is filled from the estimates when the session's
+        keypoints went missing no more than max_gap_frames ago.
+        """
+        if session_id is None or not filter_name or filter_name == "none":
+            return keypoints
+        if filter_name not in KEYPOINT_FILTERS:
+            raise ValueError(f"Unknown keypoint filter: {filter_name}")
+
+        if isinstance(keypoints, KeypointSet):
+            layout, keypoint_filter = self._session_filter(session_id, filter_name, keypoints.layout)
+            with keypoints.editable():
+                keypoint_filter.apply(keypoints.data[:, :2], keypoints.valid, timestamp)
+            return keypoints
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        if entry is None or not isinstance(entry[1], KEYPOINT_FILTERS[filter_name]):
+            return keypoints
+
+        layout, keypoint_filter = entry
+        predicted = KeypointSet(
+            layout,
+            np.zeros((layout.size, 3), dtype=np.float32),
+            np.zeros(layout.size, dtype=bool)
+        )
+        with predicted.editable():
+            filled = keypoint_filter.apply(predicted.data[:, :2], predicted.valid, timestamp)
+        return predicted if filled else keypoints
+
+    def release(self, session_id: str):
+        """Forget a finished session's filter"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def _session_filter(self, session_id: str, filter_name: str, layout) -> tuple:
+        """Get or create the session's (layout, filter)"""
+        filter_class = KEYPOINT_FILTERS[filter_name]
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] is not layout or not isinstance(entry[1], filter_class):
+                keypoint_filter = filter_class(
+                    layout.size,
+                    max_gap_frames=self.max_gap_frames,
+                    **self.filter_params.get(filter_name, {})
+                )
+                entry = self._sessions[session_id] = (layout, keypoint_filter)
+                logger.debug(f"Started {filter_name} keypoint filter for session {session_id}")
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return entry
@@ -0,0 +1,200 @@
+"""
+Array-backed keypoints of one person, per frame or over a recording
+"""
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .keypoint_definitions import SkeletonLayout
+
+class KeypointSet(Mapping):
+    """
+    Keypoints as one contiguous float32 (K, 3) array of x, y and score
+
+    Reads like the Dict[str, np.ndarray] the analysis code expects: names
+    map to (2,) coordinate views, and only keypoints above the confidence
+    threshold (or derived from two that are) are present.
+    """
+
+    __slots__ = ("layout", "data", "valid", "cache")
+
+    def __init__(self, layout: SkeletonLayout, data: np.ndarray, valid: np.ndarray):
+        self.layout = layout
+        self.data = data
+        self.valid = valid
+        # Per-frame results derived from the keypoints, e.g. the angles
+        self.cache: Dict = {}
+        # Read-only, so derived results stay valid
+        self.data.flags.writeable = False
+        self.valid.flags.writeable = False
+
+    @classmethod
+    def from_model_output(
+        cls,
+        layout: SkeletonLayout,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        confidence_threshold: float = 0.3
+    ) -> "KeypointSet":
+        """Build from one person's model keypoints (K, 2) and scores (K,)"""
+        data = np.zeros((layout.size, 3), dtype=np.float32)
+        valid = np.zeros(layout.size, dtype=bool)
+
+        count = min(len(scores), layout.num_model_keypoints)
+        data[:count, :2] = keypoints[:count, :2]
+        data[:count, 2] = scores[:count]
+        valid[:count] = data[:count, 2] >= confidence_threshold
+
+        # Derive Neck and Hip when the model doesn't detect them confidently
+        for slot, a, b in layout.virtual_slots:
+            if not valid[slot] and valid[a] and valid[b]:
+                data[slot, :2] = (data[a, :2] + data[b, :2]) / 2
+                data[slot, 2] = min(data[a, 2], data[b, 2])
+                valid[slot] = True
+
+        return cls(layout, data, valid)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        idx = self.layout.index.get(name)
+        if idx is None or not self.valid[idx]:
+            raise KeyError(name)
+        return self.data[idx, :2]
+
+    def __contains__(self, name) -> bool:
+        idx = self.layout.index.get(name)
+        return idx is not None and bool(self.valid[idx])
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.layout.names
+        return (names[i] for i in np.flatnonzero(self.valid))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.valid))
+
+    def __repr__(self) -> str:
+        return f"KeypointSet({len(self)}/{self.layout.size} keypoints)"
+
+    def score(self, name: str) -> float:
+        """Confidence of a keypoint"""
+        return float(self.data[self.layout.index[name], 2])
+
+    def gather(self, names: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordinates (N, 2) of the given names and which of them are present"""
+        idx, known = self.layout.gather_indices(names)
+        return self.data[idx, :2], self.valid[idx] & known
+
+    @contextmanager
+    def editable(self):
+        """
+        Make the arrays writable for a stage that refines the keypoints in
+        place before the set is shared, e.g. temporal filtering
+        """
+        self.data.flags.writeable = True
+        self.valid.flags.writeable = True
+        try:
+            yield self
+        finally:
+            self.data.flags.writeable = False
+            self.valid.flags.writeable = False
+            self.cache.clear()
+
+    def scaled(self, scale: np.ndarray) -> "KeypointSet":
+        """Copy with the coordinates multiplied by scale (x, y)"""
+        data = self.data.copy()
+        data[:, :2] *= np.asarray(scale, dtype=np.float32)
+        return KeypointSet(self.layout, data, self.valid.copy())
+
+    def to_json(self) -> Dict[str, Dict[str, float]]:
+        """Present keypoints as {name: {"x": x, "y": y}}"""
+        names = self.layout.names
+        xy = self.data[:, :2].tolist()
+        return {names[i]: {"x": xy[i][0], "y": xy[i][1]} for i in np.flatnonzero(self.valid)}
+
+class KeypointSequence:
+    """
+    Keypoints of one person over T frames as a float32 (T, K, 3) array
+
+    The batch counterpart of KeypointSet, for analysing whole recordings
+    in one pass.
+    """
+
+    __slots__ = ("layout", "data", "valid", "cache")
+
+    def __init__(self, layout: SkeletonLayout, data: np.ndarray, valid: np.ndarray):
+        self.layout = layout
+        self.data = data
+        self.valid = valid
+        self.cache: Dict = {}
+        self.data.flags.writeable = False
+        self.valid.flags.writeable = False
+
+    @classmethod
+    def from_model_output(
+        cls,
+        layout: SkeletonLayout,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        confidence_threshold: float = 0.3
+    ) -> "KeypointSequence":
+        """
+        Build from keypoints (T, K, 2) and either scores (T, K) or a boolean
+        validity mask (T, K)
+        """
+        keypoints = np.asarray(keypoints)
+        scores = np.asarray(scores)
+        frames = keypoints.shape[0]
+        data = np.zeros((frames, layout.size, 3), dtype=np.float32)
+        valid = np.zeros((frames, layout.size), dtype=bool)
+
+        count = min(scores.shape[1], layout.num_model_keypoints)
+        data[:, :count, :2] = keypoints[:, :count, :2]
+        if scores.dtype == bool:
+            data[:, :count, 2] = scores[:, :count]
+            valid[:, :count] = scores[:, :count]
+        else:
+            data[:, :count, 2] = scores[:, :count]
+            valid[:, :count] = data[:, :count, 2] >= confidence_threshold
+
+        # Derive Neck and Hip in the frames where the model doesn't detect them confidently
+        for slot, a, b in layout.virtual_slots:
+            derive = ~valid[:, slot] & valid[:, a] & valid[:, b]
+            data[derive, slot, :2] = (data[derive, a, :2] + data[derive, b, :2]) / 2
+            data[derive, slot, 2] = np.minimum(data[derive, a, 2], data[derive, b, 2])
+            valid[derive, slot] = True
+
+        return cls(layout, data, valid)
+
+    @classmethod
+    def from_keypoint_sets(cls, frames: List[KeypointSet]) -> "KeypointSequence":
+        """Stack per-frame keypoint sets of the same layout"""
+        layout = frames[0].layout
+        return cls(
+            layout,
+            np.stack([frame.data for frame in frames]),
+            np.stack([frame.valid for frame in frames])
+        )
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __contains__(self, name) -> bool:
+        """Whether the layout has the keypoint, whatever frames it is present in"""
+        return name in self.layout.index
+
+    def point(self, name: str) -> np.ndarray:
+        """(T, 2) coordinates of a keypoint, NaN in frames where it is missing"""
+        idx = self.layout.index.get(name)
+        if idx is None:
+            return np.full((len(self), 2), np.nan, dtype=np.float32)
+        return np.where(self.valid[:, idx, None], self.data[:, idx, :2], np.float32(np.nan))
+
+    def gather(self, names: Tuple[str, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordinates (T, N, 2) of the given names and which of them are present (T, N)"""
+        idx, known = self.layout.gather_indices(names)
+        return self.data[:, idx, :2], self.valid[:, idx] & known
+
+    def frame(self, t: int) -> KeypointSet:
+        """Keypoint set of one frame"""
+        return KeypointSet(self.layout, self.data[t].copy(), self.valid[t].copy())
@@ -3,26 +3,208 @@ Complete pose detection wrapper for PhysioTrack
 Properly integrated with RTMLib
 """
 import numpy as np
+import importlib.util
+import os
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+from threading import Lock
 from typing import Dict, Tuple, List, Optional
 import logging
 
-try:
-    from rtmlib import PoseTracker, BodyWithFeet, Body, Wholebody
-    RTMLIB_AVAILABLE = True
-except ImportError:
-    RTMLIB_AVAILABLE = False
+from .keypoint_definitions import COCO_17, COCO_133, HALPE_26, get_layout
+from .keypoint_set import KeypointSet
+
+# rtmlib is imported when a detector is built, so importing this module stays cheap
+RTMLIB_AVAILABLE = importlib.util.find_spec("rtmlib") is not None
+if not RTMLIB_AVAILABLE:
     logging.warning("RTMLib not available. Pose detection will not work.")
 
-class PoseDetector:
-    """Pose detector wrapper with proper RTMLib integration"""
+def keypoints_to_dict(
+    keypoint_names: List[str],
+    keypoints: np.ndarray,
+    scores: np.ndarray,
+    confidence_threshold: float = 0.3
+) -> KeypointSet:
+    """
+    Convert keypoint array to a keypoint set with confidence filtering
+    
+    Args:
+        keypoint_names: Keypoint names in model output order
+        keypoints: Array of shape (n_keypoints, 2)
+        scores: Array of shape (n_keypoints,)
+        confidence_threshold: Minimum confidence to include keypoint
+        
+    Returns:
+        KeypointSet mapping keypoint names to coordinates, with Neck and Hip
+        derived from the shoulders and hips when not detected
+    """
+    return KeypointSet.from_model_output(get_layout(keypoint_names), keypoints, scores, confidence_threshold)
+
+# POSE_MODE suffix that serves the INT8 variant of a mode, e.g. "performance_int8"
+INT8_MODE_SUFFIX = "_int8"
+
+def quantized_model_path(onnx_path: str, model_dir: Optional[str] = None) -> str:
+    """Path of the INT8 variant of an ONNX model: <name>.int8.onnx, next to it or in model_dir"""
+    stem = os.path.splitext(os.path.basename(onnx_path))[0]
+    return os.path.join(model_dir or os.path.dirname(onnx_path), f"{stem}.int8.onnx")
+
+class InferenceBackend:
+    """How PoseDetector runs its ONNX models; the default passes backend/device to rtmlib unchanged"""
+    
+    name = "default"
+    rtmlib_backend: Optional[str] = None  # None keeps the backend given to PoseDetector
+    
+    def __init__(self, intra_op_threads: int = 0, inter_op_threads: int = 0, model_dir: Optional[str] = None):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.model_dir = model_dir
+    
+    def is_available(self) -> bool:
+        """Check whether the runtime this backend needs is installed"""
+        return True
+    
+    def prepare(self, tracker):
+        """Adjust the rtmlib models after they are loaded"""
+        pass
+
+class OrtCpuBackend(InferenceBackend):
+    """ONNX Runtime on CPU with explicit thread and graph settings"""
+    
+    name = "ort_cpu"
+    rtmlib_backend = "onnxruntime"
+    
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("onnxruntime") is not None
+    
+    def prepare(self, tracker):
+        for tool in (tracker.det_model, tracker.pose_model):
+            self._load_session(tool, self._model_path(tool))
+    
+    def _model_path(self, tool) -> str:
+        model_path = getattr(tool, 'onnx_model', None)
+        if not model_path or not os.path.exists(model_path):
+            raise RuntimeError(f"Cannot locate the ONNX file of {type(tool).__name__}")
+        return model_path
+    
+    def _load_session(self, tool, model_path: str):
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if self.intra_op_threads > 0:
+            options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads > 0:
+            options.inter_op_num_threads = self.inter_op_threads
+        # Idle threads sleep instead of spinning, several sessions share the cores
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        
+        tool.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+class OpenVinoCpuBackend(InferenceBackend):
+    """OpenVINO on CPU through rtmlib's openvino backend"""
+    
+    name = "openvino_cpu"
+    rtmlib_backend = "openvino"
+    
+    def is_available(self) -> bool:
+        return importlib.util.find_spec("openvino") is not None
+
+class OrtInt8Backend(OrtCpuBackend):
+    """ONNX Runtime on CPU serving the INT8-quantized variant of each model"""
+    
+    name = "ort_int8"
+    
+    def _model_path(self, tool) -> str:
+        int8_path = quantized_model_path(super()._model_path(tool), self.model_dir)
+        if not os.path.exists(int8_path):
+            raise FileNotFoundError(f"Quantized model not found: {int8_path}")
+        return int8_path
+
+INFERENCE_BACKENDS = {
+    backend.name: backend
+    for backend in (InferenceBackend, OrtCpuBackend, OpenVinoCpuBackend, OrtInt8Backend)
+}
+
+def get_inference_backend(name: str, **kwargs) -> InferenceBackend:
+    """Create an inference backend by name"""
+    if name not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend: {name}. Choose from {list(INFERENCE_BACKENDS)}")
+    return INFERENCE_BACKENDS[name](**kwargs)
+
+def benchmark_backends(
+    candidates: List[str],
+    detector_kwargs: Dict,
+    iterations: int = 10,
+    backend_kwargs: Optional[Dict] = None
+) -> List[Dict]:
+    """
+    Time each candidate backend on a synthetic frame
     
-    _instance = None
-    _initialized = False
+    Args:
+        candidates: Inference backend names to try
+        detector_kwargs: PoseDetector arguments shared by every candidate
+        iterations: Timed detections per candidate, after one warm-up run
+        backend_kwargs: Backend arguments (threads, model_dir)
+        
+    Returns:
+        One dict per candidate with name, available, latency_ms and error,
+        fastest available backend first
+    """
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
     
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    results = []
+    for name in candidates:
+        result = {"name": name, "available": False, "latency_ms": None, "error": None}
+        try:
+            detector = PoseDetector(
+                **detector_kwargs, inference_backend=name, backend_kwargs=backend_kwargs
+            )
+            detector.detect(frame)
+            start = time.perf_counter()
+            for _ in range(max(1, iterations)):
+                detector.detect(frame)
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000 / max(1, iterations), 2)
+            result["available"] = True
+            del detector
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+        logging.info(f"Inference backend {name}: {result}")
+    
+    return sorted(results, key=lambda r: (not r["available"], r["latency_ms"] or 0.0))
+
+# IoU above which a pose's box continues a person of the previous frame, as in rtmlib's PoseTracker
+TRACKING_IOU_THRESHOLD = 0.3
+
+def _iou(box_a: np.ndarray, box_b: np.ndarray) -> float:
+    """Intersection over union of two (x1, y1, x2, y2) boxes"""
+    inter_w = max(0.0, min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]))
+    inter_h = max(0.0, min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]))
+    inter = inter_w * inter_h
+    union = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1]) + (box_b[2] - box_b[0]) * (box_b[3] - box_b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+class SessionTrackState:
+    """Person boxes and track ids carried between frames of one session"""
+    
+    def __init__(self):
+        self.bboxes_last_frame: List[np.ndarray] = []
+        self.frames_since_detection = 0
+        # Boxes and ids of the previous frame's people, in track order
+        self.track_boxes: List[np.ndarray] = []
+        self.track_ids: List[int] = []
+        self.next_track_id = 0
+        # Frames of one session can run on different inference threads,
+        # each reads and updates the boxes under this lock
+        self.lock = Lock()
+
+class PoseDetector:
+    """Pose detector wrapper with proper RTMLib integration"""
     
     def __init__(
         self, 
@@ -30,20 +212,45 @@ class PoseDetector:
         mode: str = "performance",  # Changed default to performance
         device: str = "cpu",
         backend: str = "onnxruntime",
-        det_frequency: int = 1
+        det_frequency: int = 1,
+        det_refresh_confidence: float = 0.4,
+        max_tracked_sessions: int = 256,
+        inference_backend: str = "default",
+        backend_kwargs: Optional[Dict] = None
     ):
-        # Avoid re-initialization
-        if PoseDetector._initialized:
-            return
-            
+        self._initialized = False
+        
         if not RTMLIB_AVAILABLE:
             raise ImportError("RTMLib is not installed. Please install it with: pip install rtmlib")
         
+        # "<mode>_int8" loads the FP32 mode through rtmlib, then swaps in its quantized models
+        if mode.endswith(INT8_MODE_SUFFIX):
+            mode = mode[:-len(INT8_MODE_SUFFIX)]
+            inference_backend = "ort_int8"
+        
+        # Backends other than the default pick the rtmlib backend and run on CPU
+        self.inference_backend = get_inference_backend(inference_backend, **(backend_kwargs or {}))
+        if not self.inference_backend.is_available():
+            raise ImportError(f"Inference backend {inference_backend} is not available on this host")
+        if self.inference_backend.rtmlib_backend is not None:
+            backend = self.inference_backend.rtmlib_backend
+            device = "cpu"
+        
         self.model = model
         self.mode = mode
         self.device = device
         self.backend = backend
         
+        # Per-session tracking: the person detector runs every det_frequency
+        # frames, or sooner when the tracked pose loses confidence
+        self.det_frequency = max(1, det_frequency)
+        self.det_refresh_confidence = det_refresh_confidence
+        self.max_tracked_sessions = max(1, max_tracked_sessions)
+        self._sessions: "OrderedDict[str, SessionTrackState]" = OrderedDict()
+        self._sessions_lock = Lock()
+        
+        from rtmlib import PoseTracker, BodyWithFeet, Body, Wholebody
+        
         # Model selection
         if model.lower() == "body_with_feet":
             self.ModelClass = BodyWithFeet
@@ -57,29 +264,38 @@ class PoseDetector:
         else:
             raise ValueError(f"Unknown model: {model}")
         
-        # Initialize pose tracker
+        # Initialize pose tracker. Only its det_model and pose_model are called:
+        # they keep no state between frames, so every inference thread can share
+        # them, while PoseTracker.__call__ updates its frame count and last boxes.
+        # Box reuse is tracked per session instead
         try:
             self.tracker = PoseTracker(
                 self.ModelClass,
-                det_frequency=det_frequency,
+                det_frequency=1,
                 mode=mode,
                 backend=backend,
                 device=device,
                 tracking=False,  # We'll handle tracking separately
                 to_openpose=False
             )
-            PoseDetector._initialized = True
-            logging.info(f"Pose detector initialized with {model} model in {mode} mode on {device}")
+            self.inference_backend.prepare(self.tracker)
+            self._initialized = True
+            logging.info(
+                f"Pose detector initialized with {model} model in {mode} mode on {device} "
+                f"({self.inference_backend.name} inference backend)"
+            )
         except Exception as e:
             logging.error(f"Failed to initialize pose tracker: {e}")
             raise
     
-    def detect(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def detect(self, frame: np.ndarray, session_id: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Detect poses in frame
         
         Args:
             frame: Input image (BGR format from cv2)
+            session_id: Session the frame belongs to. Person boxes are reused
+                between frames of the same session; None detects every frame
             
         Returns:
             Tuple of (keypoints, scores) arrays
@@ -89,9 +305,18 @@ class PoseDetector:
         if not RTMLIB_AVAILABLE:
             return np.array([]), np.array([])
         
+        state = self._session_state(session_id)
+        
         try:
-            # RTMLib returns keypoints and scores
-            keypoints, scores = self.tracker(frame)
+            if state is None:
+                bboxes = self.tracker.det_model(frame)
+                keypoints, scores = self.tracker.pose_model(frame, bboxes=bboxes)
+            else:
+                with state.lock:
+                    detected = self._needs_detection(state)
+                    bboxes = self.tracker.det_model(frame) if detected else state.bboxes_last_frame
+                    keypoints, scores = self.tracker.pose_model(frame, bboxes=bboxes)
+                    keypoints, scores = self._update_session_state(state, frame, keypoints, scores, detected)
             
             # Ensure proper output format
             if len(keypoints) == 0:
@@ -102,14 +327,249 @@ class PoseDetector:
             logging.error(f"Pose detection failed: {e}")
             return np.array([]), np.array([])
     
+    def detect_batch(
+        self,
+        frames: List[np.ndarray],
+        session_ids: Optional[List[Optional[str]]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Detect poses in several frames with batched model calls
+        
+        Person detection and pose estimation each run as a single backend
+        call over the whole batch when the ONNX model has a dynamic batch
+        axis, and fall back to one call per image otherwise. Frames of the
+        same session run in order in successive calls, since each one reuses
+        the boxes and tracks of the one before.
+        
+        Args:
+            frames: List of input images (BGR format from cv2)
+            session_ids: Optional session of each frame, see detect()
+            
+        Returns:
+            List of (keypoints, scores) tuples, one per frame, in the same
+            format as detect()
+        """
+        if not RTMLIB_AVAILABLE or not frames:
+            return [(np.array([]), np.array([])) for _ in frames]
+        
+        session_ids = session_ids or [None] * len(frames)
+        results: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(frames)
+        remaining = list(range(len(frames)))
+        while remaining:
+            # At most one frame per session in each call, the rest wait for the next
+            batch, later, seen = [], [], set()
+            for i in remaining:
+                if session_ids[i] is not None and session_ids[i] in seen:
+                    later.append(i)
+                    continue
+                seen.add(session_ids[i])
+                batch.append(i)
+            states = [self._session_state(session_ids[i]) for i in batch]
+            with ExitStack() as stack:
+                for state in sorted({id(st): st for st in states if st is not None}.values(), key=id):
+                    stack.enter_context(state.lock)
+                batch_results = self._detect_batch_once([frames[i] for i in batch], states)
+            for i, result in zip(batch, batch_results):
+                results[i] = result
+            remaining = later
+        return results
+    
+    def _detect_batch_once(
+        self,
+        frames: List[np.ndarray],
+        states: List[Optional[SessionTrackState]]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Batched detection of frames from distinct sessions, their states locked by the caller"""
+        empty = (np.array([]), np.array([]))
+        det_model = self.tracker.det_model
+        pose_model = self.tracker.pose_model
+        
+        detected = [state is None or self._needs_detection(state) for state in states]
+        
+        # Person detection, skipped for frames that reuse their session's boxes
+        frame_bboxes: List[Optional[list]] = [
+            None if det else state.bboxes_last_frame for state, det in zip(states, detected)
+        ]
+        det_indices = [i for i, det in enumerate(detected) if det]
+        try:
+            if det_indices:
+                det_inputs = [det_model.preprocess(frames[i]) for i in det_indices]
+                det_outputs = self._infer_batch(det_model, [img for img, _ in det_inputs])
+                for i, (_, ratio), outputs in zip(det_indices, det_inputs, det_outputs):
+                    frame_bboxes[i] = det_model.postprocess(outputs[0], ratio)
+        except Exception as e:
+            logging.error(f"Batched person detection failed: {e}")
+            return [empty for _ in frames]
+        
+        # Pose estimation over every person crop of every frame
+        crops, owners = [], []
+        for frame_idx, (frame, bboxes) in enumerate(zip(frames, frame_bboxes)):
+            if len(bboxes) == 0:
+                bboxes = [[0, 0, frame.shape[1], frame.shape[0]]]
+            for bbox in bboxes:
+                crops.append(pose_model.preprocess(frame, bbox))
+                owners.append(frame_idx)
+        
+        try:
+            pose_outputs = self._infer_batch(pose_model, [img for img, _, _ in crops])
+        except Exception as e:
+            logging.error(f"Batched pose estimation failed: {e}")
+            return [empty for _ in frames]
+        
+        per_frame: List[Tuple[list, list]] = [([], []) for _ in frames]
+        for (_, center, scale), outputs, frame_idx in zip(crops, pose_outputs, owners):
+            kpts, score = pose_model.postprocess(outputs, center, scale)
+            per_frame[frame_idx][0].append(kpts)
+            per_frame[frame_idx][1].append(score)
+        
+        results = []
+        for frame, state, det, (kpts_list, score_list) in zip(frames, states, detected, per_frame):
+            if not kpts_list:
+                results.append(empty)
+                continue
+            keypoints = np.concatenate(kpts_list, axis=0)
+            scores = np.concatenate(score_list, axis=0)
+            if state is not None:
+                keypoints, scores = self._update_session_state(state, frame, keypoints, scores, det)
+            results.append((keypoints, scores))
+        return results
+    
+    def release_session(self, session_id: str):
+        """Forget the tracking state of a finished session"""
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+    
+    def _session_state(self, session_id: Optional[str]) -> Optional[SessionTrackState]:
+        """Get or create the tracking state of a session, evicting the least recently used"""
+        if session_id is None:
+            return None
+        
+        with self._sessions_lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = SessionTrackState()
+                self._sessions[session_id] = state
+                if len(self._sessions) > self.max_tracked_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return state
+    
+    def _needs_detection(self, state: SessionTrackState) -> bool:
+        """Check whether the person detector has to run for the next frame of a session"""
+        return not state.bboxes_last_frame or state.frames_since_detection >= self.det_frequency
+    
+    def _update_session_state(
+        self,
+        state: SessionTrackState,
+        frame: np.ndarray,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        detected: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Put this frame's poses in track order and derive next frame's person boxes from them
+        
+        Returns:
+            (keypoints, scores) with the longest tracked person first
+        """
+        state.frames_since_detection = 1 if detected else state.frames_since_detection + 1
+        if len(keypoints) == 0:
+            state.bboxes_last_frame = []
+            return keypoints, scores
+        
+        boxes = [
+            self._pose_to_bbox(person_kpts, person_scores, frame.shape)
+            for person_kpts, person_scores in zip(keypoints, scores)
+        ]
+        order = self._track_people(state, boxes)
+        keypoints, scores = keypoints[order], scores[order]
+        
+        # A weak pose means the box has drifted off the person, so clear
+        # the boxes to force detection on the next frame
+        if any(np.mean(person_scores) < self.det_refresh_confidence for person_scores in scores):
+            state.bboxes_last_frame = []
+        else:
+            state.bboxes_last_frame = list(state.track_boxes)
+        return keypoints, scores
+    
+    def _track_people(self, state: SessionTrackState, boxes: List[np.ndarray]) -> List[int]:
+        """
+        Match boxes to the session's previous people greedily by IoU, like rtmlib's track_by_iou
+        
+        Matched boxes keep their track id and the others get new ones.
+        Returns the box indices sorted by track id, so the first person
+        stays the same one from frame to frame.
+        """
+        previous = list(zip(state.track_ids, state.track_boxes))
+        ids = []
+        for box in boxes:
+            best, best_iou = -1, TRACKING_IOU_THRESHOLD
+            for index, (_, previous_box) in enumerate(previous):
+                iou = _iou(box, previous_box)
+                if iou > best_iou:
+                    best, best_iou = index, iou
+            if best >= 0:
+                ids.append(previous.pop(best)[0])
+            else:
+                ids.append(state.next_track_id)
+                state.next_track_id += 1
+        
+        order = sorted(range(len(boxes)), key=ids.__getitem__)
+        state.track_ids = [ids[i] for i in order]
+        state.track_boxes = [boxes[i] for i in order]
+        return order
+    
+    def _pose_to_bbox(
+        self,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        frame_shape: Tuple[int, ...],
+        expansion: float = 1.25
+    ) -> np.ndarray:
+        """Box around the confident keypoints, expanded and clipped to the frame"""
+        visible = keypoints[scores >= self.det_refresh_confidence]
+        if len(visible) == 0:
+            visible = keypoints
+        x1, y1 = visible.min(axis=0)
+        x2, y2 = visible.max(axis=0)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        half_w, half_h = (x2 - x1) / 2 * expansion, (y2 - y1) / 2 * expansion
+        height, width = frame_shape[:2]
+        return np.array([
+            max(0.0, cx - half_w), max(0.0, cy - half_h),
+            min(float(width), cx + half_w), min(float(height), cy + half_h)
+        ])
+    
+    def _infer_batch(self, tool, images: List[np.ndarray]) -> List[List[np.ndarray]]:
+        """Run preprocessed images through an rtmlib model, batched when the model allows it"""
+        if not self._supports_batch(tool):
+            return [tool.inference(img) for img in images]
+        
+        batch = np.ascontiguousarray(
+            np.stack([img.transpose(2, 0, 1) for img in images]), dtype=np.float32
+        )
+        session = tool.session
+        output_names = [out.name for out in session.get_outputs()]
+        outputs = session.run(output_names, {session.get_inputs()[0].name: batch})
+        return [[out[i:i + 1] for out in outputs] for i in range(len(images))]
+    
+    def _supports_batch(self, tool) -> bool:
+        """Check whether an rtmlib model accepts more than one image per call"""
+        if tool.backend != 'onnxruntime':
+            return False
+        batch_dim = tool.session.get_inputs()[0].shape[0]
+        # Dynamic axes are reported as a symbolic name or None
+        return not isinstance(batch_dim, int)
+    
     def keypoints_to_dict(
         self, 
         keypoints: np.ndarray, 
         scores: np.ndarray,
         confidence_threshold: float = 0.3
-    ) -> Dict[str, np.ndarray]:
+    ) -> KeypointSet:
         """
-        Convert keypoint array to dictionary with confidence filtering
+        Convert keypoint array to a keypoint set with confidence filtering
         
         Args:
             keypoints: Array of shape (n_keypoints, 2)
@@ -117,48 +577,29 @@ class PoseDetector:
             confidence_threshold: Minimum confidence to include keypoint
             
         Returns:
-            Dictionary mapping keypoint names to coordinates
+            KeypointSet mapping keypoint names to coordinates
         """
-        result = {}
-        
-        for i, name in enumerate(self.keypoint_names):
-            if i < len(scores) and scores[i] >= confidence_threshold:
-                result[name] = keypoints[i]
-        
-        # Add computed keypoints (Neck and Hip)
-        if "Neck" not in result and all(k in result for k in ["LShoulder", "RShoulder"]):
-            result["Neck"] = (result["LShoulder"] + result["RShoulder"]) / 2
-        
-        if "Hip" not in result and all(k in result for k in ["LHip", "RHip"]):
-            result["Hip"] = (result["LHip"] + result["RHip"]) / 2
-        
-        return result
+        return keypoints_to_dict(self.keypoint_names, keypoints, scores, confidence_threshold)
     
     def _get_halpe26_keypoints(self) -> List[str]:
         """HALPE_26 keypoint names"""
-        return [
-            "Nose", "LEye", "REye", "LEar", "REar",
-            "LShoulder", "RShoulder", "LElbow", "RElbow",
-            "LWrist", "RWrist", "LHip", "RHip",
-            "LKnee", "RKnee", "LAnkle", "RAnkle",
-            "Head", "Neck", "Hip", "LBigToe", "RBigToe",
-            "LSmallToe", "RSmallToe", "LHeel", "RHeel"
-        ]
+        return list(HALPE_26)
     
     def _get_coco17_keypoints(self) -> List[str]:
         """COCO_17 keypoint names"""
-        return [
-            "Nose", "LEye", "REye", "LEar", "REar",
-            "LShoulder", "RShoulder", "LElbow", "RElbow",
-            "LWrist", "RWrist", "LHip", "RHip",
-            "LKnee", "RKnee", "LAnkle", "RAnkle"
-        ]
+        return list(COCO_17)
     
     def _get_coco133_keypoints(self) -> List[str]:
-        """COCO_133 keypoint names (simplified - main body only)"""
-        return self._get_halpe26_keypoints()
+        """COCO_133 keypoint names: body, feet, face and both hands"""
+        return list(COCO_133)
+    
+    @property
+    def input_size(self) -> int:
+        """Longest side of the person detector's input, frames larger than this are downscaled anyway"""
+        model_input_size = getattr(self.tracker.det_model, 'model_input_size', None)
+        return max(model_input_size) if model_input_size else 640
     
     @property
     def is_initialized(self) -> bool:
         """Check if detector is properly initialized"""
-        return PoseDetector._initialized and hasattr(self, 'tracker')
\ No newline at end of file
+        return self._initialized and hasattr(self, 'tracker')
\ No newline at end of file
@@ -4,7 +4,8 @@ Complete implementation with all body parts support
 """
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from .angle_computation import calculate_all_angles, ANGLE_DEFINITIONS, calculate_angle_between_points, add_virtual_keypoints
+from .angle_computation import calculate_all_angles, calculate_all_angles_batch, ANGLE_DEFINITIONS, calculate_angle_between_points, add_virtual_keypoints
+from .keypoint_set import KeypointSequence
 
 class ROMCalculator:
     """Calculate ROM for different body parts and movements"""
@@ -16,6 +17,7 @@ class ROMCalculator:
                 'primary': 'trunk',
                 'secondary': ['pelvis', 'right hip', 'left hip'],
                 'calculate': lambda kpts: calculate_lower_back_flexion(kpts),
+                'calculate_batch': lambda seq: calculate_lower_back_flexion_batch(seq),
                 'normal_range': (0, 60),
                 'max_range': (0, 90)
             },
@@ -23,6 +25,7 @@ class ROMCalculator:
                 'primary': 'trunk',
                 'secondary': ['pelvis'],
                 'calculate': lambda kpts: calculate_lower_back_extension(kpts),
+                'calculate_batch': lambda seq: calculate_lower_back_extension_batch(seq),
                 'normal_range': (-30, 0),
                 'max_range': (-45, 0)
             },
@@ -30,6 +33,7 @@ class ROMCalculator:
                 'primary': 'trunk',
                 'secondary': ['shoulders', 'pelvis'],
                 'calculate': lambda kpts: calculate_lower_back_lateral_flexion(kpts),
+                'calculate_batch': lambda seq: calculate_lower_back_lateral_flexion_batch(seq),
                 'normal_range': (-30, 30),
                 'max_range': (-45, 45)
             },
@@ -37,6 +41,7 @@ class ROMCalculator:
                 'primary': 'shoulders',
                 'secondary': ['pelvis'],
                 'calculate': lambda kpts: calculate_lower_back_rotation(kpts),
+                'calculate_batch': lambda seq: calculate_lower_back_rotation_batch(seq),
                 'normal_range': (-45, 45),
                 'max_range': (-60, 60)
             }
@@ -46,6 +51,7 @@ class ROMCalculator:
                 'primary': 'right shoulder',
                 'secondary': ['trunk'],
                 'calculate': lambda kpts: calculate_shoulder_flexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_shoulder_flexion_batch(seq, 'right'),
                 'normal_range': (0, 180),
                 'max_range': (0, 190)
             },
@@ -53,6 +59,7 @@ class ROMCalculator:
                 'primary': 'right shoulder',
                 'secondary': ['trunk'],
                 'calculate': lambda kpts: calculate_shoulder_extension(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_shoulder_extension_batch(seq, 'right'),
                 'normal_range': (0, 60),
                 'max_range': (0, 80)
             },
@@ -60,6 +67,7 @@ class ROMCalculator:
                 'primary': 'right shoulder',
                 'secondary': ['trunk'],
                 'calculate': lambda kpts: calculate_shoulder_abduction(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_shoulder_abduction_batch(seq, 'right'),
                 'normal_range': (0, 180),
                 'max_range': (0, 190)
             },
@@ -67,6 +75,7 @@ class ROMCalculator:
                 'primary': 'right shoulder',
                 'secondary': ['trunk'],
                 'calculate': lambda kpts: calculate_shoulder_adduction(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_shoulder_adduction_batch(seq, 'right'),
                 'normal_range': (0, 45),
                 'max_range': (0, 60)
             }
@@ -76,6 +85,7 @@ class ROMCalculator:
                 'primary': 'right elbow',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_elbow_flexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_elbow_flexion_batch(seq, 'right'),
                 'normal_range': (0, 145),
                 'max_range': (0, 160)
             },
@@ -83,6 +93,7 @@ class ROMCalculator:
                 'primary': 'right elbow',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_elbow_extension(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_elbow_extension_batch(seq, 'right'),
                 'normal_range': (0, 10),
                 'max_range': (-10, 10)
             }
@@ -92,6 +103,7 @@ class ROMCalculator:
                 'primary': 'right hip',
                 'secondary': ['pelvis', 'trunk'],
                 'calculate': lambda kpts: calculate_hip_flexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_hip_flexion_batch(seq, 'right'),
                 'normal_range': (0, 120),
                 'max_range': (0, 140)
             },
@@ -99,6 +111,7 @@ class ROMCalculator:
                 'primary': 'right hip',
                 'secondary': ['pelvis'],
                 'calculate': lambda kpts: calculate_hip_extension(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_hip_extension_batch(seq, 'right'),
                 'normal_range': (0, 30),
                 'max_range': (0, 40)
             },
@@ -106,6 +119,7 @@ class ROMCalculator:
                 'primary': 'right hip',
                 'secondary': ['pelvis'],
                 'calculate': lambda kpts: calculate_hip_abduction(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_hip_abduction_batch(seq, 'right'),
                 'normal_range': (0, 45),
                 'max_range': (0, 60)
             }
@@ -115,6 +129,7 @@ class ROMCalculator:
                 'primary': 'right knee',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_knee_flexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_knee_flexion_batch(seq, 'right'),
                 'normal_range': (0, 135),
                 'max_range': (0, 160)
             },
@@ -122,6 +137,7 @@ class ROMCalculator:
                 'primary': 'right knee',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_knee_extension(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_knee_extension_batch(seq, 'right'),
                 'normal_range': (0, 10),
                 'max_range': (-10, 10)
             }
@@ -131,6 +147,7 @@ class ROMCalculator:
                 'primary': 'right ankle',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_ankle_dorsiflexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_ankle_dorsiflexion_batch(seq, 'right'),
                 'normal_range': (0, 20),
                 'max_range': (0, 30)
             },
@@ -138,6 +155,7 @@ class ROMCalculator:
                 'primary': 'right ankle',
                 'secondary': [],
                 'calculate': lambda kpts: calculate_ankle_plantarflexion(kpts, 'right'),
+                'calculate_batch': lambda seq: calculate_ankle_plantarflexion_batch(seq, 'right'),
                 'normal_range': (0, 50),
                 'max_range': (0, 60)
             }
@@ -184,6 +202,46 @@ class ROMCalculator:
         
         return calculated_angles
     
+    @classmethod
+    def calculate_movement_angles_batch(
+        cls,
+        sequence: KeypointSequence,
+        body_part: str,
+        movement_type: str,
+        side: str = 'right'
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate angles for specific movement in every frame of a keypoint sequence
+        
+        Returns (T,) float64 arrays, NaN in frames where an angle can't be calculated
+        """
+        if body_part not in cls.MOVEMENT_ANGLES:
+            raise ValueError(f"Unknown body part: {body_part}")
+        
+        if movement_type not in cls.MOVEMENT_ANGLES[body_part]:
+            raise ValueError(f"Unknown movement for {body_part}: {movement_type}")
+        
+        movement_config = cls.MOVEMENT_ANGLES[body_part][movement_type]
+        
+        if 'calculate_batch' in movement_config:
+            return movement_config['calculate_batch'](sequence)
+        
+        # Custom calculation without a batch version, run it frame by frame
+        if 'calculate' in movement_config:
+            frames = [movement_config['calculate'](sequence.frame(t)) for t in range(len(sequence))]
+            names = list(dict.fromkeys(name for angles in frames for name in angles))
+            return {
+                name: np.array([angles.get(name, np.nan) for angles in frames], dtype=np.float64)
+                for name in names
+            }
+        
+        primary_angle_name = movement_config['primary']
+        if side == 'left' and 'right' in primary_angle_name:
+            primary_angle_name = primary_angle_name.replace('right', 'left')
+        
+        angles_to_calculate = [primary_angle_name] + movement_config.get('secondary', [])
+        return calculate_all_angles_batch(sequence, angles_to_calculate)
+    
     @classmethod
     def get_movement_requirements(cls, body_part: str, movement_type: str) -> List[str]:
         """
@@ -452,4 +510,117 @@ def calculate_ankle_plantarflexion(keypoints: Dict[str, np.ndarray], side: str)
     for key in angles:
         if 'ankle' in key:
             angles[key] = 90 - angles[key]
-    return angles
\ No newline at end of file
+    return angles
+
+# Batch versions over a KeypointSequence: (T,) arrays, NaN where an angle can't be calculated
+def _angles_between_points_batch(p1: np.ndarray, p2: np.ndarray, reference: str) -> np.ndarray:
+    """calculate_angle_between_points for (T, 2) point arrays"""
+    vector = p2 - p1
+    if reference == "vertical":
+        angle = np.degrees(np.arctan2(vector[:, 0], -vector[:, 1]))
+    else:
+        angle = np.degrees(np.arctan2(vector[:, 1], vector[:, 0]))
+    return angle.astype(np.float64)
+
+def _joint_angle_batch(sequence: KeypointSequence, angle_name: str) -> np.ndarray:
+    return calculate_all_angles_batch(sequence, [angle_name])[angle_name]
+
+def calculate_lower_back_flexion_batch(sequence: KeypointSequence) -> Dict[str, np.ndarray]:
+    """Calculate lower back flexion angles for every frame"""
+    trunk_angle = _angles_between_points_batch(sequence.point('Neck'), sequence.point('Hip'), 'vertical')
+    return {
+        'trunk': 180 - trunk_angle,
+        'pelvis': _angles_between_points_batch(sequence.point('LHip'), sequence.point('RHip'), 'horizontal'),
+        'right hip': _joint_angle_batch(sequence, 'right hip'),
+        'left hip': _joint_angle_batch(sequence, 'left hip')
+    }
+
+def calculate_lower_back_extension_batch(sequence: KeypointSequence) -> Dict[str, np.ndarray]:
+    """Calculate lower back extension angles for every frame"""
+    trunk_angle = _angles_between_points_batch(sequence.point('Neck'), sequence.point('Hip'), 'vertical')
+    return {
+        'trunk': trunk_angle - 180,
+        'pelvis': _angles_between_points_batch(sequence.point('LHip'), sequence.point('RHip'), 'horizontal')
+    }
+
+def calculate_lower_back_lateral_flexion_batch(sequence: KeypointSequence) -> Dict[str, np.ndarray]:
+    """Calculate lower back lateral flexion angles for every frame"""
+    return {
+        'trunk': _angles_between_points_batch(sequence.point('Hip'), sequence.point('Neck'), 'vertical'),
+        'shoulders': _angles_between_points_batch(sequence.point('LShoulder'), sequence.point('RShoulder'), 'horizontal'),
+        'pelvis': _angles_between_points_batch(sequence.point('LHip'), sequence.point('RHip'), 'horizontal')
+    }
+
+def calculate_lower_back_rotation_batch(sequence: KeypointSequence) -> Dict[str, np.ndarray]:
+    """Calculate lower back rotation angles for every frame"""
+    shoulder_vector = sequence.point('RShoulder') - sequence.point('LShoulder')
+    shoulder_angle = np.degrees(np.arctan2(shoulder_vector[:, 1], shoulder_vector[:, 0]))
+    hip_vector = sequence.point('RHip') - sequence.point('LHip')
+    hip_angle = np.degrees(np.arctan2(hip_vector[:, 1], hip_vector[:, 0]))
+    
+    # Rotation is difference between shoulder and hip angles, normalized to [-180, 180]
+    rotation_angle = shoulder_angle - hip_angle
+    rotation_angle = np.where(
+        rotation_angle > 180, rotation_angle - 360,
+        np.where(rotation_angle < -180, rotation_angle + 360, rotation_angle)
+    )
+    
+    # Every output needs all four points, like the per-frame version
+    complete = ~np.isnan(rotation_angle)
+    return {
+        'shoulders': np.where(complete, shoulder_angle, np.nan).astype(np.float64),
+        'pelvis': np.where(complete, hip_angle, np.nan).astype(np.float64),
+        'trunk_rotation': rotation_angle.astype(np.float64)
+    }
+
+def calculate_shoulder_flexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate shoulder flexion for every frame"""
+    return {f'{side} shoulder': _joint_angle_batch(sequence, f'{side} shoulder')}
+
+def calculate_shoulder_extension_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate shoulder extension for every frame"""
+    return {f'{side} shoulder': -_joint_angle_batch(sequence, f'{side} shoulder')}
+
+def calculate_shoulder_abduction_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate shoulder abduction for every frame"""
+    return {f'{side} shoulder': _joint_angle_batch(sequence, f'{side} shoulder')}
+
+def calculate_shoulder_adduction_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate shoulder adduction for every frame"""
+    return calculate_shoulder_abduction_batch(sequence, side)
+
+def calculate_elbow_flexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate elbow flexion for every frame"""
+    return {f'{side} elbow': 180 - _joint_angle_batch(sequence, f'{side} elbow')}
+
+def calculate_elbow_extension_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate elbow extension for every frame"""
+    return {f'{side} elbow': _joint_angle_batch(sequence, f'{side} elbow')}
+
+def calculate_hip_flexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate hip flexion for every frame"""
+    return {f'{side} hip': _joint_angle_batch(sequence, f'{side} hip')}
+
+def calculate_hip_extension_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate hip extension for every frame"""
+    return {f'{side} hip': -_joint_angle_batch(sequence, f'{side} hip')}
+
+def calculate_hip_abduction_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate hip abduction for every frame"""
+    return {f'{side} hip': _joint_angle_batch(sequence, f'{side} hip')}
+
+def calculate_knee_flexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate knee flexion for every frame"""
+    return {f'{side} knee': -_joint_angle_batch(sequence, f'{side} knee')}
+
+def calculate_knee_extension_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate knee extension for every frame"""
+    return {f'{side} knee': _joint_angle_batch(sequence, f'{side} knee')}
+
+def calculate_ankle_dorsiflexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate ankle dorsiflexion for every frame"""
+    return {f'{side} ankle': _joint_angle_batch(sequence, f'{side} ankle') - 90}
+
+def calculate_ankle_plantarflexion_batch(sequence: KeypointSequence, side: str) -> Dict[str, np.ndarray]:
+    """Calculate ankle plantarflexion for every frame"""
+    return {f'{side} ankle': 90 - _joint_angle_batch(sequence, f'{side} ankle')}
\ No newline at end of file
@@ -1,10 +1,20 @@
 #!/usr/bin/env python
 """
 Check if all components can be initialized properly
+
+Usage:
+    python scripts/check_startup.py            # component checks
+    python scripts/check_startup.py --profile  # time-to-ready profile
 """
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import subprocess
+import time
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# Modules that should only load when the model is built, not on import
+HEAVY_MODULES = ["torch", "rtmlib", "onnxruntime", "openvino"]
 
 def check_imports():
     """Check if all required imports work"""
@@ -25,10 +35,10 @@ def check_imports():
         return False
     
     try:
-        import torch
-        print(f"✓ PyTorch imported successfully (CUDA available: {torch.cuda.is_available()})")
+        import onnxruntime as ort
+        print(f"✓ ONNX Runtime imported successfully (providers: {', '.join(ort.get_available_providers())})")
     except ImportError as e:
-        print(f"✗ PyTorch import failed: {e}")
+        print(f"✗ ONNX Runtime import failed: {e}")
         return False
     
     try:
@@ -95,7 +105,7 @@ def check_movement_registry():
         
         # Test getting a movement
         flexion = MovementRegistry.get_movement("lower_back", "flexion")
-        print("✓ Can retrieve movement classes successfully")
+        print("✓ Can retrieve movements successfully")
         
     except Exception as e:
         print(f"✗ Movement registry check failed: {e}")
@@ -126,8 +136,75 @@ def check_frame_analyzer():
     
     return True
 
+def profile_import_time(top: int = 15):
+    """Import app.main in a fresh interpreter and list the slowest imports"""
+    print("Profiling import of app.main...")
+    
+    code = "import sys, app.main; print(','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        print(f"✗ Importing app.main failed:\n{result.stderr[-2000:]}")
+        return False
+    
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.strip()))
+    
+    print(f"✓ Fresh interpreter imported app.main in {elapsed:.2f}s")
+    print(f"  Slowest imports (cumulative):")
+    for cumulative, name in sorted(imports, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    if loaded:
+        print(f"✗ Heavy modules loaded at import time: {', '.join(loaded)}")
+        return False
+    print(f"✓ None of {', '.join(HEAVY_MODULES)} loaded at import time")
+    return True
+
+def profile_startup():
+    """Run the app's lifespan startup and report time-to-ready"""
+    print("\nProfiling startup (model load and warm-up)...")
+    
+    import asyncio
+    start = time.perf_counter()
+    from app.main import app
+    from app.core.pose.model_manager import ModelManager
+    
+    async def run_lifespan():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter() - start
+    
+    ready_after = asyncio.run(run_lifespan())
+    if not ModelManager.is_initialized():
+        print("✗ Model failed to load, see the log above")
+        return False
+    
+    print(f"✓ Ready after {ready_after:.2f}s")
+    for phase, seconds in ModelManager.startup_timings.items():
+        print(f"  {phase:<16} {seconds:8.3f} s")
+    backend = ModelManager.backend_info()
+    print(f"  Inference backend: {backend['name']}")
+    return True
+
 def main():
     """Run all checks"""
+    if "--profile" in sys.argv:
+        print("ROM Analysis API - Startup Profile")
+        print("=" * 50)
+        ok = profile_import_time() and profile_startup()
+        print("\n" + "=" * 50)
+        sys.exit(0 if ok else 1)
+    
     print("ROM Analysis API - Startup Check")
     print("=" * 50)
     
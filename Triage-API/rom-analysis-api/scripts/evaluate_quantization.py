@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Accuracy-regression harness for the INT8 pose models
+
+Runs the FP32 and INT8 models over a corpus of frames and reports
+keypoint error, per-angle error through ROMCalculator and speedup.
+Exits non-zero when the 95th percentile angle error is above
+--max-angle-error, so it can gate a model change in CI.
+
+Usage:
+    python scripts/evaluate_quantization.py CORPUS_DIR [--mode performance] [--json report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from physiotrack_core.pose_detection import PoseDetector
+from physiotrack_core.rom_calculations import ROMCalculator
+from quantize_models import load_corpus
+
+def run_detector(detector: PoseDetector, frames: List[np.ndarray]) -> Tuple[List[Optional[Tuple[np.ndarray, np.ndarray]]], List[float]]:
+    """First person's (keypoints, scores) per frame, and per-frame latency in ms"""
+    # Warm-up so lazy allocations don't count against the first frame
+    detector.detect(frames[0])
+
+    poses, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        keypoints, scores = detector.detect(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+        poses.append((keypoints[0], scores[0]) if len(keypoints) > 0 else None)
+    return poses, latencies
+
+def summarize(values: List[float]) -> Dict:
+    """Mean / p95 / max of a list of errors"""
+    if not values:
+        return {"count": 0, "mean": None, "p95": None, "max": None}
+    arr = np.asarray(values, dtype=np.float64)
+    return {
+        "count": int(arr.size),
+        "mean": round(float(arr.mean()), 3),
+        "p95": round(float(np.percentile(arr, 95)), 3),
+        "max": round(float(arr.max()), 3)
+    }
+
+def angle_difference(a: float, b: float) -> float:
+    """Absolute difference of two angles in degrees, across the ±180 wrap"""
+    return abs((a - b + 180.0) % 360.0 - 180.0)
+
+def movement_angles(keypoints: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Every ROMCalculator movement angle the keypoints allow, keyed body_part/movement/angle"""
+    angles = {}
+    for body_part, movements in ROMCalculator.MOVEMENT_ANGLES.items():
+        for movement_type in movements:
+            try:
+                result = ROMCalculator.calculate_movement_angles(keypoints, body_part, movement_type)
+            except Exception:
+                continue
+            for name, value in result.items():
+                if value is not None and np.isfinite(value):
+                    angles[f"{body_part}/{movement_type}/{name}"] = float(value)
+    return angles
+
+def compare(
+    fp32_detector: PoseDetector,
+    fp32_poses: List,
+    int8_poses: List,
+    confidence_threshold: float
+) -> Dict:
+    """Keypoint and angle errors of the INT8 poses against the FP32 poses"""
+    keypoint_errors: Dict[str, List[float]] = {}
+    angle_errors: Dict[str, List[float]] = {}
+    detection_mismatches = 0
+
+    for fp32, int8 in zip(fp32_poses, int8_poses):
+        if fp32 is None or int8 is None:
+            detection_mismatches += int((fp32 is None) != (int8 is None))
+            continue
+
+        fp32_kpts = fp32_detector.keypoints_to_dict(fp32[0], fp32[1], confidence_threshold)
+        int8_kpts = fp32_detector.keypoints_to_dict(int8[0], int8[1], confidence_threshold)
+
+        for name in fp32_kpts.keys() & int8_kpts.keys():
+            error = float(np.linalg.norm(fp32_kpts[name] - int8_kpts[name]))
+            keypoint_errors.setdefault(name, []).append(error)
+
+        fp32_angles = movement_angles(fp32_kpts)
+        int8_angles = movement_angles(int8_kpts)
+        for name in fp32_angles.keys() & int8_angles.keys():
+            angle_errors.setdefault(name, []).append(angle_difference(fp32_angles[name], int8_angles[name]))
+
+    all_keypoint_errors = [e for errors in keypoint_errors.values() for e in errors]
+    all_angle_errors = [e for errors in angle_errors.values() for e in errors]
+    return {
+        "detection_mismatches": detection_mismatches,
+        "keypoint_error_px": summarize(all_keypoint_errors),
+        "keypoint_error_px_by_name": {name: summarize(errors) for name, errors in sorted(keypoint_errors.items())},
+        "angle_error_deg": summarize(all_angle_errors),
+        "angle_error_deg_by_name": {name: summarize(errors) for name, errors in sorted(angle_errors.items())},
+    }
+
+def print_report(report: Dict):
+    """Print the comparison in a readable form"""
+    speed = report["latency_ms"]
+    print(f"\nFrames: {report['frames']}  (detection mismatches: {report['detection_mismatches']})")
+    print(f"Latency: FP32 {speed['fp32']:.1f} ms, INT8 {speed['int8']:.1f} ms, speedup {report['speedup']:.2f}x")
+
+    kp = report["keypoint_error_px"]
+    print(f"\nKeypoint error (px): mean {kp['mean']}, p95 {kp['p95']}, max {kp['max']} over {kp['count']} points")
+
+    print("\nAngle error (deg):")
+    print(f"  {'angle':<45} {'n':>5} {'mean':>8} {'p95':>8} {'max':>8}")
+    for name, stats in report["angle_error_deg_by_name"].items():
+        print(f"  {name:<45} {stats['count']:>5} {stats['mean']:>8} {stats['p95']:>8} {stats['max']:>8}")
+    overall = report["angle_error_deg"]
+    print(f"  {'all':<45} {overall['count']:>5} {overall['mean']} {overall['p95']} {overall['max']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FP32 and INT8 pose models on a frame corpus")
+    parser.add_argument("corpus_dir", help="Directory of frames (jpg/png)")
+    parser.add_argument("--model", default="body_with_feet")
+    parser.add_argument("--mode", default="performance")
+    parser.add_argument("--model-dir", default=None, help="Directory of the INT8 models (default: next to the FP32 models)")
+    parser.add_argument("--max-frames", type=int, default=0, help="Frames to evaluate, 0 for all")
+    parser.add_argument("--confidence", type=float, default=0.3, help="Keypoint confidence threshold")
+    parser.add_argument("--max-angle-error", type=float, default=3.0, help="Fail when p95 angle error exceeds this (deg)")
+    parser.add_argument("--json", default=None, help="Write the full report to this file")
+    args = parser.parse_args()
+
+    print("ROM Analysis API - INT8 Accuracy Check")
+    print("=" * 50)
+
+    frames = load_corpus(args.corpus_dir, args.max_frames)
+    if not frames:
+        print(f"✗ No images found in {args.corpus_dir}")
+        sys.exit(1)
+
+    # Same tuned ONNX Runtime settings on both sides so only the weights differ
+    common = dict(model=args.model, mode=args.mode, device="cpu", backend="onnxruntime")
+    backend_kwargs = {"model_dir": args.model_dir}
+    fp32_detector = PoseDetector(**common, inference_backend="ort_cpu", backend_kwargs=backend_kwargs)
+    int8_detector = PoseDetector(**common, inference_backend="ort_int8", backend_kwargs=backend_kwargs)
+
+    fp32_poses, fp32_latency = run_detector(fp32_detector, frames)
+    int8_poses, int8_latency = run_detector(int8_detector, frames)
+
+    report = {"frames": len(frames)}
+    report.update(compare(fp32_detector, fp32_poses, int8_poses, args.confidence))
+    report["latency_ms"] = {"fp32": float(np.mean(fp32_latency)), "int8": float(np.mean(int8_latency))}
+    report["speedup"] = report["latency_ms"]["fp32"] / report["latency_ms"]["int8"]
+
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+    p95 = report["angle_error_deg"]["p95"]
+    print("\n" + "=" * 50)
+    if p95 is not None and p95 > args.max_angle_error:
+        print(f"✗ p95 angle error {p95}° exceeds {args.max_angle_error}°")
+        sys.exit(1)
+    print(f"✓ p95 angle error {p95}° within {args.max_angle_error}°")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Produce statically quantized (INT8) variants of the pose models
+
+Calibration runs the FP32 person detector and pose model over a corpus of
+frames. The quantized models are written as <model>.int8.onnx next to the
+FP32 models, or into --output-dir, where the ort_int8 inference backend and
+POSE_MODE=<mode>_int8 pick them up.
+
+Usage:
+    python scripts/quantize_models.py CORPUS_DIR [--model body_with_feet] [--mode performance]
+"""
+import argparse
+import glob
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List
+
+import cv2
+import numpy as np
+from onnxruntime.quantization import (
+    CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+)
+
+from physiotrack_core.pose_detection import PoseDetector, quantized_model_path
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+CALIBRATION_METHODS = {
+    "minmax": CalibrationMethod.MinMax,
+    "entropy": CalibrationMethod.Entropy,
+    "percentile": CalibrationMethod.Percentile,
+}
+
+def load_corpus(corpus_dir: str, max_frames: int = 0) -> List[np.ndarray]:
+    """Load the images of a corpus directory as BGR frames, sorted by name"""
+    paths = sorted(
+        path for path in glob.glob(os.path.join(corpus_dir, "**", "*"), recursive=True)
+        if path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if max_frames > 0:
+        paths = paths[:max_frames]
+
+    frames = []
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"  ! Skipping unreadable image {path}")
+            continue
+        frames.append(frame)
+    return frames
+
+class ModelInputReader(CalibrationDataReader):
+    """Feed preprocessed calibration tensors to the quantizer"""
+
+    def __init__(self, input_name: str, tensors: List[np.ndarray]):
+        self._inputs = iter([{input_name: tensor} for tensor in tensors])
+
+    def get_next(self):
+        return next(self._inputs, None)
+
+def to_input_tensor(img: np.ndarray) -> np.ndarray:
+    """HWC image to the NCHW float32 tensor rtmlib feeds the model"""
+    return np.ascontiguousarray(img.transpose(2, 0, 1)[None], dtype=np.float32)
+
+def calibration_tensors(detector: PoseDetector, frames: List[np.ndarray]):
+    """Model inputs for the person detector and the pose model, as seen in production"""
+    det_model = detector.tracker.det_model
+    pose_model = detector.tracker.pose_model
+
+    det_tensors, pose_tensors = [], []
+    for frame in frames:
+        img, _ = det_model.preprocess(frame)
+        det_tensors.append(to_input_tensor(img))
+
+        bboxes = det_model(frame)
+        if len(bboxes) == 0:
+            bboxes = [[0, 0, frame.shape[1], frame.shape[0]]]
+        for bbox in bboxes:
+            img, _, _ = pose_model.preprocess(frame, bbox)
+            pose_tensors.append(to_input_tensor(img))
+
+    return det_tensors, pose_tensors
+
+def quantize_model(tool, tensors: List[np.ndarray], output_path: str, calibration: str, per_channel: bool):
+    """Statically quantize one rtmlib model with QDQ INT8 weights and activations"""
+    model_path = tool.onnx_model
+    input_name = tool.session.get_inputs()[0].name
+
+    # Shape inference and graph cleanup make quantization more complete when available
+    source_path = model_path
+    try:
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+        source_path = output_path.replace(".int8.onnx", ".preprocessed.onnx")
+        quant_pre_process(model_path, source_path)
+    except Exception as e:
+        print(f"  ! Skipping quantization pre-processing: {e}")
+        source_path = model_path
+
+    quantize_static(
+        source_path,
+        output_path,
+        ModelInputReader(input_name, tensors),
+        quant_format=QuantFormat.QDQ,
+        per_channel=per_channel,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+        calibrate_method=CALIBRATION_METHODS[calibration]
+    )
+
+    if source_path != model_path and os.path.exists(source_path):
+        os.remove(source_path)
+
+    fp32_size = os.path.getsize(model_path) / 1e6
+    int8_size = os.path.getsize(output_path) / 1e6
+    print(f"✓ {os.path.basename(model_path)}: {fp32_size:.1f} MB -> {output_path} ({int8_size:.1f} MB)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the pose models to INT8")
+    parser.add_argument("corpus_dir", help="Directory of calibration frames (jpg/png)")
+    parser.add_argument("--model", default="body_with_feet", help="POSE_MODEL to quantize")
+    parser.add_argument("--mode", default="performance", help="POSE_MODE to quantize")
+    parser.add_argument("--output-dir", default=None, help="Where to write the INT8 models (default: next to the FP32 models)")
+    parser.add_argument("--max-frames", type=int, default=200, help="Calibration frames to use, 0 for all")
+    parser.add_argument("--calibration", choices=sorted(CALIBRATION_METHODS), default="minmax")
+    parser.add_argument("--per-tensor", action="store_true", help="Quantize weights per tensor instead of per channel")
+    args = parser.parse_args()
+
+    print("ROM Analysis API - Model Quantization")
+    print("=" * 50)
+
+    frames = load_corpus(args.corpus_dir, args.max_frames)
+    if not frames:
+        print(f"✗ No images found in {args.corpus_dir}")
+        sys.exit(1)
+    print(f"Loaded {len(frames)} calibration frames")
+
+    detector = PoseDetector(model=args.model, mode=args.mode, device="cpu", backend="onnxruntime")
+    det_tensors, pose_tensors = calibration_tensors(detector, frames)
+    print(f"Collected {len(det_tensors)} detector and {len(pose_tensors)} pose calibration inputs")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    for tool, tensors in ((detector.tracker.det_model, det_tensors), (detector.tracker.pose_model, pose_tensors)):
+        output_path = quantized_model_path(tool.onnx_model, args.output_dir)
+        quantize_model(tool, tensors, output_path, args.calibration, not args.per_tensor)
+
+    print("\n" + "=" * 50)
+    print("Check accuracy before serving with: python scripts/evaluate_quantization.py " + args.corpus_dir)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file